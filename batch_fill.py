@@ -0,0 +1,108 @@
+from selenium.webdriver.common.by import By
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Fills every requested field in one round trip and reports what stuck.
+# Values go through the native property setters so React/Vue see the change.
+BATCH_FILL_SCRIPT = """
+var entries = arguments[0];
+var used = new Set();
+function visible(el) {
+    var style = window.getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden') return false;
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+}
+function matches(selector) {
+    if (selector.charAt(0) === '/' || selector.charAt(0) === '(') {
+        var result = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+        return nodes;
+    }
+    try {
+        return Array.prototype.slice.call(document.querySelectorAll(selector));
+    } catch (e) {
+        return [];
+    }
+}
+function resolve(selectors) {
+    for (var i = 0; i < selectors.length; i++) {
+        var nodes = matches(selectors[i]);
+        for (var j = 0; j < nodes.length; j++) {
+            var el = nodes[j];
+            if (!used.has(el) && !el.disabled && !el.readOnly && visible(el)) {
+                return {element: el, selector: selectors[i], index: j};
+            }
+        }
+    }
+    return null;
+}
+function fire(el, type) {
+    el.dispatchEvent(new Event(type, {bubbles: true}));
+}
+function setNativeValue(el, value) {
+    var proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype :
+                el.tagName === 'SELECT' ? HTMLSelectElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+}
+return entries.map(function(entry) {
+    var found = resolve(entry.selectors);
+    if (!found) return {field: entry.field, status: 'not_found'};
+    var el = found.element, ok = false;
+    used.add(el);
+    el.focus();
+    if (el.type === 'checkbox' || el.type === 'radio') {
+        var wanted = !!entry.value;
+        if (el.checked !== wanted) el.click();
+        ok = el.checked === wanted;
+    } else if (el.tagName === 'SELECT') {
+        var wantedText = String(entry.value).trim();
+        var option = Array.prototype.find.call(el.options, function(o) { return o.text.trim() === wantedText; }) ||
+                     Array.prototype.find.call(el.options, function(o) { return o.value === wantedText; });
+        if (option) {
+            setNativeValue(el, option.value);
+            fire(el, 'input');
+            fire(el, 'change');
+            ok = el.value === option.value;
+        }
+    } else {
+        setNativeValue(el, String(entry.value));
+        fire(el, 'input');
+        fire(el, 'change');
+        ok = el.value === String(entry.value);
+    }
+    el.dispatchEvent(new FocusEvent('blur'));
+    fire(el, 'focusout');
+    return {field: entry.field, status: ok ? 'filled' : 'rejected', selector: found.selector, index: found.index};
+});
+"""
+
+
+def batch_fill(driver, entries):
+    """Fill many fields with one injected script.
+
+    `entries` is a list of {'field', 'selectors', 'value'} dicts, where each
+    selector is an XPath or a CSS selector tried in order. Returns a dict of
+    field -> {'status': 'filled' | 'rejected' | 'not_found', ...}.
+    """
+    if not entries:
+        return {}
+    try:
+        results = driver.execute_script(BATCH_FILL_SCRIPT, entries) or []
+    except Exception as e:
+        logger.error(f"Batch fill failed: {str(e)}")
+        return {entry['field']: {'status': 'rejected'} for entry in entries}
+    return {result['field']: result for result in results}
+
+
+def locate_result(driver, result):
+    """Find the element a batch result refers to, for per-field fallbacks"""
+    selector = result.get('selector')
+    if not selector:
+        return None
+    by = By.XPATH if selector[0] in '/(' else By.CSS_SELECTOR
+    elements = driver.find_elements(by, selector)
+    index = result.get('index', 0)
+    return elements[index] if index < len(elements) else None
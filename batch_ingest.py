@@ -0,0 +1,402 @@
+"""Batch resume ingestion: a folder or archive of PDFs in, a JSONL of extracted records out.
+
+Usage: python batch_ingest.py resumes/ -o records.jsonl [--workers N] [--no-ai] [--restart]
+
+PDFs are parsed on a process pool, links are resolved with bounded
+concurrency across the whole chunk, and the fields local extraction cannot
+find are requested from Gemini with several resumes packed into each
+request, paced to stay under the requests-per-minute limit. Records are
+appended as they finish; rerunning with the same output file skips the
+resumes already written with status "ok" and retries the others (the
+last record for an id wins).
+"""
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import threading
+import argparse
+import tarfile
+import zipfile
+import logging
+import json
+import time
+import os
+
+from pdf_ingest import ingest_pdf
+from link_resolver import resolve_urls, categorize_resolved
+from local_extraction import EXTRACTION_FIELDS, LOCAL_FIELDS, extract_local_fields, local_fallbacks, merge_fields
+from resume_text import PROMPT_TOKEN_BUDGET, estimate_tokens, prepare_resume_text
+from resume_extraction import (
+    FIELD_EXAMPLES, extraction_cache_key, get_extraction_cache, extract_resume_data, is_valid_value,
+    response_schema,
+)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+BATCH_WORKERS = int(os.getenv("FORMPILOT_BATCH_WORKERS", str(os.cpu_count() or 2)))
+BATCH_CHUNK_SIZE = int(os.getenv("FORMPILOT_BATCH_CHUNK_SIZE", "32"))
+GEMINI_RPM = float(os.getenv("FORMPILOT_GEMINI_RPM", "15"))
+# Resume text packed into one Gemini request, in estimated tokens, and resumes per request
+PACK_TOKENS = int(os.getenv("FORMPILOT_BATCH_PACK_TOKENS", "6000"))
+PACK_SIZE = int(os.getenv("FORMPILOT_BATCH_PACK_SIZE", "8"))
+QUOTA_RETRIES = 3
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2')
+
+
+class RateLimiter:
+    """Blocks so that at most `per_minute` calls start in any 60 second window"""
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self.calls = deque()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self.calls and now - self.calls[0] >= 60:
+                    self.calls.popleft()
+                if len(self.calls) < self.per_minute:
+                    self.calls.append(now)
+                    return
+                delay = 60 - (now - self.calls[0])
+            time.sleep(delay)
+
+
+class PacedModel:
+    """Wraps a model so every generate_content call takes its own rate limiter slot"""
+
+    def __init__(self, model, limiter):
+        self.model = model
+        self.limiter = limiter
+        self.requests = 0
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def generate_content(self, *args, **kwargs):
+        self.limiter.wait()
+        self.requests += 1
+        return self.model.generate_content(*args, **kwargs)
+
+
+class StageStats:
+    """Items and seconds per pipeline stage"""
+
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, stage, items, seconds):
+        entry = self.stages.setdefault(stage, {'items': 0, 'seconds': 0.0})
+        entry['items'] += items
+        entry['seconds'] += seconds
+
+    def report(self):
+        return {
+            stage: dict(entry, per_second=entry['items'] / entry['seconds'] if entry['seconds'] else None)
+            for stage, entry in self.stages.items()
+        }
+
+
+def discover_jobs(source):
+    """One job per PDF in a directory (recursively) or in a zip/tar archive"""
+    if os.path.isdir(source):
+        jobs = []
+        for root, _, files in os.walk(source):
+            for name in files:
+                if name.lower().endswith('.pdf'):
+                    path = os.path.join(root, name)
+                    jobs.append({'id': os.path.relpath(path, source), 'path': path})
+        return sorted(jobs, key=lambda job: job['id'])
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            names = [info.filename for info in archive.infolist()
+                     if not info.is_dir() and info.filename.lower().endswith('.pdf')]
+        return [{'id': name, 'archive': source, 'member': name} for name in sorted(names)]
+    if source.lower().endswith(ARCHIVE_SUFFIXES) and tarfile.is_tarfile(source):
+        with tarfile.open(source) as archive:
+            names = [member.name for member in archive.getmembers()
+                     if member.isfile() and member.name.lower().endswith('.pdf')]
+        return [{'id': name, 'archive': source, 'member': name} for name in sorted(names)]
+    raise ValueError(f"Not a directory or a zip/tar archive of PDFs: {source}")
+
+
+def job_inputs(jobs):
+    """Jobs as ingest_job takes them, with tar members already read into 'data'.
+
+    A compressed tar cannot seek, so opening it per member rescans the
+    archive from the start each time; instead each tar is streamed once, in
+    archive order, here in the parent. Zip members are opened per job.
+    """
+    tar_jobs = {}
+    zips = {}
+    for job in jobs:
+        if 'archive' in job:
+            if job['archive'] not in zips:
+                zips[job['archive']] = zipfile.is_zipfile(job['archive'])
+            if not zips[job['archive']]:
+                tar_jobs.setdefault(job['archive'], {})[job['member']] = job
+                continue
+        yield job
+    for archive_path, members in tar_jobs.items():
+        with tarfile.open(archive_path, 'r|*') as archive:
+            for member in archive:
+                job = members.get(member.name)
+                if job is not None and member.isfile():
+                    yield dict(job, data=archive.extractfile(member).read())
+
+
+def bounded_map(executor, fn, items, window):
+    """executor.map that keeps at most `window` items in flight, so `items` is consumed lazily"""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def ingest_job(job):
+    """Process pool worker: parse one PDF; returns (job, document, error, seconds)"""
+    started = time.monotonic()
+    job = dict(job)
+    data = job.pop('data', None)
+    try:
+        if data is not None:
+            document = ingest_pdf(data)
+        elif 'path' in job:
+            document = ingest_pdf(job['path'])
+        else:
+            with zipfile.ZipFile(job['archive']) as archive:
+                document = ingest_pdf(archive.read(job['member']))
+        return job, document, None, time.monotonic() - started
+    except Exception as e:
+        return job, None, f"{type(e).__name__}: {e}", time.monotonic() - started
+
+
+def load_checkpoint(output_path):
+    """Ids already written successfully to the output JSONL"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding='utf-8') as output:
+        for line in output:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut off by an interrupted run
+            if record.get('status') == 'ok':
+                done.add(record['id'])
+    return done
+
+
+def packed_prompt(items, fields):
+    """One prompt covering several resumes; the answer is a JSON array in the same order"""
+    structure = json.dumps(dict({'id': 'resume id'}, **{field: FIELD_EXAMPLES[field] for field in fields}), indent=4)
+    resumes = "\n\n".join(
+        f"=== Resume id: {item['id']} ===\n{item['text']}\nExtracted Links: {json.dumps(item['links'])}"
+        for item in items
+    )
+    return f"""
+    Extract information from each resume below and return ONLY a JSON array with one object per resume,
+    in the same order, each carrying the resume's id.
+    {resumes}
+    Each object has this structure with actual values:
+    {structure}
+    IMPORTANT:
+    - Use the extracted links provided with each resume - they are actual clickable URLs
+    - Use "N/A" for missing info, empty arrays [] for missing lists
+    """
+
+
+def packed_config(fields):
+    item_schema = response_schema(fields)
+    item_schema['properties'] = dict({'id': {"type": "string"}}, **item_schema['properties'])
+    item_schema['required'] = ['id'] + item_schema['required']
+    return {"response_mime_type": "application/json", "response_schema": {"type": "array", "items": item_schema}}
+
+
+def make_packs(items):
+    """Group resumes into requests bounded by PACK_TOKENS of text and PACK_SIZE resumes"""
+    packs, current, tokens = [], [], 0
+    for item in items:
+        cost = estimate_tokens(item['text'])
+        if current and (tokens + cost > PACK_TOKENS or len(current) >= PACK_SIZE):
+            packs.append(current)
+            current, tokens = [], 0
+        current.append(item)
+        tokens += cost
+    if current:
+        packs.append(current)
+    return packs
+
+
+def request_pack(model, limiter, pack):
+    """Send one packed request; returns {id: valid fields}. Quota errors back off and retry."""
+    fields = [field for field in EXTRACTION_FIELDS if any(field in item['needed'] for item in pack)]
+    for attempt in range(QUOTA_RETRIES + 1):
+        limiter.wait()
+        try:
+            response = model.generate_content(packed_prompt(pack, fields), generation_config=packed_config(fields))
+            answers = json.loads(response.text)
+            break
+        except json.JSONDecodeError as e:
+            logger.warning(f"Packed response was not valid JSON: {str(e)}")
+            return {}
+        except Exception as e:
+            if ('quota' not in str(e).lower() and '429' not in str(e)) or attempt == QUOTA_RETRIES:
+                logger.warning(f"Packed extraction failed: {str(e)}")
+                return {}
+            time.sleep(2 ** attempt * 10)
+    results = {}
+    for answer in answers if isinstance(answers, list) else []:
+        if isinstance(answer, dict) and answer.get('id') is not None:
+            results[str(answer['id'])] = {field: value for field, value in answer.items()
+                                          if field in EXTRACTION_FIELDS and is_valid_value(field, value)}
+    return results
+
+
+def extract_chunk(items, model, limiter, stats):
+    """Fill items' 'data' from cache, packed requests, and single re-requests for stragglers"""
+    cache = get_extraction_cache()
+    pending = []
+    started = time.monotonic()
+    for item in items:
+        item['local'] = extract_local_fields(item['document'].pages, item['links'])
+        item['fallbacks'] = local_fallbacks(item['document'].pages, item['links'])
+        item['needed'] = [field for field in EXTRACTION_FIELDS if field not in item['local']]
+        cached = cache.get(extraction_cache_key(item['document'].sha256, model.model_name, item['needed'])) \
+            if model and item['needed'] else None
+        if not item['needed'] or model is None or cached is not None:
+            item['data'] = merge_fields(item['fallbacks'], cached or {}, item['local'])
+        else:
+            item['text'] = prepare_resume_text(item['document'].pages, PROMPT_TOKEN_BUDGET)
+            pending.append(item)
+
+    requests_sent = 0
+    # Single re-requests can take two calls (a re-ask for invalid fields), each paced on its own
+    paced = PacedModel(model, limiter)
+    for pack in make_packs(pending):
+        answers = request_pack(model, limiter, pack)
+        requests_sent += 1
+        for item in pack:
+            answer = {field: value for field, value in answers.get(item['id'], {}).items() if field in item['needed']}
+            if len(answer) == len(item['needed']):
+                cache.set(extraction_cache_key(item['document'].sha256, model.model_name, item['needed']), answer)
+                item['data'] = merge_fields(item['fallbacks'], answer, item['local'])
+                continue
+            # Missing from the pack's answer: ask for this resume alone
+            try:
+                item['data'], _ = extract_resume_data(paced, item['document'].sha256, item['document'].pages,
+                                                      item['links'])
+            except Exception as e:
+                item['error'] = f"{type(e).__name__}: {e}"
+                item['data'] = merge_fields(item['fallbacks'], answer, item['local'])
+    requests_sent += paced.requests
+    stats.add('extract', len(items), time.monotonic() - started)
+    stats.add('gemini_requests', requests_sent, time.monotonic() - started)
+
+
+def resolve_chunk(items, stats):
+    """Resolve every link of the chunk in one bounded-concurrency pass and categorize per resume"""
+    started = time.monotonic()
+    all_urls = [url for item in items for url in item['document'].urls]
+    resolved = resolve_urls(all_urls)
+    for item in items:
+        item['links'] = categorize_resolved(item['document'].urls, resolved)
+    stats.add('resolve', len(items), time.monotonic() - started)
+
+
+def write_record(output, item):
+    data = item.get('data') or {}
+    # Resolved, categorized annotation links win over anything the model wrote
+    for link_type, link_url in item.get('links', {}).items():
+        if link_type in LOCAL_FIELDS:
+            data[link_type] = link_url
+    record = {
+        'id': item['id'],
+        'status': 'error' if item.get('error') else 'ok',
+        'sha256': item['document'].sha256 if item.get('document') else None,
+        'pages': item['document'].page_count if item.get('document') else None,
+        'data': data,
+        'error': item.get('error'),
+    }
+    output.write(json.dumps(record) + "\n")
+    output.flush()
+
+
+def process_chunk(output, items, model, limiter, stats):
+    resolve_chunk(items, stats)
+    extract_chunk(items, model, limiter, stats)
+    for item in items:
+        write_record(output, item)
+
+
+def run_batch(source, output_path, workers=BATCH_WORKERS, use_ai=True, restart=False,
+              chunk_size=BATCH_CHUNK_SIZE, rpm=GEMINI_RPM):
+    """Process every PDF under `source` into `output_path` (JSONL); returns a summary with stage throughput"""
+    jobs = discover_jobs(source)
+    done = set() if restart else load_checkpoint(output_path)
+    todo = [job for job in jobs if job['id'] not in done]
+    logger.info(f"{len(jobs)} PDFs found, {len(jobs) - len(todo)} already done, {len(todo)} to process")
+
+    model = None
+    if use_ai:
+        from gemini_client import get_gemini_client
+        model = get_gemini_client()
+    limiter = RateLimiter(rpm)
+    stats = StageStats()
+    summary = {'found': len(jobs), 'skipped': len(jobs) - len(todo), 'processed': 0, 'failed': 0}
+    started = time.monotonic()
+
+    with open(output_path, 'w' if restart else 'a', encoding='utf-8') as output, \
+            ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = bounded_map(executor, ingest_job, job_inputs(todo), max(1, workers) * 4)
+        chunk, ingest_started = [], time.monotonic()
+        for job, document, error, seconds in results:
+            item = {'id': job['id'], 'document': document, 'error': error}
+            if document is None:
+                write_record(output, item)
+                summary['failed'] += 1
+            else:
+                chunk.append(item)
+            if len(chunk) >= chunk_size:
+                stats.add('ingest', len(chunk), time.monotonic() - ingest_started)
+                process_chunk(output, chunk, model, limiter, stats)
+                summary['processed'] += len(chunk)
+                chunk, ingest_started = [], time.monotonic()
+        if chunk:
+            stats.add('ingest', len(chunk), time.monotonic() - ingest_started)
+            process_chunk(output, chunk, model, limiter, stats)
+            summary['processed'] += len(chunk)
+
+    summary['seconds'] = time.monotonic() - started
+    summary['stages'] = stats.report()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="Directory of PDFs or a .zip/.tar archive")
+    parser.add_argument("-o", "--output", default="records.jsonl", help="JSONL file to append records to")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="PDF parsing processes")
+    parser.add_argument("--rpm", type=float, default=GEMINI_RPM, help="Gemini requests per minute")
+    parser.add_argument("--no-ai", action="store_true", help="Local extraction only; never call Gemini")
+    parser.add_argument("--restart", action="store_true", help="Ignore and overwrite an existing output file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    summary = run_batch(args.source, args.output, workers=args.workers, use_ai=not args.no_ai,
+                        restart=args.restart, rpm=args.rpm)
+    print(f"{summary['processed']} processed, {summary['failed']} failed, {summary['skipped']} skipped "
+          f"in {summary['seconds']:.1f}s")
+    for stage, entry in summary['stages'].items():
+        rate = f"{entry['per_second']:.2f}/s" if entry['per_second'] else "-"
+        print(f"  {stage:<16} {entry['items']:>6} in {entry['seconds']:>7.1f}s  {rate}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Speed and correctness of the resume link/contact extraction.
+
+Usage: python benchmarks/bench_contact_scan.py [--repeat N]
+
+Checks contact_patterns against the corpus in fixtures/resume_links.json
+(exits non-zero on any mismatch), reports how the previous per-pattern
+implementation scores on the same corpus, then times both on text blobs
+of growing size.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS = os.path.join(ROOT, "benchmarks", "fixtures", "resume_links.json")
+sys.path.insert(0, ROOT)
+
+from contact_patterns import extract_links_from_text, scan  # noqa: E402
+
+RESUME_CHUNK = (
+    "Jane Doe — Senior Engineer\njane.doe@example.com | +1 555 010 0199 | Berlin\n"
+    "Built test harnesses and data pipelines at Acme Corp 2015 - 2019; led a team of five.\n"
+    "Worked with Python, Selenium, PostgreSQL and Kubernetes across several www-facing products.\n"
+)
+RESUME_LINKS = "linkedin.com/in/jane-doe github.com/janedoe https://janedoe.dev\n"
+HEADER_FILE_LINKS = "drive.google.com/file/d/cv dropbox.com/s/cv/resume.pdf\n"
+
+
+def legacy_extract_links_from_text(text):
+    """The implementation this module replaced, kept verbatim for comparison"""
+    links = {}
+
+    text = re.sub(r'([a-zA-Z])([www\.])', r'\1 \2', text)
+    text = re.sub(r'([a-zA-Z])(https?://)', r'\1 \2', text)
+
+    patterns = {
+        'linkedin': [
+            r'linkedin\.com/in/[\w\-\.%]+',
+            r'https?://(?:www\.)?linkedin\.com/in/[\w\-\.%]+',
+            r'linkedin:?\s*[\w\-\.%/]+',
+        ],
+        'github': [
+            r'github\.com/[\w\-\.]+',
+            r'https?://(?:www\.)?github\.com/[\w\-\.]+',
+        ],
+        'email': [
+            r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
+        ]
+    }
+
+    for link_type, pattern_list in patterns.items():
+        for pattern in pattern_list:
+            matches = re.findall(pattern, text, re.IGNORECASE)
+            if matches:
+                url = matches[0]
+                if link_type in ['linkedin', 'github'] and not url.startswith('http'):
+                    url = 'https://' + url
+                links[link_type] = url
+                break
+
+    return links
+
+
+def check_corpus():
+    with open(CORPUS, encoding="utf-8") as corpus_file:
+        corpus = json.load(corpus_file)
+    failures = []
+    legacy_correct = 0
+    for case in corpus["links"]:
+        got = extract_links_from_text(case["text"])
+        if got != case["expected"]:
+            failures.append((case["text"], case["expected"], got))
+        legacy = legacy_extract_links_from_text(case["text"])
+        legacy_correct += all(legacy.get(key) == value for key, value in case["expected"].items())
+    for case in corpus["scan"]:
+        got = [[match.kind, match.value] for match in scan(case["text"])]
+        if got != case["expected"]:
+            failures.append((case["text"], case["expected"], got))
+        # Offsets must point back at the matched text (normalization only adds a scheme)
+        for match in scan(case["text"]):
+            if case["text"][match.start:match.end].rstrip('.;:!?') not in match.value:
+                failures.append((case["text"], "offsets", match))
+
+    print(f"Corpus: {len(corpus['links'])} link cases, {len(corpus['scan'])} scan cases")
+    print(f"  legacy extractor correct on {legacy_correct}/{len(corpus['links'])} link cases")
+    for text, expected, got in failures:
+        print(f"  FAIL {text!r}\n       expected {expected}\n       got      {got}")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    ok = check_corpus()
+
+    print(f"\n{'size':>8} {'legacy ms':>10} {'first ms':>9} {'top ms':>8} {'scan ms':>8} {'matches':>8}")
+    for chunks in (10, 100, 1000, 10000):
+        # Links only at the end: the worst case for first-match-per-pattern code
+        blob = RESUME_CHUNK * chunks + RESUME_LINKS
+        # Every kind of link in the header: extract_links_from_text stops early
+        top = RESUME_LINKS + HEADER_FILE_LINKS + RESUME_CHUNK * chunks
+        timings = {
+            name: min(timeit.repeat(lambda: func(text), number=1, repeat=args.repeat)) * 1000
+            for name, func, text in (("legacy", legacy_extract_links_from_text, blob),
+                                     ("first", extract_links_from_text, blob),
+                                     ("top", extract_links_from_text, top), ("scan", scan, blob))
+        }
+        print(f"{len(blob) // 1024:>6}KB {timings['legacy']:>10.2f} {timings['first']:>9.2f} "
+              f"{timings['top']:>8.2f} {timings['scan']:>8.2f} {len(scan(blob)):>8}")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""End-to-end fill time on the local fixture forms, with fixed sleeps vs. readiness waits.
+
+Usage: python benchmarks/bench_fill_waits.py [--rounds N]
+
+The "fixed" mode swaps the wait helpers used by main.py for the hard-coded
+sleeps they replaced, so both modes run the same filler code. Every run
+gets empty form-schema and click-strategy caches, so neither mode nor a
+repeat is sped up by what an earlier run learned.
+"""
+import argparse
+import functools
+import http.server
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "forms")
+sys.path.insert(0, ROOT)
+
+import main as app  # noqa: E402  (runs the Streamlit script in bare mode)
+from page_waits import wait_for_document_ready  # noqa: E402
+from form_schema_cache import FormSchemaCache  # noqa: E402
+from sqlite_cache import SQLiteCache  # noqa: E402
+from submit_engine import ClickStrategyMemory  # noqa: E402
+
+PROFILE = {
+    "name": "Jane Doe",
+    "email": "jane.doe@example.com",
+    "phone": "+1 555 0100",
+    "address": "Springfield",
+    "skills": ["Python", "Selenium"],
+    "experience": ["Engineer at Example Corp"],
+    "education": ["BSc Computer Science"],
+    "linkedin": "https://www.linkedin.com/in/janedoe",
+    "github": "https://github.com/janedoe",
+}
+
+
+def fixed_sleep_waits():
+    """The hard-coded sleeps main.py used before the readiness waits"""
+    def page_ready(driver, url=None):
+        time.sleep(5)
+        return wait_for_document_ready(driver, 10)
+
+    def value_committed(driver, element, value, timeout=None):
+        time.sleep(0.5)
+        return element.get_attribute('value') == value
+
+    def scroll(driver, element):
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+        time.sleep(1)
+
+    def click_effect(driver, timeout=None):
+        # The old post-click sleep; reporting no effect keeps wait_for_post_action from adding to it
+        time.sleep(5)
+        return None
+
+    return {
+        "wait_for_page_ready": page_ready,
+        "wait_for_dom_quiet": lambda driver, *a, **k: time.sleep(3),
+        "wait_for_post_action": lambda driver, *a, **k: time.sleep(5),
+        "wait_for_value_committed": value_committed,
+        "scroll_into_view": scroll,
+        "wait_for_click_effect": click_effect,
+    }
+
+
+def fresh_caches(directory):
+    """Cache getters for main.py backed by empty databases in `directory`"""
+    schemas = FormSchemaCache(SQLiteCache(os.path.join(directory, "form_schemas.sqlite3")))
+    clicks = ClickStrategyMemory(SQLiteCache(os.path.join(directory, "click_strategies.sqlite3")))
+    return {"get_form_schema_cache": lambda: schemas, "get_click_strategy_memory": lambda: clicks}
+
+
+def serve_fixtures():
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=FIXTURES)
+    handler.log_message = lambda *args: None
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_mode(base_url, forms, rounds, patches):
+    names = list(patches) + ["get_form_schema_cache", "get_click_strategy_memory"]
+    originals = {name: getattr(app, name) for name in names}
+    for name, func in patches.items():
+        setattr(app, name, func)
+    try:
+        timings = {}
+        for form in forms:
+            samples = []
+            for _ in range(rounds):
+                data = dict(PROFILE, form_url=f"{base_url}/{form}")
+                with tempfile.TemporaryDirectory(prefix="formpilot-bench-") as cache_dir:
+                    for name, func in fresh_caches(cache_dir).items():
+                        setattr(app, name, func)
+                    start = time.perf_counter()
+                    # The HTTP-only path would skip the browser waits being measured
+                    app.EnhancedWebFormFillerTool(http_fast_path=False)._run(json.dumps(data))
+                    samples.append(time.perf_counter() - start)
+            timings[form] = statistics.median(samples)
+        return timings
+    finally:
+        for name, func in originals.items():
+            setattr(app, name, func)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    server = serve_fixtures()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    forms = sorted(f for f in os.listdir(FIXTURES) if f.endswith(".html") and f != "thanks.html")
+
+    # Warm the driver pool so session start-up is not counted
+    with app.get_driver_pool().session():
+        pass
+
+    before = run_mode(base_url, forms, args.rounds, fixed_sleep_waits())
+    after = run_mode(base_url, forms, args.rounds, {})
+    server.shutdown()
+
+    print(f"{'form':<24}{'fixed sleeps (s)':>18}{'readiness waits (s)':>22}{'speed-up':>10}")
+    for form in forms:
+        print(f"{form:<24}{before[form]:>18.2f}{after[form]:>22.2f}{before[form] / after[form]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
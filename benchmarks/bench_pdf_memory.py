@@ -0,0 +1,107 @@
+"""Peak memory of PDF ingestion on generated 1-, 20- and 200-page resumes.
+
+Usage: python benchmarks/bench_pdf_memory.py [--pages 1 20 200]
+
+"whole" mimics the old upload path: copy the upload into a temp file, read
+every page's text into one string and open the file again for links.
+"streaming" is pdf_ingest.ingest_pdf on the upload buffer. Each measurement
+runs in a fresh interpreter and reports the peak RSS growth over the RSS
+after the upload was loaded into memory.
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fitz  # noqa: E402
+
+PARAGRAPH = (
+    "Senior software engineer with experience in Python, distributed systems and "
+    "web automation. Led a team of five building data pipelines and form tooling. "
+)
+
+
+def build_fixture(path, pages):
+    """A portfolio-style PDF: a text block, a link and an incompressible image on every page"""
+    document = fitz.open()
+    for number in range(pages):
+        page = document.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 550, 400), f"Page {number + 1}\n" + PARAGRAPH * 12, fontsize=9)
+        page.insert_link({
+            'kind': fitz.LINK_URI,
+            'from': fitz.Rect(50, 410, 300, 425),
+            'uri': f"https://example.com/portfolio/{number}",
+        })
+        image = fitz.Pixmap(fitz.csRGB, 256, 256, os.urandom(256 * 256 * 3), 0)
+        page.insert_image(fitz.Rect(50, 440, 306, 696), pixmap=image)
+    document.save(path)
+    document.close()
+
+
+def current_rss_kb():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def measure(mode, path):
+    """Run inside the child interpreter; prints 'peak_growth_kb pages chars links'"""
+    import io
+    from pdf_ingest import ingest_pdf
+
+    with open(path, 'rb') as pdf_file:
+        upload = io.BytesIO(pdf_file.read())
+    baseline = current_rss_kb()
+
+    if mode == "whole":
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+            tmp_file.write(upload.getvalue())
+            temp_pdf_path = tmp_file.name
+        text = ""
+        with fitz.open(temp_pdf_path) as pdf_document:
+            for page in pdf_document:
+                text += page.get_text() + "\n"
+        with fitz.open(temp_pdf_path) as pdf_document:
+            pages = len(pdf_document)
+            links = [link.get('uri') for page in pdf_document for link in page.get_links()]
+        os.unlink(temp_pdf_path)
+    else:
+        document = ingest_pdf(upload)
+        text, pages, links = document.text, document.page_count, document.urls
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(max(peak - baseline, 0), pages, len(text), len(links))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 20, 200])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as fixtures:
+        print(f"{'pages':>6} {'size MB':>8} {'whole MB':>9} {'stream MB':>10} {'chars read':>18}")
+        for pages in args.pages:
+            path = os.path.join(fixtures, f"resume_{pages}.pdf")
+            build_fixture(path, pages)
+            results = {}
+            for mode in ("whole", "streaming"):
+                output = subprocess.run(
+                    [sys.executable, __file__, "--measure", mode, path],
+                    check=True, capture_output=True, text=True, cwd=ROOT,
+                ).stdout.splitlines()[-1].split()  # MuPDF may print warnings first
+                results[mode] = [int(value) for value in output]
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            print(f"{pages:>6} {size_mb:>8.1f} {results['whole'][0] / 1024:>9.1f} "
+                  f"{results['streaming'][0] / 1024:>10.1f} "
+                  f"{results['whole'][2]:>8} -> {results['streaming'][2]:<8}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--measure":
+        measure(sys.argv[2], sys.argv[3])
+    else:
+        main()
@@ -0,0 +1,102 @@
+"""Prompt tokens and fact coverage of the resume text sent to Gemini.
+
+Usage: python benchmarks/bench_prompt_window.py [--resumes N] [--budget TOKENS]
+
+Builds a synthetic corpus of short and long multi-page resumes (repeated
+headers/footers, padded whitespace, sections in varying order) and compares
+the old `pdf_text[:3000]` cut with resume_text.prepare_resume_text. Coverage
+is the share of known facts (name, email, phone, degree, school, skills,
+latest job title) that survive into the prompt text.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from resume_text import PROMPT_TOKEN_BUDGET, estimate_tokens, prepare_resume_text  # noqa: E402
+
+FIRST_NAMES = ["Jane", "Arjun", "Maria", "Wei", "Tomasz", "Aisha", "Lucas", "Priya"]
+LAST_NAMES = ["Doe", "Sharma", "Garcia", "Zhang", "Kowalski", "Okafor", "Silva", "Nair"]
+TITLES = ["Backend Engineer", "Data Scientist", "QA Automation Lead", "Platform Engineer", "ML Engineer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries"]
+SKILLS = ["Python", "Selenium", "Kubernetes", "PostgreSQL", "TensorFlow", "Go", "React", "Terraform",
+          "Airflow", "Spark", "Docker", "GraphQL"]
+SCHOOLS = ["University of Pune", "MIT", "TU Munich", "University of Lagos", "NUS", "UC Berkeley"]
+DEGREES = ["BSc Computer Science", "MSc Data Science", "BEng Electronics", "MTech Software Systems"]
+BULLET = ("Designed and shipped {thing} used by {n} internal teams, cutting turnaround by {p}% "
+          "while mentoring junior engineers and owning the on-call rotation.")
+
+
+def build_resume(rng, jobs):
+    """Page texts plus the facts an extraction must recover"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    email = name.lower().replace(" ", ".") + "@example.com"
+    phone = f"+1 555 {rng.randint(1000, 9999)}"
+    skills = rng.sample(SKILLS, 5)
+    degree, school = rng.choice(DEGREES), rng.choice(SCHOOLS)
+    titles = [rng.choice(TITLES) for _ in range(jobs)]
+
+    contact = [name, f"{email}   |   {phone}", "https://www.linkedin.com/in/" + name.lower().replace(" ", "")]
+    summary = ["SUMMARY", "Engineer focused on reliable automation and data systems. " * 2]
+    experience = ["PROFESSIONAL EXPERIENCE"]
+    for title in titles:
+        experience.append(f"{title} — {rng.choice(COMPANIES)}    {rng.randint(2010, 2024)}")
+        experience.extend(
+            "  • " + BULLET.format(thing=rng.choice(["a pipeline", "a test harness", "an API"]),
+                                   n=rng.randint(2, 40), p=rng.randint(10, 80))
+            for _ in range(rng.randint(3, 6))
+        )
+    education = ["Education:", f"{degree}, {school}, {rng.randint(2005, 2020)}"]
+    skill_lines = ["Technical Skills", ", ".join(skills)]
+    body_sections = [summary, experience, education, skill_lines]
+    if rng.random() < 0.5:
+        body_sections = [summary, skill_lines, experience, education]
+
+    lines = contact + [""] + [line for section in body_sections for line in section + [""]]
+    per_page = 45
+    chunks = [lines[i:i + per_page] for i in range(0, len(lines), per_page)]
+    header = f"{name} — Curriculum Vitae"
+    pages = []
+    for number, chunk in enumerate(chunks, 1):
+        top = [header] if number > 1 else []
+        pages.append("\n".join(top + chunk + ["", header, f"Page {number} of {len(chunks)}"]))
+    facts = [name, email, phone, degree, school, titles[0]] + skills
+    return pages, facts
+
+
+def coverage(text, facts):
+    text = " ".join(text.lower().split())
+    return sum(1 for fact in facts if " ".join(fact.lower().split()) in text) / len(facts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=PROMPT_TOKEN_BUDGET)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = {"truncate": {"tokens": [], "coverage": []}, "window": {"tokens": [], "coverage": []}}
+    for index in range(args.resumes):
+        pages, facts = build_resume(rng, jobs=1 + index % 8)
+        truncated = "".join(page + "\n" for page in pages)[:3000]
+        windowed = prepare_resume_text(pages, args.budget)
+        for mode, text in (("truncate", truncated), ("window", windowed)):
+            results[mode]["tokens"].append(estimate_tokens(text))
+            results[mode]["coverage"].append(coverage(text, facts))
+
+    print(f"{args.resumes} resumes, window budget {args.budget} tokens")
+    print(f"{'mode':>9} {'mean tokens':>12} {'p95 tokens':>11} {'mean coverage':>14} {'min coverage':>13}")
+    for mode, values in results.items():
+        tokens = sorted(values["tokens"])
+        print(f"{mode:>9} {statistics.mean(tokens):>12.0f} {tokens[int(len(tokens) * 0.95) - 1]:>11} "
+              f"{statistics.mean(values['coverage']):>14.1%} {min(values['coverage']):>13.1%}")
+
+
+if __name__ == "__main__":
+    main()
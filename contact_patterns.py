@@ -0,0 +1,105 @@
+from collections import namedtuple
+import logging
+import re
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# One scan finds every kind; at a given position the first alternative wins,
+# so emails are tried before URLs (x@github.com is an email, not a link).
+# The leading lookahead rejects positions no alternative can start at.
+# Phone numbers are either one unbroken 7-15 digit run or 2-5 digit groups.
+SCAN_PATTERN = re.compile(
+    r"(?=[\w.%+(-])(?:"
+    r"(?P<email>(?<![\w.%+-])[\w.%+-]+@[a-z0-9.-]+\.[a-z]{2,})"
+    r"|(?P<url>(?:https?://|www\.)[^\s<>\"'()|,]+)"
+    r"|(?P<bare>(?:linkedin\.com/in|github\.com|drive\.google\.com|dropbox\.com)/[\w\-.%/?=&]+)"
+    r"|(?P<handle_label>linkedin\s*:\s*)(?!https?:|www\.|linkedin\.com)(?P<handle>[\w\-]{3,100})"
+    r"|(?P<phone>(?<![\w+])(?:\+\d{1,3}[\s.-]?)?"
+    r"(?:\d{7,15}|(?:\(\d{1,4}\)[\s.-]?)?\d{2,5}(?:[\s.-]\d{2,5}){0,4})(?!\w)))",
+    re.IGNORECASE
+)
+# Everything extract_links_from_text reports; it stops scanning once it has all of them
+LINK_KEYS = ('email', 'linkedin', 'github', 'google_drive', 'dropbox')
+
+_NON_DIGITS = re.compile(r"\D")
+_PHONE_GROUPS = re.compile(r"[\s.\-()]+")
+_YEAR = re.compile(r"^(?:19|20)\d\d$")
+
+ContactMatch = namedtuple("ContactMatch", ["kind", "value", "start", "end", "category"])
+
+
+def categorize_link(url):
+    """Categorize a URL based on its domain"""
+    url_lower = url.lower()
+
+    if 'linkedin.com' in url_lower and ('/in/' in url_lower or '/profile/' in url_lower):
+        return 'linkedin'
+    elif 'github.com' in url_lower:
+        return 'github'
+    elif 'drive.google.com' in url_lower:
+        return 'google_drive'
+    elif 'dropbox.com' in url_lower:
+        return 'dropbox'
+
+    return None
+
+
+def is_phone_number(candidate):
+    """8-15 digits, at least 10 without a country code, and not a run of years"""
+    digits = _NON_DIGITS.sub("", candidate)
+    if not 8 <= len(digits) <= 15:
+        return False
+    if candidate.startswith('+'):
+        return True
+    if len(digits) < 10:
+        return False
+    groups = [group for group in _PHONE_GROUPS.split(candidate) if group]
+    return candidate.startswith('(') or not all(_YEAR.match(group) for group in groups)
+
+
+def _contact(match):
+    """ContactMatch for a SCAN_PATTERN match, or None for a digit run that is not a phone number"""
+    kind = match.lastgroup
+    if kind == 'email':
+        return ContactMatch('email', match.group(), match.start(), match.end(), None)
+    if kind == 'phone':
+        value = match.group().strip()
+        return ContactMatch('phone', value, match.start(), match.end(), None) if is_phone_number(value) else None
+    if kind == 'handle':
+        start = match.start('handle')
+        url = 'https://www.linkedin.com/in/' + match.group('handle')
+    else:
+        start = match.start()
+        url = match.group().rstrip('.;:!?')
+        if not url.lower().startswith('http'):
+            url = 'https://' + url
+    return ContactMatch('url', url, start, match.end(), categorize_link(url))
+
+
+def scan(text):
+    """Every email, phone number and link in the text, in order, with offsets.
+
+    Links are normalized to https:// URLs and carry their category
+    (linkedin, github, google_drive, dropbox, or None).
+    """
+    return [contact for contact in map(_contact, SCAN_PATTERN.finditer(text)) if contact is not None]
+
+
+def extract_links_from_text(text):
+    """First email and first link of each category found in the text.
+
+    The scan stops early only once every category has been found, so the
+    result is the same as picking from the full scan.
+    """
+    links = {}
+    for match in SCAN_PATTERN.finditer(text):
+        if match.lastgroup == 'phone':
+            continue
+        contact = _contact(match)
+        key = 'email' if contact.kind == 'email' else contact.category
+        if key and key not in links:
+            links[key] = contact.value
+            if all(wanted in links for wanted in LINK_KEYS):
+                break
+    return links
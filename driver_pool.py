@@ -0,0 +1,270 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from driver_resolver import chrome_service
+from resource_blocking import enable_performance_log, install as install_resource_blocking
+from contextlib import contextmanager
+import threading
+import logging
+import atexit
+import time
+import os
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.getenv("FORMPILOT_DRIVER_POOL_SIZE", "2"))
+MAX_USES = int(os.getenv("FORMPILOT_DRIVER_MAX_USES", "20"))
+# Measured as the page's JS heap (performance.memory), not Chrome's process memory
+MAX_MEMORY_MB = float(os.getenv("FORMPILOT_DRIVER_MAX_MEMORY_MB", "512"))
+
+# Injected before any page script runs, so every navigation stays masked
+STEALTH_SCRIPT = """
+Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
+Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});
+"""
+
+
+def build_chrome_options(headless=True):
+    """Chrome options shared by every automated session"""
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_argument("--disable-web-security")
+    chrome_options.add_argument("--allow-running-insecure-content")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    chrome_bin = os.environ.get('CHROME_BIN')
+    if chrome_bin:
+        chrome_options.binary_location = chrome_bin
+    enable_performance_log(chrome_options)
+    return chrome_options
+
+
+def create_driver(headless=True):
+    """Launch a new Chrome session with the stealth patches and resource blocking applied"""
+    driver = webdriver.Chrome(service=chrome_service(), options=build_chrome_options(headless))
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": STEALTH_SCRIPT})
+    install_resource_blocking(driver)
+    return driver
+
+
+class _PooledDriver:
+    """Bookkeeping for one Chrome session owned by the pool"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """A fixed-size pool of warm Chrome sessions.
+
+    Sessions are checked out with `session()` (or `acquire()`/`release()`),
+    reset between uses and recycled after `max_uses` checkouts or once the
+    page's JS heap grows past `max_memory_mb`. A session counts against
+    `size` from launch until it has been quit, including while it is being
+    health-checked, reset or shut down.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_uses=MAX_USES, max_memory_mb=MAX_MEMORY_MB, headless=True):
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+        self.headless = headless
+        self._idle = []
+        self._in_use = {}
+        self._launching = 0
+        self._retiring = 0  # sessions checked out of _in_use that are being reset or quit
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def _live_count(self):
+        return len(self._idle) + len(self._in_use) + self._launching + self._retiring
+
+    def _launch(self):
+        """Start a session outside the lock; the caller reserved a slot"""
+        try:
+            entry = _PooledDriver(create_driver(self.headless))
+            logger.info("Launched pooled Chrome session")
+            return entry
+        finally:
+            with self._cond:
+                self._launching -= 1
+                self._cond.notify_all()
+
+    def warm(self):
+        """Pre-launch sessions until the pool is full"""
+        while True:
+            with self._cond:
+                if self._closed or self._live_count() >= self.size:
+                    return
+                self._launching += 1
+            try:
+                entry = self._launch()
+            except Exception as e:
+                logger.error(f"Failed to pre-launch Chrome session: {str(e)}")
+                return
+            with self._cond:
+                if self._closed:
+                    self._quit(entry)
+                    return
+                self._idle.append(entry)
+                self._cond.notify_all()
+
+    def warm_async(self):
+        """Pre-launch sessions on a background thread"""
+        threading.Thread(target=self.warm, name="driver-pool-warm", daemon=True).start()
+
+    def acquire(self, timeout=None):
+        """Check out a healthy session, launching one if a slot is free"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Driver pool is shut down")
+                if self._idle:
+                    entry = self._idle.pop()
+                    # Counted as in use while its health is checked outside the lock
+                    self._in_use[id(entry.driver)] = entry
+                elif self._live_count() < self.size:
+                    self._launching += 1
+                    entry = None
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a pooled Chrome session")
+                    self._cond.wait(remaining)
+                    continue
+            if entry is None:
+                entry = self._launch()
+                with self._cond:
+                    self._in_use[id(entry.driver)] = entry
+            elif not self._is_healthy(entry):
+                logger.warning("Discarding unhealthy pooled Chrome session")
+                with self._cond:
+                    del self._in_use[id(entry.driver)]
+                    self._retiring += 1
+                self._retire(entry)
+                continue
+            return entry.driver
+
+    def release(self, driver, discard=False):
+        """Return a session to the pool, recycling it when worn out"""
+        with self._cond:
+            entry = self._in_use.pop(id(driver), None)
+            if entry is None:
+                return
+            # Still holds its slot until it is idle again or has quit
+            self._retiring += 1
+        entry.uses += 1
+        if not discard and entry.uses >= self.max_uses:
+            logger.info(f"Recycling Chrome session after {entry.uses} uses")
+            discard = True
+        if not discard and self._js_heap_mb(entry.driver) > self.max_memory_mb:
+            logger.info("Recycling Chrome session after memory growth")
+            discard = True
+        if not discard and not self._reset(entry.driver):
+            discard = True
+        with self._cond:
+            if discard or self._closed:
+                keep = False
+            else:
+                self._retiring -= 1
+                self._idle.append(entry)
+                keep = True
+            self._cond.notify_all()
+        if not keep:
+            self._retire(entry)
+            if not self._closed:
+                self.warm_async()
+
+    @contextmanager
+    def session(self, timeout=None):
+        """Borrow a session for the duration of a `with` block"""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def shutdown(self):
+        """Quit every idle session and refuse new checkouts"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for entry in idle:
+            self._quit(entry)
+
+    def _is_healthy(self, entry):
+        try:
+            return bool(entry.driver.window_handles)
+        except Exception:
+            return False
+
+    def _js_heap_mb(self, driver):
+        """The current page's used JS heap (Chrome's performance.memory); 0 when unavailable.
+
+        This is a proxy for session growth, not the browser's process memory.
+        """
+        try:
+            used = driver.execute_script("return (performance.memory && performance.memory.usedJSHeapSize) || 0;")
+            return (used or 0) / (1024 * 1024)
+        except Exception:
+            return 0
+
+    def _reset(self, driver):
+        """Clear tabs, cookies and storage so the next borrower starts clean"""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            origin = driver.execute_script("return window.location.origin;")
+            if origin and origin != "null":
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to reset pooled Chrome session: {str(e)}")
+            return False
+
+    def _retire(self, entry):
+        """Quit a session counted in _retiring and free its slot"""
+        try:
+            self._quit(entry)
+        finally:
+            with self._cond:
+                self._retiring -= 1
+                self._cond.notify_all()
+
+    def _quit(self, entry):
+        try:
+            entry.driver.quit()
+        except Exception as e:
+            logger.error(f"Error quitting pooled driver: {str(e)}")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """Process-wide pool, created and warmed on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+            _pool.warm_async()
+            atexit.register(_pool.shutdown)
+        return _pool
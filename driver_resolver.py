@@ -0,0 +1,78 @@
+from selenium.webdriver.chrome.service import Service
+import threading
+import logging
+import shutil
+import glob
+import os
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Explicit path to a chromedriver binary; skips all lookups when set
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH", "")
+# Air-gapped hosts: never let webdriver-manager reach the network
+OFFLINE_ONLY = os.getenv("FORMPILOT_DRIVER_OFFLINE", "").lower() in ("1", "true", "yes")
+
+_resolved_path = None
+_resolve_lock = threading.Lock()
+
+
+def _find_local_driver():
+    """Look for an already-installed chromedriver on PATH or in the webdriver-manager cache"""
+    on_path = shutil.which("chromedriver")
+    if on_path:
+        return on_path
+    cache_roots = [os.path.join(os.getcwd(), ".wdm"), os.path.join(os.path.expanduser("~"), ".wdm")]
+    candidates = []
+    for root in cache_roots:
+        candidates.extend(glob.glob(os.path.join(root, "drivers", "chromedriver", "**", "chromedriver"), recursive=True))
+        candidates.extend(glob.glob(os.path.join(root, "drivers", "chromedriver", "**", "chromedriver.exe"), recursive=True))
+    candidates = [c for c in candidates if os.access(c, os.X_OK)]
+    if not candidates:
+        return None
+    return max(candidates, key=os.path.getmtime)
+
+
+def _resolve():
+    if CHROMEDRIVER_PATH:
+        if not os.path.exists(CHROMEDRIVER_PATH):
+            raise FileNotFoundError(f"CHROMEDRIVER_PATH does not exist: {CHROMEDRIVER_PATH}")
+        return CHROMEDRIVER_PATH
+    if OFFLINE_ONLY:
+        local = _find_local_driver()
+        if not local:
+            raise FileNotFoundError("Offline mode is on and no chromedriver was found on PATH or in the .wdm cache")
+        return local
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def resolve_chromedriver_path():
+    """Resolve the chromedriver binary once per process and cache the result"""
+    global _resolved_path
+    if _resolved_path:
+        return _resolved_path
+    with _resolve_lock:
+        if not _resolved_path:
+            _resolved_path = _resolve()
+            logger.info(f"Using chromedriver at {_resolved_path}")
+        return _resolved_path
+
+
+def chrome_service():
+    """A Service bound to the cached chromedriver binary"""
+    return Service(resolve_chromedriver_path())
+
+
+def warm_up(block=False):
+    """Resolve the driver binary ahead of the first request"""
+    def _run():
+        try:
+            resolve_chromedriver_path()
+        except Exception as e:
+            logger.error(f"ChromeDriver warm-up failed: {str(e)}")
+
+    if block:
+        _run()
+    else:
+        threading.Thread(target=_run, name="chromedriver-warm-up", daemon=True).start()
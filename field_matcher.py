@@ -0,0 +1,163 @@
+from collections import defaultdict
+import re
+
+# Words and phrases that identify each resume field on a form.
+# Multi-word phrases also match their joined form ("full name" -> "fullname").
+FIELD_SYNONYMS = {
+    'name': {'name': 1.0, 'full name': 1.5, 'your name': 1.5, 'first': 0.8, 'first name': 1.2,
+             'candidate name': 1.5, 'applicant name': 1.5},
+    'email': {'email': 1.5, 'e mail': 1.5, 'mail': 0.8, 'email address': 1.5},
+    'phone': {'phone': 1.5, 'mobile': 1.5, 'tel': 1.2, 'telephone': 1.5, 'cell': 1.0,
+              'contact number': 1.2, 'phone number': 1.5, 'whatsapp': 0.8},
+    'skills': {'skills': 1.5, 'skill': 1.5, 'technologies': 1.0, 'tech stack': 1.2, 'expertise': 1.0},
+    'experience': {'experience': 1.5, 'work history': 1.2, 'employment': 1.0, 'work experience': 1.5},
+    'education': {'education': 1.5, 'degree': 1.0, 'qualification': 1.0, 'qualifications': 1.0},
+    'linkedin': {'linkedin': 2.0, 'linked in': 2.0},
+    'github': {'github': 2.0, 'git hub': 2.0},
+    'address': {'address': 1.5, 'location': 1.2, 'city': 0.8, 'current location': 1.5},
+    'portfolio': {'portfolio': 1.5, 'website': 1.0, 'personal website': 1.5},
+}
+
+# Tokens that rule a field out even when a synonym matches ("company name", "last name")
+FIELD_EXCLUSIONS = {
+    'name': {'last', 'surname', 'middle', 'company', 'employer', 'school', 'university', 'college',
+             'reference', 'user', 'username', 'file'},
+    'email': {'confirm', 'reference'},
+    'phone': {'reference', 'emergency'},
+    'address': {'email', 'ip', 'web'},
+}
+
+# How much each control attribute counts towards a match
+SOURCE_WEIGHTS = {'name': 3.0, 'id': 3.0, 'label': 2.5, 'aria_label': 2.5, 'placeholder': 2.0}
+
+# Input types that pin a control to a field regardless of its wording
+TYPE_HINTS = {
+    'email': ('email', 5.0),
+    'tel': ('phone', 5.0),
+}
+
+# Control types that never receive resume values
+SKIPPED_TYPES = {'hidden', 'submit', 'button', 'reset', 'image', 'file', 'password', 'checkbox', 'radio'}
+
+_SPLIT_CAMEL = re.compile(r'([a-z])([A-Z])')
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def tokenize(text):
+    """Lower-case word tokens plus joined neighbouring pairs ("full_name" -> full, name, fullname)"""
+    if not text:
+        return []
+    words = [w for w in _NON_ALNUM.split(_SPLIT_CAMEL.sub(r'\1 \2', text).lower()) if w]
+    return words + [a + b for a, b in zip(words, words[1:])]
+
+
+class FieldMatcher:
+    """Scores form controls against resume fields without touching the browser.
+
+    The synonym table is compiled once into a token -> [(field, weight)] index,
+    so each control is scored with one dictionary lookup per token.
+    """
+
+    def __init__(self, synonyms=FIELD_SYNONYMS, exclusions=FIELD_EXCLUSIONS,
+                 source_weights=SOURCE_WEIGHTS, min_score=2.0):
+        self.exclusions = exclusions
+        self.source_weights = source_weights
+        self.min_score = min_score
+        self.index = defaultdict(list)
+        for field, phrases in synonyms.items():
+            for phrase, weight in phrases.items():
+                self.index[''.join(_NON_ALNUM.split(phrase.lower()))].append((field, weight))
+
+    def control_tokens(self, control):
+        """Tokens of each descriptive attribute of a snapshot control"""
+        label = control.get('label')
+        if label is None:
+            labels = control.get('labels') or {}
+            label = labels.get('for') or labels.get('previous') or labels.get('wrapping') or labels.get('labelledby')
+        sources = {
+            'name': control.get('name'),
+            'id': control.get('id'),
+            'label': label,
+            'aria_label': control.get('aria_label'),
+            'placeholder': control.get('placeholder'),
+        }
+        return {source: set(tokenize(text)) for source, text in sources.items() if text}
+
+    def score_control(self, control):
+        """Score one control against every field; returns {field: score}"""
+        scores = defaultdict(float)
+        all_tokens = set()
+        for source, tokens in self.control_tokens(control).items():
+            all_tokens |= tokens
+            weight = self.source_weights.get(source, 1.0)
+            best = {}
+            for token in tokens:
+                for field, synonym_weight in self.index.get(token, ()):
+                    best[field] = max(best.get(field, 0), synonym_weight)
+            for field, synonym_weight in best.items():
+                scores[field] += weight * synonym_weight
+        hint = TYPE_HINTS.get(control.get('type'))
+        if hint:
+            scores[hint[0]] += hint[1]
+        for field in list(scores):
+            if self.exclusions.get(field, set()) & all_tokens:
+                del scores[field]
+        return scores
+
+    def is_candidate(self, control):
+        if control.get('tag') not in ('input', 'textarea'):
+            return False
+        if control.get('type') in SKIPPED_TYPES:
+            return False
+        return control.get('visible', True) and control.get('enabled', True)
+
+    def match(self, controls, fields):
+        """Best one-to-one assignment of fields to controls; returns {field: control}"""
+        wanted = set(fields)
+        pairs = []
+        for position, control in enumerate(controls):
+            if not self.is_candidate(control):
+                continue
+            for field, score in self.score_control(control).items():
+                if field in wanted and score >= self.min_score:
+                    # Earlier controls win ties, as the first matching XPath used to
+                    pairs.append((-score, position, field, control))
+        pairs.sort(key=lambda pair: (pair[0], pair[1]))
+        assignment, taken = {}, set()
+        for _, position, field, control in pairs:
+            if field in assignment or position in taken:
+                continue
+            assignment[field] = control
+            taken.add(position)
+        return assignment
+
+    def find_control(self, controls, field_info):
+        """Re-find a previously detected field in a fresh snapshot"""
+        locator = field_info.get('locator')
+        field_type = field_info.get('type', '')
+        if field_type == 'select':
+            pool = [c for c in controls if c.get('tag') == 'select']
+        elif field_type == 'checkbox':
+            pool = [c for c in controls if c.get('type') == 'checkbox']
+        else:
+            pool = [c for c in controls if c.get('tag') in ('input', 'textarea') and c.get('type') not in SKIPPED_TYPES]
+        for control in pool:
+            if locator and control.get('locator') == locator:
+                return control
+        name = field_info.get('name')
+        for control in pool:
+            if name and name in (control.get('name'), control.get('id')):
+                return control
+        wanted = set(tokenize(field_info.get('label', '')) + tokenize(field_info.get('placeholder', '')))
+        best, best_overlap = None, 0
+        for control in pool:
+            tokens = set()
+            for source_tokens in self.control_tokens(control).values():
+                tokens |= source_tokens
+            overlap = len(wanted & tokens)
+            if overlap > best_overlap:
+                best, best_overlap = control, overlap
+        return best
+
+
+default_matcher = FieldMatcher()
@@ -0,0 +1,100 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from sqlite_cache import SQLiteCache
+import threading
+import logging
+import hashlib
+import os
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+FORM_CACHE_TTL = float(os.getenv("FORMPILOT_FORM_CACHE_TTL", str(7 * 24 * 3600)))
+FORM_CACHE_MAX_ENTRIES = int(os.getenv("FORMPILOT_FORM_CACHE_MAX_ENTRIES", "500"))
+
+# Bumped when the stored layout changes meaning; older entries are ignored
+SCHEMA_VERSION = 2
+
+# Query parameters that never change which form is served
+TRACKING_PARAMS = {'gclid', 'fbclid', 'mc_cid', 'mc_eid', 'ref', 'referrer', 'source', 'trk'}
+
+
+def normalize_url(url):
+    """Canonical form of a form URL: lower-case host, no fragment, no tracking parameters"""
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def structure_hash(snapshot):
+    """Hash of the form's structure (controls and their identities), ignoring values and layout"""
+    signature = "\n".join(
+        f"{c['tag']}|{c['type']}|{c['name']}|{c['id']}|{c['form']}" for c in snapshot
+    )
+    return hashlib.sha1(signature.encode('utf-8')).hexdigest()
+
+
+class FormSchemaCache:
+    """Remembers how a form was filled and submitted, per URL and page structure"""
+
+    def __init__(self, cache=None):
+        self.cache = cache or SQLiteCache("form_schemas.sqlite3", max_entries=FORM_CACHE_MAX_ENTRIES,
+                                          max_age=FORM_CACHE_TTL)
+
+    def lookup(self, url, structure):
+        """Cached schema for the URL, dropped if the page structure has changed"""
+        key = normalize_url(url)
+        schema = self._get(key)
+        if schema is None:
+            return None
+        if schema.get('structure') != structure:
+            logger.info(f"Form structure changed for {key}; invalidating cached schema")
+            self.cache.delete(key)
+            return None
+        return schema
+
+    def _get(self, key):
+        schema = self.cache.get(key)
+        return schema if schema and schema.get('version') == SCHEMA_VERSION else None
+
+    def store(self, url, structure, fields, submit_locator, success_signal):
+        """Record the field -> locator mapping, the submit locator and the confirmed success signal.
+
+        `fields` covers every resume field the form has a control for, not
+        just the ones this submission filled, so later candidates with
+        other fields still get them extracted and filled.
+        """
+        self.cache.set(normalize_url(url), {
+            'version': SCHEMA_VERSION,
+            'structure': structure,
+            'fields': fields,
+            'submit_locator': submit_locator,
+            'success_signal': success_signal,
+        })
+
+    def known_fields(self, url):
+        """Resume fields the form has controls for, or None if the form is unknown"""
+        schema = self._get(normalize_url(url))
+        return list(schema['fields']) if schema else None
+
+    def invalidate(self, url):
+        self.cache.delete(normalize_url(url))
+
+    def stats(self):
+        return self.cache.stats()
+
+
+_schema_cache = None
+_schema_cache_lock = threading.Lock()
+
+
+def get_form_schema_cache():
+    """Process-wide form schema cache"""
+    global _schema_cache
+    with _schema_cache_lock:
+        if _schema_cache is None:
+            _schema_cache = FormSchemaCache()
+        return _schema_cache
@@ -0,0 +1,128 @@
+from selenium.webdriver.common.by import By
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Walks the document once and describes every form control in a single round trip
+SNAPSHOT_SCRIPT = """
+var controls = Array.prototype.slice.call(document.querySelectorAll('input, textarea, select, button'));
+var forms = Array.prototype.slice.call(document.forms);
+var idCounts = {}, nameCounts = {};
+Array.prototype.forEach.call(document.querySelectorAll('[id]'), function(el) {
+    idCounts[el.id] = (idCounts[el.id] || 0) + 1;
+});
+controls.forEach(function(el) {
+    var key = el.tagName + '|' + (el.getAttribute('name') || '');
+    nameCounts[key] = (nameCounts[key] || 0) + 1;
+});
+function text(el) {
+    return el ? (el.textContent || '').replace(/\\s+/g, ' ').trim() : '';
+}
+function uniqueId(el) {
+    return el.id && idCounts[el.id] === 1;
+}
+function locator(el) {
+    var tag = el.tagName.toLowerCase();
+    if (uniqueId(el)) return '#' + CSS.escape(el.id);
+    var name = el.getAttribute('name');
+    if (name && nameCounts[el.tagName + '|' + name] === 1) return tag + '[name="' + CSS.escape(name) + '"]';
+    var parts = [];
+    while (el && el.nodeType === 1 && el !== document.documentElement) {
+        if (uniqueId(el)) { parts.unshift('#' + CSS.escape(el.id)); break; }
+        var index = 1, sibling = el;
+        while ((sibling = sibling.previousElementSibling)) {
+            if (sibling.tagName === el.tagName) index++;
+        }
+        parts.unshift(el.tagName.toLowerCase() + ':nth-of-type(' + index + ')');
+        el = el.parentElement;
+    }
+    return parts.join(' > ');
+}
+function visible(el) {
+    var style = window.getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden' || parseFloat(style.opacity) === 0) return false;
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+}
+function previousLabel(el) {
+    var prev = el.previousElementSibling;
+    while (prev) {
+        if (prev.tagName.toLowerCase() === 'label') return text(prev);
+        prev = prev.previousElementSibling;
+    }
+    return '';
+}
+function labelledBy(el) {
+    var ids = (el.getAttribute('aria-labelledby') || '').split(/\\s+/).filter(Boolean);
+    return ids.map(function(id) { return text(document.getElementById(id)); }).join(' ').trim();
+}
+return controls.map(function(el) {
+    var rect = el.getBoundingClientRect();
+    var forLabel = el.id ? document.querySelector('label[for="' + CSS.escape(el.id) + '"]') : null;
+    return {
+        locator: locator(el),
+        tag: el.tagName.toLowerCase(),
+        type: (el.type || '').toLowerCase(),
+        type_attr: el.getAttribute('type'),
+        name: el.getAttribute('name') || '',
+        id: el.id || '',
+        placeholder: el.getAttribute('placeholder') || '',
+        aria_label: el.getAttribute('aria-label') || '',
+        labels: {
+            for: text(forLabel),
+            previous: previousLabel(el),
+            wrapping: text(el.closest('label')),
+            labelledby: labelledBy(el)
+        },
+        text: el.tagName === 'BUTTON' ? text(el) : '',
+        visible: visible(el),
+        enabled: !el.disabled,
+        required: el.required || el.getAttribute('aria-required') === 'true',
+        value: el.value || '',
+        checked: !!el.checked,
+        options: el.tagName === 'SELECT' ? Array.prototype.map.call(el.options, function(o) {
+            return {text: (o.text || '').trim(), value: o.value};
+        }) : [],
+        form: el.form ? forms.indexOf(el.form) : -1,
+        rect: {x: rect.left + window.scrollX, y: rect.top + window.scrollY, width: rect.width, height: rect.height}
+    };
+});
+"""
+
+TEXT_INPUT_TYPES = ('text', 'email', 'tel', 'url', 'number')
+
+
+def take_form_snapshot(driver):
+    """Describe every form control on the page in one WebDriver round trip"""
+    try:
+        return driver.execute_script(SNAPSHOT_SCRIPT) or []
+    except Exception as e:
+        logger.error(f"Form snapshot failed: {str(e)}")
+        return []
+
+
+def locate(driver, control):
+    """Resolve a snapshot control back to a live WebElement"""
+    return driver.find_element(By.CSS_SELECTOR, control['locator'])
+
+
+def resolve_label(control):
+    """Pick the best human-readable label for a control"""
+    labels = control.get('labels') or {}
+    for key in ('for', 'previous', 'wrapping', 'labelledby'):
+        if labels.get(key):
+            return labels[key]
+    return control.get('aria_label') or "No label found"
+
+
+def is_text_input(control):
+    """Text-like inputs and textareas, matching the filler's scan selectors"""
+    if control['tag'] == 'textarea':
+        return True
+    if control['tag'] != 'input':
+        return False
+    return control['type_attr'] is None or control['type_attr'].lower() in TEXT_INPUT_TYPES
+
+
+def is_interactable(control):
+    return control['visible'] and control['enabled']
@@ -0,0 +1,231 @@
+from google.api_core import exceptions as google_exceptions
+from contextlib import contextmanager
+from collections import deque
+import google.generativeai as genai
+import threading
+import logging
+import time
+import os
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Preferred model first; later ones take over on quota, server and timeout errors
+GEMINI_MODELS = [name.strip() for name in os.getenv(
+    "FORMPILOT_GEMINI_MODELS",
+    "models/gemini-1.5-pro-latest,models/gemini-1.5-flash-latest,models/gemini-1.0-pro"
+).split(",") if name.strip()]
+GEMINI_TIMEOUT = float(os.getenv("FORMPILOT_GEMINI_TIMEOUT", "60"))
+# A model whose p95 latency exceeds this many seconds is tried after faster ones
+GEMINI_P95_BUDGET = float(os.getenv("FORMPILOT_GEMINI_P95_BUDGET", "20"))
+# The same for the time to the first chunk of a streamed response
+GEMINI_FIRST_CHUNK_P95_BUDGET = float(os.getenv("FORMPILOT_GEMINI_FIRST_CHUNK_P95_BUDGET", "8"))
+GEMINI_COOLDOWN = float(os.getenv("FORMPILOT_GEMINI_COOLDOWN", "60"))
+
+LATENCY_WINDOW = 50
+MIN_LATENCY_SAMPLES = 5
+
+# Errors worth retrying on the next model; anything else (bad key, bad request) is raised
+FAILOVER_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServerError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.NotFound,
+    TimeoutError,
+)
+
+
+def is_unsupported_config(error):
+    message = str(error).lower()
+    return 'response_schema' in message or 'response_mime_type' in message or 'json mode' in message
+
+
+class ModelStats:
+    """Rolling latency and error counters for one model.
+
+    Full-response latencies and streamed time-to-first-chunk are kept in
+    separate windows; a streamed call returns at its first chunk, so mixing
+    them would make the model look faster than it is for whole responses.
+    """
+
+    def __init__(self):
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.first_chunk_latencies = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.errors = 0
+        self.last_error = None
+        self.cooldown_until = 0.0
+
+    def window(self, stream=False):
+        return self.first_chunk_latencies if stream else self.latencies
+
+    def percentile(self, fraction, stream=False):
+        window = self.window(stream)
+        if not window:
+            return None
+        ordered = sorted(window)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    @property
+    def p95(self):
+        return self.percentile(0.95)
+
+    def over_budget(self, budget, stream=False):
+        return len(self.window(stream)) >= MIN_LATENCY_SAMPLES and self.percentile(0.95, stream) > budget
+
+
+class GeminiClient:
+    """Configured Gemini models for one API key, with failover and latency-aware routing.
+
+    Exposes generate_content() like a GenerativeModel, so it can be passed
+    wherever a model is expected. Each call goes to the first healthy model:
+    models cooling down after a quota error are skipped, and a model whose
+    p95 latency (time to first chunk for streamed calls) is over budget is
+    tried after the ones within budget.
+
+    genai.configure is process-wide, so clients for different keys take
+    turns: calls with the configured key run concurrently, and a call with
+    another key waits until they have finished before reconfiguring.
+    """
+
+    _key_cond = threading.Condition()
+    _configured_key = None
+    _in_flight = 0
+    _waiting = 0
+
+    def __init__(self, api_key, model_names=None, timeout=GEMINI_TIMEOUT,
+                 p95_budget=GEMINI_P95_BUDGET, first_chunk_p95_budget=GEMINI_FIRST_CHUNK_P95_BUDGET,
+                 cooldown=GEMINI_COOLDOWN):
+        self.api_key = api_key
+        self.model_names = list(model_names or GEMINI_MODELS)
+        self.timeout = timeout
+        self.p95_budget = p95_budget
+        self.first_chunk_p95_budget = first_chunk_p95_budget
+        self.cooldown = cooldown
+        self._models = {}
+        self._stats = {name: ModelStats() for name in self.model_names}
+        self._lock = threading.Lock()
+
+    @property
+    def model_name(self):
+        """The preferred model; results are cached under it whichever model answered"""
+        return self.model_names[0]
+
+    @contextmanager
+    def _configured(self):
+        """Keep the process-wide configuration on this client's key for the duration of one call"""
+        cls = GeminiClient
+        with cls._key_cond:
+            # Same-key calls stop joining once another key is waiting, so it cannot be starved
+            while cls._in_flight and (cls._configured_key != self.api_key or cls._waiting):
+                cls._waiting += 1
+                cls._key_cond.wait()
+                cls._waiting -= 1
+            if cls._configured_key != self.api_key:
+                genai.configure(api_key=self.api_key)
+                cls._configured_key = self.api_key
+            cls._in_flight += 1
+        try:
+            yield
+        finally:
+            with cls._key_cond:
+                cls._in_flight -= 1
+                if not cls._in_flight:
+                    cls._key_cond.notify_all()
+
+    def model(self, name):
+        """Model handle, created once per client"""
+        with self._lock:
+            if name not in self._models:
+                self._models[name] = genai.GenerativeModel(name)
+            return self._models[name]
+
+    def route(self, stream=False):
+        """Model names in the order to try them for the next call"""
+        now = time.monotonic()
+        with self._lock:
+            available = [name for name in self.model_names if self._stats[name].cooldown_until <= now]
+            if not available:
+                # Everything is cooling down: try the one that recovers first
+                available = [min(self.model_names, key=lambda name: self._stats[name].cooldown_until)]
+            budget = self.first_chunk_p95_budget if stream else self.p95_budget
+            within = [name for name in available if not self._stats[name].over_budget(budget, stream)]
+            return within + [name for name in available if name not in within]
+
+    def generate_content(self, prompt, **kwargs):
+        """generate_content on the first model that answers; raises the last failover error"""
+        kwargs.setdefault('request_options', {'timeout': self.timeout})
+        stream = bool(kwargs.get('stream'))
+        last_error = None
+        for name in self.route(stream):
+            started = time.monotonic()
+            try:
+                with self._configured():
+                    # Time spent waiting for another key's calls is not the model's latency
+                    started = time.monotonic()
+                    response = self.model(name).generate_content(prompt, **kwargs)
+            except FAILOVER_ERRORS as e:
+                self._record(name, started, e)
+                logger.warning(f"Gemini model {name} failed ({type(e).__name__}); failing over")
+                last_error = e
+                continue
+            except google_exceptions.InvalidArgument as e:
+                self._record(name, started, e)
+                if not is_unsupported_config(e):
+                    raise
+                # Older models reject JSON mode; the next model may support it
+                logger.warning(f"Gemini model {name} does not support this generation config; failing over")
+                last_error = e
+                continue
+            except Exception as e:
+                self._record(name, started, e)
+                raise
+            # A streamed call returns once the first chunk is in
+            self._record(name, started, stream=stream)
+            return response
+        raise last_error
+
+    def _record(self, name, started, error=None, stream=False):
+        with self._lock:
+            stats = self._stats[name]
+            stats.calls += 1
+            if error is None:
+                stats.window(stream).append(time.monotonic() - started)
+                return
+            stats.errors += 1
+            stats.last_error = f"{type(error).__name__}: {error}"
+            if isinstance(error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests,
+                                  google_exceptions.NotFound)):
+                stats.cooldown_until = time.monotonic() + self.cooldown
+
+    def stats(self):
+        """Per-model calls, errors, p50/p95 full-response and first-chunk latency in seconds, and cooldown state"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    'calls': stats.calls,
+                    'errors': stats.errors,
+                    'p50': stats.percentile(0.5),
+                    'p95': stats.p95,
+                    'first_chunk_p50': stats.percentile(0.5, stream=True),
+                    'first_chunk_p95': stats.percentile(0.95, stream=True),
+                    'cooling_down': stats.cooldown_until > now,
+                    'last_error': stats.last_error,
+                }
+                for name, stats in self._stats.items()
+            }
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_gemini_client(api_key=None):
+    """Process-wide client for the API key (default: GOOGLE_API_KEY)"""
+    api_key = api_key or os.getenv("GOOGLE_API_KEY")
+    with _clients_lock:
+        if api_key not in _clients:
+            _clients[api_key] = GeminiClient(api_key)
+        return _clients[api_key]
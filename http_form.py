@@ -0,0 +1,373 @@
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+from field_matcher import default_matcher
+from submission_signals import UNVERIFIED, text_success_reasons, page_verdict
+from urllib3.exceptions import NewConnectionError
+import requests
+import logging
+import re
+import os
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+HTTP_FORMS = os.getenv("FORMPILOT_HTTP_FORMS", "1") != "0"
+HTTP_FORM_TIMEOUT = float(os.getenv("FORMPILOT_HTTP_FORM_TIMEOUT", "10"))
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+
+# Widgets that only work with JavaScript running; their pages go to the browser
+JS_ONLY_MARKERS = re.compile(r"g-recaptcha|grecaptcha|h-captcha|cf-turnstile", re.IGNORECASE)
+# Attributes that bind a form or control to a framework (Vue, Angular, Alpine, htmx, React)
+FRAMEWORK_ATTRIBUTE = re.compile(r"^(?:v-|@|:|ng-|x-|hx-|data-react)")
+# Script text that wires up submission by itself rather than through a named control
+SUBMIT_SCRIPT = re.compile(r"addEventListener\(\s*['\"]submit|\.onsubmit\b|\.submit\(\)|document\.forms\b",
+                           re.IGNORECASE)
+# Hidden inputs that are meant to be filled in by a script before submission
+TOKEN_NAME = re.compile(r"token|captcha|nonce|csrf", re.IGNORECASE)
+
+_SUBMIT_TYPES = {'submit', 'image'}
+_UNSENT_TYPES = {'submit', 'image', 'button', 'reset', 'file'}
+_WHITESPACE = re.compile(r"\s+")
+
+
+class FormParser(HTMLParser):
+    """Collects every <form> and its controls in the shape form_snapshot produces.
+
+    Labels are resolved the same ways the snapshot script does: label[for],
+    a wrapping <label>, and the nearest preceding <label> sibling.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.forms = []
+        self.title = ""
+        self._form = None
+        self._control = None  # open <textarea>, <select> or <button>
+        self._option = None
+        self._labels = []  # open <label> elements, innermost last
+        self._label_for = {}
+        self._previous_label = ""
+        self._in_title = False
+        self._in_script = False
+        self._hidden_depth = 0  # open <script>, <style>, <template> and <noscript> elements
+        self.scripts = []  # inline script bodies
+        self.text = []  # text a reader would see, markup stripped
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or "" for name, value in attrs}
+        framework = any(FRAMEWORK_ATTRIBUTE.match(name) for name in attrs)
+        if tag == 'title':
+            self._in_title = True
+        elif tag in ('script', 'style', 'template', 'noscript'):
+            self._hidden_depth += 1
+            if tag == 'script' and 'src' not in attrs:
+                self._in_script = True
+                self.scripts.append([])
+        elif tag == 'form':
+            self._form = {
+                'id': attrs.get('id', ''),
+                'name': attrs.get('name', ''),
+                'framework': framework,
+                'action': attrs.get('action', ''),
+                'method': attrs.get('method', 'get').lower(),
+                'enctype': attrs.get('enctype', 'application/x-www-form-urlencoded').lower(),
+                'onsubmit': bool(attrs.get('onsubmit')),
+                'controls': [],
+            }
+            self.forms.append(self._form)
+        elif tag == 'label':
+            self._labels.append({'for': attrs.get('for'), 'text': []})
+        elif tag in ('input', 'textarea', 'select', 'button') and self._form is not None:
+            default_type = 'submit' if tag == 'button' else ('text' if tag == 'input' else tag)
+            if tag == 'select':
+                default_type = 'select-multiple' if 'multiple' in attrs else 'select-one'
+            control = {
+                'tag': tag,
+                'type': attrs.get('type', default_type).lower() if tag in ('input', 'button') else default_type,
+                'name': attrs.get('name', ''),
+                'id': attrs.get('id', ''),
+                'value': attrs.get('value', ''),
+                'placeholder': attrs.get('placeholder', ''),
+                'aria_label': attrs.get('aria-label', ''),
+                'labels': {
+                    'previous': self._previous_label,
+                    'wrapping': "",
+                },
+                'checked': 'checked' in attrs,
+                'required': 'required' in attrs or attrs.get('aria-required') == 'true',
+                'enabled': 'disabled' not in attrs,
+                'onclick': bool(attrs.get('onclick')) or framework,
+                'options': [],
+                'text': [],
+            }
+            control['visible'] = control['type'] != 'hidden' and 'hidden' not in attrs
+            if control['visible']:
+                self._previous_label = ""
+            if self._labels:
+                control['_wrapping'] = self._labels[-1]
+            self._form['controls'].append(control)
+            if tag != 'input':
+                self._control = control
+        elif tag == 'option' and self._control is not None and self._control['tag'] == 'select':
+            self._option = {'value': attrs.get('value'), 'selected': 'selected' in attrs, 'text': []}
+            self._control['options'].append(self._option)
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+        elif tag in ('script', 'style', 'template', 'noscript'):
+            self._hidden_depth = max(0, self._hidden_depth - 1)
+            self._in_script = False
+        elif tag == 'form':
+            self._form = None
+        elif tag == 'label' and self._labels:
+            label = self._labels.pop()
+            text = _WHITESPACE.sub(" ", "".join(label['text'])).strip()
+            if label['for']:
+                self._label_for.setdefault(label['for'], text)
+            self._previous_label = text
+        elif tag == 'option':
+            self._option = None
+        elif tag in ('textarea', 'select', 'button'):
+            self._control = None
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif self._in_script:
+            self.scripts[-1].append(data)
+        elif not self._hidden_depth:
+            self.text.append(data)
+        for label in self._labels:
+            label['text'].append(data)
+        if self._option is not None:
+            self._option['text'].append(data)
+        elif self._control is not None and self._control['tag'] in ('textarea', 'button'):
+            self._control['text'].append(data)
+
+    def close(self):
+        super().close()
+        for form in self.forms:
+            for control in form['controls']:
+                wrapping = control.pop('_wrapping', None)
+                if wrapping is not None:
+                    control['labels']['wrapping'] = _WHITESPACE.sub(" ", "".join(wrapping['text'])).strip()
+                control['labels']['for'] = self._label_for.get(control['id'], "") if control['id'] else ""
+                text = "".join(control['text'])
+                control['text'] = _WHITESPACE.sub(" ", text).strip() if control['tag'] == 'button' else ""
+                if control['tag'] == 'textarea':
+                    control['value'] = text
+                for option in control['options']:
+                    option['text'] = _WHITESPACE.sub(" ", "".join(option['text'])).strip()
+                    if option['value'] is None:
+                        option['value'] = option['text']
+
+
+def parse_page(html):
+    """Parser holding the page's forms, title, inline scripts and visible text"""
+    parser = FormParser()
+    parser.feed(html)
+    parser.close()
+    return parser
+
+
+def parse_forms(html):
+    """(forms, title) of an HTML page"""
+    parser = parse_page(html)
+    return parser.forms, parser.title.strip()
+
+
+def visible_text(parser):
+    return _WHITESPACE.sub(" ", " ".join(parser.text)).strip()
+
+
+def default_payload(form):
+    """Name/value pairs the browser would send without any typing (hidden inputs, CSRF tokens, defaults)"""
+    payload = []
+    for control in form['controls']:
+        name = control['name']
+        if not name or not control['enabled'] or control['type'] in _UNSENT_TYPES:
+            continue
+        if control['type'] in ('checkbox', 'radio'):
+            if control['checked']:
+                payload.append((name, control['value'] or 'on'))
+        elif control['tag'] == 'select':
+            selected = [option for option in control['options'] if option['selected']]
+            if not selected and control['options'] and control['type'] == 'select-one':
+                selected = control['options'][:1]
+            payload.extend((name, option['value']) for option in selected)
+        else:
+            payload.append((name, control['value']))
+    return payload
+
+
+class HTTPFormPlan:
+    """A plain HTML form that can be submitted without a browser"""
+
+    def __init__(self, session, form_url, page_url, form, assignment, values):
+        self.session = session
+        self.form_url = form_url
+        self.page_url = page_url
+        self.form = form
+        self.assignment = assignment
+        self.values = values
+        self.action = urljoin(page_url, form['action'] or page_url)
+
+    @property
+    def filled_fields(self):
+        return list(self.assignment)
+
+    def payload(self):
+        filled = {control['name']: self.values[field] for field, control in self.assignment.items()}
+        payload = [(name, filled.pop(name, value)) for name, value in default_payload(self.form)]
+        submit = next((control for control in self.form['controls']
+                       if control['type'] in _SUBMIT_TYPES and control['enabled']), None)
+        if submit is not None and submit['name']:
+            payload.append((submit['name'], submit['value']))
+        return payload
+
+    def submit(self):
+        """Send the form and verify the response.
+
+        Returns a verify_submission_v2 style verdict, or None when the
+        server never took the submission (the connection could not be
+        opened, or the request was rejected with a 4xx), so the browser can
+        still try. Errors after the request may have reached the server
+        propagate.
+        """
+        headers = {'Referer': self.page_url, 'Origin': "{0.scheme}://{0.netloc}".format(urlparse(self.page_url))}
+        try:
+            if self.form['method'] == 'post':
+                response = self.session.post(self.action, data=self.payload(), headers=headers,
+                                             timeout=HTTP_FORM_TIMEOUT)
+            else:
+                response = self.session.get(self.action, params=self.payload(), headers=headers,
+                                            timeout=HTTP_FORM_TIMEOUT)
+        except requests.ConnectTimeout as e:
+            logger.info(f"HTTP submission to {self.action} never connected: {str(e)}")
+            return None
+        except requests.ConnectionError as e:
+            if not is_unsent(e):
+                raise
+            logger.info(f"HTTP submission to {self.action} never connected: {str(e)}")
+            return None
+        if 400 <= response.status_code < 500:
+            logger.info(f"HTTP submission to {self.action} rejected with {response.status_code}")
+            return None
+        if response.status_code >= 500:
+            return f"❌ Form endpoint returned HTTP {response.status_code}"
+        return self.verify(response)
+
+    def verify(self, response):
+        """Verdict from the response's visible text, redirects, and whether the form came back"""
+        page = parse_page(response.text)
+        names = {control['name'] for control in self.form['controls'] if control['name']}
+        form_present = any(names <= {control['name'] for control in form['controls']} for form in page.forms)
+        redirected = bool(response.history)
+        if form_present and not redirected and response.url == self.page_url:
+            # The same form re-rendered in place is a validation error page, whatever its wording
+            return UNVERIFIED
+        reasons = text_success_reasons(response.url, visible_text(page), page.title.strip())
+        if reasons and redirected:
+            reasons.append("redirect after submit")
+        return page_verdict(self.page_url, response.url, reasons, form_present)
+
+
+def is_unsent(error):
+    """Whether a requests ConnectionError happened before anything was sent"""
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def script_references(scripts, form):
+    """Whether any inline script handles submission or mentions the form or its controls"""
+    identifiers = {form['id'], form['name']}
+    for control in form['controls']:
+        identifiers.add(control['id'])
+        if control['type'] != 'hidden':
+            identifiers.add(control['name'])
+    identifiers.discard('')
+    quoted = re.compile("|".join(rf"""['"#]{re.escape(identifier)}\b""" for identifier in identifiers)) \
+        if identifiers else None
+    for script in scripts:
+        if SUBMIT_SCRIPT.search(script) or (quoted and quoted.search(script)):
+            return True
+    return False
+
+
+def unsupported_reason(html, form, scripts, page_url):
+    """Why a form needs a browser, or None if plain HTTP can submit it"""
+    if JS_ONLY_MARKERS.search(html):
+        return "CAPTCHA widget"
+    action = form['action'].strip()
+    if not action or action.startswith('#'):
+        return "no action URL (submitted by script)"
+    if urlparse(urljoin(page_url, action)).scheme not in ('http', 'https'):
+        return f"non-HTTP action {action[:40]}"
+    if form['onsubmit'] or form['framework'] or any(control['onclick'] for control in form['controls']):
+        return "JavaScript submit handler"
+    if script_references(scripts, form):
+        return "script wired to the form"
+    if any(control['type'] == 'hidden' and not control['value'] and TOKEN_NAME.search(control['name'])
+           for control in form['controls']):
+        return "token filled in by script"
+    if form['method'] not in ('get', 'post'):
+        return f"unsupported method {form['method']}"
+    if form['enctype'] == 'multipart/form-data' or any(c['type'] == 'file' for c in form['controls']):
+        return "file upload"
+    if not any(control['type'] in _SUBMIT_TYPES for control in form['controls']):
+        return "no submit control"
+    return None
+
+
+def missing_required(form, assignment):
+    """Name of the first required control that would be sent empty, or None"""
+    sent = dict(default_payload(form))
+    filled = {control['name'] for control in assignment.values()}
+    for control in form['controls']:
+        name = control['name']
+        if not control['required'] or not control['visible'] or control['type'] in _UNSENT_TYPES:
+            continue
+        if name in filled or sent.get(name):
+            continue
+        return name or control['id']
+    return None
+
+
+def plan_http_submission(form_url, values, session=None):
+    """Fetch the page and plan an HTTP-only submission of `values` ({field: text}).
+
+    Returns (plan, None), or (None, reason) when the page needs the browser:
+    no form, an empty, '#' or non-HTTP action, JavaScript-driven submission
+    (handlers, framework bindings, inline scripts that mention the form or
+    its controls, script-filled tokens), CAPTCHA, uploads, or a required
+    control no resume value fills. Nothing is submitted here.
+    """
+    if session is None:
+        # One session per submission keeps cookies (and CSRF pairs) from leaking between users
+        session = requests.Session()
+        session.headers['User-Agent'] = USER_AGENT
+    response = session.get(form_url, timeout=HTTP_FORM_TIMEOUT)
+    if response.status_code >= 400:
+        return None, f"page returned HTTP {response.status_code}"
+    if 'html' not in response.headers.get('Content-Type', 'text/html'):
+        return None, "not an HTML page"
+    page = parse_page(response.text)
+    best = None
+    for form in page.forms:
+        assignment = {field: control for field, control in default_matcher.match(form['controls'], values).items()
+                      if control['name']}
+        if assignment and (best is None or len(assignment) > len(best[1])):
+            best = (form, assignment)
+    if best is None:
+        return None, "no form with matching fields in the HTML"
+    form, assignment = best
+    reason = unsupported_reason(response.text, form, ["".join(script) for script in page.scripts], response.url)
+    if reason:
+        return None, reason
+    missing = missing_required(form, assignment)
+    if missing:
+        return None, f"required field {missing} needs an answer"
+    return HTTPFormPlan(session, form_url, response.url, form, assignment, values), None
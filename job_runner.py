@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor
+from driver_pool import POOL_SIZE
+import threading
+import logging
+import uuid
+import time
+import os
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Browser jobs beyond the driver pool would only queue on it, so match its size
+JOB_WORKERS = int(os.getenv("FORMPILOT_JOB_WORKERS", str(POOL_SIZE)))
+# Finished jobs are kept this many seconds so a reconnecting session can read them
+JOB_RETENTION = float(os.getenv("FORMPILOT_JOB_RETENTION", "3600"))
+# Seconds between reruns of a Streamlit session that has a job in flight
+JOB_POLL_INTERVAL = float(os.getenv("FORMPILOT_JOB_POLL_INTERVAL", "1"))
+
+FINISHED = ('done', 'failed')
+
+
+class Job:
+    """One unit of background work and everything the UI shows about it.
+
+    The worker appends to `logs` and calls set_progress(); the Streamlit
+    script reads a consistent copy through snapshot() on every rerun.
+    """
+
+    def __init__(self, kind, owner=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.owner = owner
+        self.status = 'queued'
+        self.progress = 0.0
+        self.message = ""
+        self.logs = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    def log(self, message):
+        self.logs.append(message)
+
+    def set_progress(self, fraction, message=None):
+        with self._lock:
+            self.progress = min(1.0, max(0.0, fraction))
+            if message is not None:
+                self.message = message
+
+    def _finish(self, status, result=None, error=None):
+        with self._lock:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+            if status == 'done':
+                self.progress = 1.0
+
+    def snapshot(self):
+        """Copy of the job state that is safe to render while the worker runs"""
+        with self._lock:
+            return {
+                'id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'progress': self.progress,
+                'message': self.message,
+                'logs': list(self.logs),
+                'result': self.result,
+                'error': self.error,
+                'seconds': round((self.finished_at or time.time()) - self.created_at, 1),
+            }
+
+
+class JobRunner:
+    """Runs jobs on a worker pool outside the Streamlit script thread.
+
+    submit() returns a job ID immediately; the script keeps the ID in
+    session state and polls get() on each rerun. Jobs live in the runner,
+    not in the session, so a rerun or a widget interaction neither cancels
+    nor duplicates a running browser session.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, retention=JOB_RETENTION):
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="formpilot-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, owner=None, **kwargs):
+        """Queue fn(job, *args, **kwargs); its return value becomes the job result"""
+        job = Job(kind, owner)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        logger.info(f"Queued {kind} job {job.id}")
+        return job.id
+
+    def _run(self, job, fn, args, kwargs):
+        with job._lock:
+            job.status = 'running'
+        try:
+            result = fn(job, *args, **kwargs)
+        except Exception as e:
+            logger.exception(f"{job.kind} job {job.id} failed")
+            job.log(f"❌ Error: {e}")
+            job._finish('failed', error=str(e))
+        else:
+            job._finish('done', result=result)
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, owner=None):
+        """Jobs of one owner (or all), oldest first"""
+        with self._lock:
+            return [job for job in self._jobs.values() if owner is None or job.owner == owner]
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return counts
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner():
+    """Process-wide job runner shared by every Streamlit session"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
@@ -0,0 +1,85 @@
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class IncrementalObjectParser:
+    """Parses a top-level JSON object as text arrives, member by member.
+
+    feed() returns the (key, value) pairs completed by the new text. A value
+    is only emitted once the ',' or '}' after it has arrived, so a number
+    cut off mid-chunk is never reported early. Each member is decoded with
+    the C-accelerated json decoder; text is scanned once.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.started = False
+        self.done = False
+        self.result = {}
+
+    def _skip(self):
+        while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+            self.pos += 1
+
+    def feed(self, text):
+        self.buffer += text
+        completed = []
+        if not self.started:
+            start = self.buffer.find("{", self.pos)
+            if start < 0:
+                return completed
+            self.pos = start + 1
+            self.started = True
+        while not self.done:
+            self._skip()
+            if self.pos >= len(self.buffer):
+                break
+            if self.buffer[self.pos] == "}":
+                self.pos += 1
+                self.done = True
+                break
+            try:
+                key, end = _decoder.raw_decode(self.buffer, self.pos)
+                colon = self.buffer.index(":", end)
+                if not isinstance(key, str) or self.buffer[end:colon].strip():
+                    raise json.JSONDecodeError("Expected a string key and ':'", self.buffer, end)
+                value_start = colon + 1
+                while value_start < len(self.buffer) and self.buffer[value_start] in _WHITESPACE:
+                    value_start += 1
+                value, end = _decoder.raw_decode(self.buffer, value_start)
+            except json.JSONDecodeError:
+                if self.buffer[self.pos] != '"':
+                    raise
+                break  # member not complete yet
+            except ValueError:
+                break  # ':' not received yet
+            while end < len(self.buffer) and self.buffer[end] in _WHITESPACE:
+                end += 1
+            if end >= len(self.buffer):
+                break  # wait for the delimiter
+            if self.buffer[end] not in ",}":
+                raise json.JSONDecodeError("Expected ',' or '}'", self.buffer, end)
+            self.pos = end + 1 if self.buffer[end] == "," else end
+            self.result[key] = value
+            completed.append((key, value))
+        # Drop consumed text so long responses are not rescanned
+        if self.pos > 4096:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        return completed
+
+    def close(self):
+        """The parsed object; raises if the text ended before the object did"""
+        if not self.done:
+            raise json.JSONDecodeError("Unterminated JSON object", self.buffer, len(self.buffer))
+        return self.result
+
+
+def parse_object(text):
+    """Parse a complete JSON object with the incremental parser"""
+    parser = IncrementalObjectParser()
+    parser.feed(text)
+    return parser.close()
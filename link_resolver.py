@@ -0,0 +1,193 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from collections import defaultdict
+from contact_patterns import categorize_link
+from sqlite_cache import SQLiteCache
+import threading
+import requests
+import logging
+import time
+import os
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+RESOLVE_WORKERS = int(os.getenv("FORMPILOT_RESOLVE_WORKERS", "8"))
+RESOLVE_PER_HOST = int(os.getenv("FORMPILOT_RESOLVE_PER_HOST", "2"))
+RESOLVE_DEADLINE = float(os.getenv("FORMPILOT_RESOLVE_DEADLINE", "20"))
+RESOLVE_TIMEOUT = 10
+# A browser lookup with less time than this left before the deadline is skipped
+MIN_BROWSER_LOOKUP_SECONDS = 1.0
+
+URL_CACHE_TTL = float(os.getenv("FORMPILOT_URL_CACHE_TTL", str(7 * 24 * 3600)))
+URL_CACHE_NEGATIVE_TTL = float(os.getenv("FORMPILOT_URL_CACHE_NEGATIVE_TTL", "3600"))
+URL_CACHE_MAX_ENTRIES = int(os.getenv("FORMPILOT_URL_CACHE_MAX_ENTRIES", "5000"))
+
+# Statuses that mean the link is dead rather than unreachable from here
+DEAD_STATUSES = (404, 410)
+# Servers that refuse HEAD answer these; the lookup is repeated with GET
+HEAD_REJECTED_STATUSES = (403, 405, 501)
+
+_session = None
+_session_lock = threading.Lock()
+_url_cache = None
+_url_cache_lock = threading.Lock()
+
+# How often link extraction actually needed a browser
+_browser_stats = {'extractions': 0, 'browser_sessions': 0, 'browser_lookups': 0}
+_browser_stats_lock = threading.Lock()
+
+
+def record_browser_usage(extractions=0, browser_sessions=0, browser_lookups=0):
+    with _browser_stats_lock:
+        _browser_stats['extractions'] += extractions
+        _browser_stats['browser_sessions'] += browser_sessions
+        _browser_stats['browser_lookups'] += browser_lookups
+
+
+def get_browser_usage_stats():
+    """Counters of extractions and of how many of them fell back to the browser"""
+    with _browser_stats_lock:
+        stats = dict(_browser_stats)
+    stats['browser_session_rate'] = stats['browser_sessions'] / stats['extractions'] if stats['extractions'] else 0.0
+    return stats
+
+
+def get_http_session():
+    """Pooled HTTP session shared by every link resolution"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=RESOLVE_WORKERS, pool_maxsize=RESOLVE_WORKERS)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def get_url_cache():
+    """Resolved-URL cache, shared by every process using the same cache directory"""
+    global _url_cache
+    with _url_cache_lock:
+        if _url_cache is None:
+            _url_cache = SQLiteCache("resolved_urls.sqlite3", max_entries=URL_CACHE_MAX_ENTRIES)
+        return _url_cache
+
+
+def is_resolved_status(status):
+    """2xx/3xx answers and browser lookups; the only results cached for the full TTL"""
+    return status == 'browser' or (isinstance(status, int) and 200 <= status < 400)
+
+
+def remember_resolution(url, final_url, status):
+    """Cache a resolution; dead links are kept only for the shorter negative TTL.
+
+    Throttling (429, LinkedIn's 999), server errors and other statuses are
+    not cached, so one bad lookup does not pin an unresolved URL.
+    """
+    dead = status in DEAD_STATUSES or status == 'failed'
+    if not dead and not is_resolved_status(status):
+        return
+    get_url_cache().set(url, {
+        'final_url': final_url,
+        'status': status,
+        'category': categorize_link(final_url) if not dead else None,
+    }, ttl=URL_CACHE_NEGATIVE_TTL if dead else URL_CACHE_TTL)
+
+
+def resolve_with_http(url, timeout=RESOLVE_TIMEOUT):
+    """Follow redirects with a HEAD request (GET where HEAD is refused); raises on network errors"""
+    session = get_http_session()
+    response = session.head(url, allow_redirects=True, timeout=timeout)
+    if response.status_code in HEAD_REJECTED_STATUSES:
+        # stream=True stops at the headers; the body is never downloaded
+        with session.get(url, allow_redirects=True, timeout=timeout, stream=True) as response:
+            pass
+    remember_resolution(url, response.url, response.status_code)
+    return response.url
+
+
+def resolve_urls(urls, browser_fallback=None, deadline=RESOLVE_DEADLINE,
+                 max_workers=RESOLVE_WORKERS, per_host=RESOLVE_PER_HOST):
+    """Resolve many URLs concurrently.
+
+    HTTP lookups run on a bounded thread pool with at most `per_host`
+    requests per host and an overall `deadline` in seconds. URLs whose
+    lookup failed are handed to `browser_fallback` (a callable taking the
+    list of failed URLs and the seconds left before the deadline, and
+    returning {url: final_url}) in one batch, unless the deadline has
+    already passed. URLs still unresolved at the deadline map to themselves. Results are
+    read from and written to the persistent resolved-URL cache, with dead
+    links cached for a shorter time.
+    """
+    resolved, failed = {}, []
+    pending = []
+    cache = get_url_cache()
+    for url in dict.fromkeys(urls):
+        cached = cache.get(url)
+        if cached is not None:
+            resolved[url] = cached['final_url']
+        else:
+            pending.append(url)
+    urls = pending
+    if not urls:
+        return resolved
+    started = time.monotonic()
+    host_limits = defaultdict(lambda: threading.Semaphore(per_host))
+    limits_lock = threading.Lock()
+
+    def resolve(url):
+        with limits_lock:
+            limit = host_limits[urlparse(url).netloc.lower()]
+        with limit:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                raise TimeoutError("Link resolution deadline reached")
+            return resolve_with_http(url, timeout=min(RESOLVE_TIMEOUT, remaining))
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(urls)), thread_name_prefix="link-resolver")
+    try:
+        futures = {executor.submit(resolve, url): url for url in urls}
+        done, _ = wait(futures, timeout=deadline)
+        for future, url in futures.items():
+            if future not in done:
+                logger.warning(f"Link resolution deadline reached for {url}")
+                resolved[url] = url
+            elif future.exception() is not None:
+                failed.append(url)
+            else:
+                resolved[url] = future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if failed:
+        remaining = deadline - (time.monotonic() - started)
+        if remaining <= 0:
+            logger.warning(f"Link resolution deadline reached before the browser fallback for {len(failed)} URLs")
+            resolved.update((url, url) for url in failed)
+            return resolved
+        fallback = browser_fallback(failed, remaining) if browser_fallback else {}
+        for url in failed:
+            if fallback.get(url):
+                remember_resolution(url, fallback[url], 'browser')
+                resolved[url] = fallback[url]
+            else:
+                remember_resolution(url, url, 'failed')
+                resolved[url] = url
+    return resolved
+
+
+def categorize_resolved(urls, resolved):
+    """Categorize resolved links in input order, so results never depend on completion order"""
+    categorized_links = {}
+    for original_url in urls:
+        final_url = resolved.get(original_url)
+        if not final_url:
+            continue
+        category = categorize_link(final_url)
+        if category:
+            categorized_links[category] = final_url
+        elif 'portfolio' not in categorized_links:
+            categorized_links['portfolio'] = final_url
+    return categorized_links
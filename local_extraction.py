@@ -0,0 +1,74 @@
+from contact_patterns import scan
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Every field of the structured resume JSON, in prompt order
+EXTRACTION_FIELDS = ('name', 'email', 'phone', 'address', 'skills', 'experience', 'education',
+                     'linkedin', 'github', 'portfolio', 'google_drive', 'dropbox')
+LIST_FIELDS = ('skills', 'experience', 'education')
+LINK_FIELDS = ('linkedin', 'github', 'portfolio', 'google_drive', 'dropbox')
+
+# Fields local extraction fills and the model's answer cannot override: read
+# off the text or the link annotations, with nothing to interpret.
+# Name, address and the rest depend on layout and are left to Gemini.
+LOCAL_FIELDS = ('email', 'phone', 'linkedin', 'github', 'google_drive', 'dropbox')
+
+
+def _as_text(pages):
+    return pages if isinstance(pages, str) else "\n".join(pages)
+
+
+def find_links(matches, extracted_links=None):
+    """Categorized links: already-resolved PDF annotations first, then URLs written in the text"""
+    links = {field: url for field, url in (extracted_links or {}).items() if field in LOCAL_FIELDS and url}
+    for match in matches:
+        if match.kind == 'url' and match.category:
+            links.setdefault(match.category, match.value)
+    return links
+
+
+def extract_local_fields(pages, extracted_links=None):
+    """Fields that can be read without the model: email, phone and categorized links.
+
+    `pages` is the list of page texts (or the whole text), `extracted_links`
+    the categorized links from the PDF annotations. Only fields that were
+    found are returned.
+    """
+    matches = scan(_as_text(pages))
+    fields = {}
+    for kind in ('email', 'phone'):
+        found = next((match.value for match in matches if match.kind == kind), None)
+        if found:
+            fields[kind] = found
+    fields.update(find_links(matches, extracted_links))
+    logger.info(f"Local extraction found: {', '.join(fields) or 'nothing'}")
+    return fields
+
+
+def local_fallbacks(pages, extracted_links=None):
+    """Guesses used only where the model gave no answer: the first uncategorized link as the portfolio.
+
+    An uncategorized URL may just as well be an employer, university or
+    certificate page, so it never overrides the model.
+    """
+    portfolio = (extracted_links or {}).get('portfolio')
+    if not portfolio:
+        portfolio = next((match.value for match in scan(_as_text(pages))
+                          if match.kind == 'url' and not match.category), None)
+    return {'portfolio': portfolio} if portfolio else {}
+
+
+def is_missing(value):
+    return value in (None, '', 'N/A') or (isinstance(value, list) and not value)
+
+
+def merge_fields(*sources):
+    """Resume JSON with every field present; later sources win for the fields they fill"""
+    data = {field: [] if field in LIST_FIELDS else "N/A" for field in EXTRACTION_FIELDS}
+    for source in sources:
+        for field, value in source.items():
+            if not is_missing(value) or field not in data:
+                data[field] = value
+    return data
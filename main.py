@@ -1,8 +1,8 @@
 import streamlit as st
-import tempfile
 import os
 import json
 import time
+import uuid
 import requests
 # --- Streamlit Cloud: Ensure ChromeDriver is available ---
 # import chromedriver_autoinstaller
@@ -20,18 +20,37 @@ except ImportError:
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 import requests
-import re
 from typing import Dict, Any
-import PyPDF2
-import google.generativeai as genai
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import fitz  # PyMuPDF for better link extraction
 from urllib.parse import urlparse, urljoin
 from langchain.tools import BaseTool
+from driver_pool import get_driver_pool
+from driver_resolver import warm_up as warm_up_chromedriver
+from form_snapshot import take_form_snapshot, locate, resolve_label, is_text_input, is_interactable
+from batch_fill import batch_fill, locate_result
+from field_matcher import FIELD_SYNONYMS, default_matcher
+from form_schema_cache import get_form_schema_cache, structure_hash
+from contact_patterns import extract_links_from_text
+from link_resolver import (
+    resolve_urls, categorize_link, categorize_resolved,
+    record_browser_usage, get_browser_usage_stats, MIN_BROWSER_LOOKUP_SECONDS,
+)
+from pdf_ingest import ParsedDocument, ingest_pdf, read_text
+from gemini_client import get_gemini_client
+from resume_extraction import extract_resume_data, get_extraction_cache, get_extraction_latency_stats
+from local_extraction import EXTRACTION_FIELDS, is_missing
+from submission_scheduler import SubmissionScheduler, format_report
+from submission_signals import text_success_reasons, page_verdict
+from http_form import HTTP_FORMS, plan_http_submission
+from resource_blocking import load_page, format_savings, get_blocking_stats
+from submit_engine import DEBUG_HIGHLIGHT, rank_submit_candidates, order_strategies, get_click_strategy_memory
+from job_runner import JOB_POLL_INTERVAL, get_job_runner
+from page_waits import (
+    wait_for_page_ready, wait_for_dom_quiet, wait_for_post_action,
+    wait_for_value_committed, scroll_into_view, arm_click_watch, wait_for_click_effect,
+)
 
 # --- LangGraph Imports ---
 from langgraph.graph import StateGraph, END
@@ -57,9 +76,28 @@ if def_env_key:
     st.sidebar.info("Loaded API key from environment variable (hidden)")
 headless_mode = st.sidebar.checkbox("Headless Browser", value=True)
 timeout_seconds = st.sidebar.slider("Timeout (seconds)", 10, 60, 30)
+bypass_extraction_cache = st.sidebar.checkbox("Bypass extraction cache", value=False)
+extraction_cache_stats = get_extraction_cache().stats()
+st.sidebar.caption(
+    f"Extraction cache: {extraction_cache_stats['hits']} hits, "
+    f"{extraction_cache_stats['misses']} misses, {extraction_cache_stats['entries']} entries"
+)
+blocking_stats = get_blocking_stats()
+if blocking_stats['page_loads']:
+    st.sidebar.caption(f"Resource blocking over {blocking_stats['page_loads']} page loads: {format_savings(blocking_stats)}")
 
 if google_api_key:
     os.environ['GOOGLE_API_KEY'] = google_api_key
+    gemini_stats = get_gemini_client(google_api_key).stats()
+    used_models = {name: stats for name, stats in gemini_stats.items() if stats['calls']}
+    if used_models:
+        st.sidebar.caption("Gemini: " + "; ".join(
+            f"{name.split('/')[-1]} {stats['calls']} calls, {stats['errors']} errors"
+            + (f", p95 {stats['p95']:.1f}s" if stats['p95'] is not None else "")
+            + (f", first chunk p95 {stats['first_chunk_p95']:.1f}s" if stats['first_chunk_p95'] is not None else "")
+            + (" (cooling down)" if stats['cooling_down'] else "")
+            for name, stats in used_models.items()
+        ))
 
 # --- Session State Initialization ---
 if 'extracted_data' not in st.session_state:
@@ -72,6 +110,22 @@ if 'submission_result' not in st.session_state:
     st.session_state.submission_result = None
 if 'extracted_links' not in st.session_state:
     st.session_state.extracted_links = None
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if 'submission_job_id' not in st.session_state:
+    st.session_state.submission_job_id = None
+if 'multi_submission_job_id' not in st.session_state:
+    st.session_state.multi_submission_job_id = None
+
+# --- Resolve ChromeDriver and pre-launch pooled Chrome sessions in the background ---
+@st.cache_resource
+def start_browser_warm_up():
+    """Once per process, not on every rerun"""
+    warm_up_chromedriver()
+    return get_driver_pool()
+
+
+start_browser_warm_up()
 
 
 # CELL 1: Install Required Packages
@@ -83,69 +137,51 @@ from selenium.webdriver.common.keys import Keys
 import os
 import json
 import requests
-import re
 from typing import Dict, Any
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import time
 
 
 
 # CELL 2.5: Enhanced PDF Link Extraction Class
-import fitz  # PyMuPDF for better link extraction
 from urllib.parse import urlparse, urljoin
 
 class EnhancedPDFLinkExtractor:
     def __init__(self):
+        # The browser is only borrowed if a link cannot be resolved over HTTP
         self.driver = None
-        self.setup_browser()
+        self.browser_attempted = False
+        record_browser_usage(extractions=1)
 
-    def setup_browser(self):
-        """Setup headless Chrome browser for link following"""
+    def setup_browser(self, timeout=None):
+        """Borrow a headless Chrome session from the shared pool for link following,
+        waiting at most `timeout` seconds for one to become free"""
+        self.browser_attempted = True
         try:
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--window-size=1920,1080")
-
-            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+            self.driver = get_driver_pool().acquire(timeout=timeout)
+            record_browser_usage(browser_sessions=1)
             print("✅ Browser setup completed")
         except Exception as e:
             print(f"⚠ Browser setup failed: {e}")
             self.driver = None
 
-    def extract_links_from_pdf(self, pdf_path):
-        """Extract clickable links directly from PDF file"""
+    def extract_links_from_pdf(self, pdf):
+        """Extract clickable links from a parsed document (or a PDF path)"""
         extracted_links = {}
 
         try:
-            # Method 1: Using PyMuPDF (fitz) - better for link extraction
-            pdf_document = fitz.open(pdf_path)
-            all_links = []
+            document = pdf if isinstance(pdf, ParsedDocument) else ingest_pdf(pdf)
 
-            print(f"📄 Processing PDF with {pdf_document.page_count} pages...")
+            print(f"📄 Processing PDF with {document.page_count} pages...")
 
-            for page_num in range(pdf_document.page_count):
-                page = pdf_document[page_num]
-                links = page.get_links()
+            for link in document.links:
+                print(f"📎 Found link on page {link['page']}: {link['url']}")
 
-                for link in links:
-                    if 'uri' in link:
-                        url = link['uri']
-                        if url and url.startswith(('http://', 'https://')):
-                            all_links.append(url)
-                            print(f"📎 Found link on page {page_num + 1}: {url}")
-
-            pdf_document.close()
-
-            # Remove duplicates
-            unique_links = list(set(all_links))
+            # Remove duplicates, keeping the order they appear in
+            unique_links = document.urls
             print(f"📊 Total unique links found: {len(unique_links)}")
 
             if unique_links:
@@ -153,153 +189,122 @@ class EnhancedPDFLinkExtractor:
             else:
                 print("❌ No clickable links found in PDF")
                 # Fallback to text extraction method
-                extracted_links = self.fallback_text_extraction(pdf_path)
+                extracted_links = self.fallback_text_extraction(document)
 
             return extracted_links
 
         except Exception as e:
             print(f"❌ PDF link extraction failed: {e}")
-            return self.fallback_text_extraction(pdf_path)
+            return self.fallback_text_extraction(pdf)
 
     def process_and_categorize_links(self, links):
         """Process links by following redirects and categorize them"""
-        categorized_links = {}
-
         print("\n🔗 Processing and categorizing links...")
 
+        # Resolve every link concurrently; only failures go through the browser
+        resolved = resolve_urls(links, browser_fallback=self.resolve_with_browser)
         for original_url in links:
-            try:
-                print(f"\n🔍 Processing: {original_url}")
-
-                # Get final URL after redirects
-                final_url = self.get_final_url(original_url)
+            print(f"\n🔍 {original_url} -> {resolved.get(original_url)}")
 
-                if final_url:
-                    category = self.categorize_link(final_url)
-
-                    if category:
-                        categorized_links[category] = final_url
-                        print(f"✅ {category.title()}: {final_url}")
-                    else:
-                        if 'portfolio' not in categorized_links:
-                            categorized_links['portfolio'] = final_url
-                            print(f"✅ Portfolio: {final_url}")
-
-            except Exception as e:
-                print(f"⚠ Error processing {original_url}: {e}")
-                continue
+        categorized_links = categorize_resolved(links, resolved)
+        for category, final_url in categorized_links.items():
+            print(f"✅ {category.replace('_', ' ').title()}: {final_url}")
 
         return categorized_links
 
     def get_final_url(self, url):
         """Follow redirects to get the final URL"""
-        try:
-            response = requests.head(url, allow_redirects=True, timeout=10)
-            return response.url
-        except:
-            return self.get_final_url_with_browser(url)
+        return resolve_urls([url], browser_fallback=self.resolve_with_browser).get(url, url)
+
+    def resolve_with_browser(self, urls, timeout=None):
+        """Resolve a batch of URLs one after another through the single browser session,
+        giving up on the rest once `timeout` seconds have passed"""
+        final_urls = {}
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self.driver and not self.browser_attempted:
+            self.setup_browser(timeout=timeout)
+        for url in urls:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining < MIN_BROWSER_LOOKUP_SECONDS:
+                print(f"⚠ Link resolution deadline reached, {url} left unresolved")
+                break
+            try:
+                final_urls[url] = self.browse_final_url(url, timeout=remaining)
+            except Exception as e:
+                print(f"⚠ Browser could not resolve {url}: {e}")
+        return final_urls
 
     def get_final_url_with_browser(self, url):
         """Use browser to get final URL"""
-        if not self.driver:
-            return url
-
         try:
-            self.driver.get(url)
-            time.sleep(3)
-            return self.driver.current_url
+            return self.browse_final_url(url)
         except:
             return url
 
-    def categorize_link(self, url):
-        """Categorize a URL based on its domain"""
-        url_lower = url.lower()
+    def browse_final_url(self, url, timeout=None):
+        """Load a URL in the borrowed browser and return where it ended up,
+        spending at most `timeout` seconds on the load and the settle waits"""
+        if not self.driver and not self.browser_attempted:
+            self.setup_browser()
+        if not self.driver:
+            raise RuntimeError("No browser available")
 
-        if 'linkedin.com' in url_lower and ('/in/' in url_lower or '/profile/' in url_lower):
-            return 'linkedin'
-        elif 'github.com' in url_lower:
-            return 'github'
-        elif 'drive.google.com' in url_lower:
-            return 'google_drive'
-        elif 'dropbox.com' in url_lower:
-            return 'dropbox'
+        record_browser_usage(browser_lookups=1)
+        if timeout is None:
+            load_page(self.driver, url, wait=wait_for_page_ready)
+            return self.driver.current_url
+        started = time.monotonic()
+        previous = self.driver.timeouts.page_load
+        self.driver.set_page_load_timeout(timeout)
+        try:
+            load_page(self.driver, url, wait=lambda driver, page_url: wait_for_page_ready(
+                driver, page_url, timeout=timeout - (time.monotonic() - started)))
+        except TimeoutException:
+            # Redirects are usually done before the page finishes loading
+            print(f"⚠ Page load for {url} cut off at the deadline")
+        finally:
+            self.driver.set_page_load_timeout(previous)
+        return self.driver.current_url
 
-        return None
+    def categorize_link(self, url):
+        """Categorize a URL based on its domain"""
+        return categorize_link(url)
 
-    def fallback_text_extraction(self, pdf_path):
-        """Fallback method using text extraction"""
+    def fallback_text_extraction(self, pdf):
+        """Fallback method using text extraction (from a parsed document or the raw PDF)"""
         print("\n🔄 Falling back to text extraction method...")
 
         try:
-            pdf_document = fitz.open(pdf_path)
-            full_text = ""
-
-            for page in pdf_document:
-                full_text += page.get_text()
-
-            pdf_document.close()
-            return extract_links_from_text(full_text)
+            text = pdf.text if isinstance(pdf, ParsedDocument) else read_text(pdf)
+            return extract_links_from_text(text)
 
         except Exception as e:
             print(f"❌ Fallback text extraction failed: {e}")
             return {}
 
     def cleanup(self):
-        """Clean up browser resources"""
+        """Return the borrowed browser to the pool"""
         if self.driver:
             try:
-                self.driver.quit()
+                get_driver_pool().release(self.driver)
+                self.driver = None
                 print("✅ Browser cleanup completed")
             except Exception as e:
                 print(f"⚠ Browser cleanup failed: {e}")
 
 # CELL 3: Simple Link Extraction Function
-def extract_links_from_text(text):
-    """Simple and effective link extraction"""
-    links = {}
-
-    # Clean text by adding spaces around URLs
-    text = re.sub(r'([a-zA-Z])([www\.])', r'\1 \2', text)
-    text = re.sub(r'([a-zA-Z])(https?://)', r'\1 \2', text)
-
-    # Simple patterns for common links
-    patterns = {
-        'linkedin': [
-            r'linkedin\.com/in/[\w\-\.%]+',
-            r'https?://(?:www\.)?linkedin\.com/in/[\w\-\.%]+',
-            r'linkedin:?\s*[\w\-\.%/]+',
-        ],
-        'github': [
-            r'github\.com/[\w\-\.]+',
-            r'https?://(?:www\.)?github\.com/[\w\-\.]+',
-        ],
-        'email': [
-            r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
-        ]
-    }
-
-    for link_type, pattern_list in patterns.items():
-        for pattern in pattern_list:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                url = matches[0]
-                if link_type in ['linkedin', 'github'] and not url.startswith('http'):
-                    url = 'https://' + url
-                links[link_type] = url
-                break
-
-    return links
+# extract_links_from_text lives in contact_patterns.py (one precompiled scan for emails, phones and links)
 
 # CELL 3.5: Enhanced Link Extraction Function
-def enhanced_extract_links_from_pdf(pdf_path):
-    """Enhanced function to extract links from PDF"""
+def enhanced_extract_links_from_pdf(pdf):
+    """Enhanced function to extract links from a parsed document or PDF path"""
 
     print("🚀 Starting enhanced PDF link extraction...")
 
     extractor = EnhancedPDFLinkExtractor()
 
     try:
-        extracted_links = extractor.extract_links_from_pdf(pdf_path)
+        extracted_links = extractor.extract_links_from_pdf(pdf)
 
         print(f"\n📊 Final extracted links summary:")
         if extracted_links:
@@ -308,6 +313,9 @@ def enhanced_extract_links_from_pdf(pdf_path):
         else:
             print("   ❌ No links found")
 
+        stats = get_browser_usage_stats()
+        print(f"   🌐 Browser needed for {stats['browser_sessions']} of {stats['extractions']} extractions so far")
+
         return extracted_links
 
     finally:
@@ -320,12 +328,7 @@ class PDFReaderTool(BaseTool):
 
     def _run(self, pdf_path: str) -> str:
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
+            return ingest_pdf(pdf_path).text
         except Exception as e:
             return f"Error reading PDF: {str(e)}"
 
@@ -337,128 +340,161 @@ import time
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from langchain.tools import BaseTool
-from selenium.webdriver.support.ui import Select
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 
 class EnhancedWebFormFillerTool(BaseTool):
     name: str = "Enhanced Web Form Filler"
     description: str = "Fills web forms automatically with user input for missing fields"
-
-    def _run(self, form_data: str, user_field_values: dict = None) -> str:
-        logs = []
+    # Retry fields the page rejected by typing them key by key
+    keystroke_fallback: bool = False
+    # Try submitting plain HTML forms over HTTP before starting a browser
+    http_fast_path: bool = HTTP_FORMS
+    # Outline each element before clicking it, for watching a visible browser
+    debug_highlight: bool = DEBUG_HIGHLIGHT
+
+    def _run(self, form_data: str, user_field_values: dict = None, outcome: dict = None, logs: list = None,
+             ask_for_unfilled: bool = False) -> str:
+        """Fill and submit the form; `outcome`, if given, receives the structured result
+        (filled fields, verdict, error, and whether a submit was attempted).
+
+        Steps are appended to `logs` if given. With `ask_for_unfilled`, a form
+        that still has unfilled fields is not submitted; they are returned in
+        outcome['unfilled_fields'] for the user to answer.
+        """
+        logs = [] if logs is None else logs
+        outcome = {} if outcome is None else outcome
+        outcome.update({'filled': [], 'verdict': None, 'error': None, 'submit_attempted': False,
+                        'unfilled_fields': []})
         try:
             logs.append("[START] EnhancedWebFormFillerTool._run")
             data = json.loads(form_data) if isinstance(form_data, str) else form_data
             form_url = data.get('form_url')
             logs.append(f"Form URL: {form_url}")
-            chrome_options = Options()
-            chrome_options.add_argument("--headless=new")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-            chrome_options.add_argument("--disable-web-security")
-            chrome_options.add_argument("--allow-running-insecure-content")
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            driver.execute_script("Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]})")
-            driver.execute_script("Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']})")
-            try:
-                logs.append("[STEP] Navigating to form URL...")
-                driver.get(form_url)
-                time.sleep(5)
-                WebDriverWait(driver, 10).until(
-                    lambda d: d.execute_script("return document.readyState") == "complete"
-                )
-                logs.append("[STEP] Filling known fields...")
-                filled_fields = self.fill_known_fields(driver, data)
-                logs.append(f"Filled fields: {filled_fields}")
-                logs.append("[STEP] Detecting unfilled fields...")
-                unfilled_fields = self.detect_all_unfilled_fields(driver)
-                logs.append(f"Unfilled fields: {[f['name'] for f in unfilled_fields]}")
-                additional_filled = []
-                if unfilled_fields:
-                    logs.append("[STEP] Filling user-provided fields...")
-                    if user_field_values:
-                        additional_filled = self.fill_user_provided_fields(driver, user_field_values)
-                        logs.append(f"User-provided fields filled: {additional_filled}")
-                logs.append("[STEP] Checking form validation...")
-                validation_errors = self.check_form_validation(driver)
-                logs.append(f"Validation errors: {validation_errors}")
-                total_filled = filled_fields + additional_filled
-                logs.append("[STEP] Submitting the form...")
-                submit_result = self.enhanced_form_submission_v2(driver, logs)
-                logs.append(f"Submission result: {submit_result}")
-                result = f"📋 FORM PROCESSING COMPLETE!\n"
-                result += f"📊 Total fields filled: {len(total_filled)}\n"
-                result += f"🎯 Fields: {', '.join(total_filled)}\n"
-                result += f"\n{submit_result}\n"
-                result += "\n[LOGS]\n" + "\n".join(logs)
-                return result
-            finally:
-                driver.quit()
+            # Plain HTML forms are posted directly; anything needing JavaScript goes to Chrome
+            fast = self.submit_over_http(form_url, data, logs, outcome) if self.http_fast_path and not user_field_values else None
+            if fast:
+                total_filled, submit_result = fast
+            else:
+                with get_driver_pool().session() as driver:
+                    logs.append("[STEP] Navigating to form URL...")
+                    savings = load_page(driver, form_url, wait=wait_for_page_ready)
+                    logs.append(f"Page load: {format_savings(savings)}")
+                    snapshot = take_form_snapshot(driver)
+                    structure = structure_hash(snapshot)
+                    schema_cache = get_form_schema_cache()
+                    # User-provided values depend on this run's detection, so they bypass the cache
+                    schema = None if user_field_values else schema_cache.lookup(form_url, structure)
+                    cached = None
+                    if schema:
+                        logs.append("[STEP] Known form layout (schema cache hit), filling and submitting directly...")
+                        outcome['submit_attempted'] = True
+                        cached = self.submit_from_schema(driver, data, schema)
+                        if cached is None:
+                            # Nothing was clicked yet, so the full path below is a first submission
+                            outcome['submit_attempted'] = False
+                            logs.append("[STEP] Cached schema no longer fits the page, running full detection...")
+                            schema_cache.invalidate(form_url)
+                    if cached:
+                        total_filled, submit_result = cached
+                        logs.append(f"Filled fields: {total_filled}")
+                        logs.append(f"Expected success signal: {schema['success_signal']}")
+                        if "SUCCESS" not in submit_result and "LIKELY" not in submit_result:
+                            schema_cache.invalidate(form_url)
+                    else:
+                        logs.append("[STEP] Filling known fields...")
+                        filled_fields = self.fill_known_fields(driver, data, snapshot)
+                        logs.append(f"Filled fields: {filled_fields}")
+                        logs.append("[STEP] Detecting unfilled fields...")
+                        unfilled_fields = self.detect_all_unfilled_fields(driver)
+                        logs.append(f"Unfilled fields: {[f['name'] for f in unfilled_fields]}")
+                        if unfilled_fields and ask_for_unfilled and not user_field_values:
+                            logs.append("[STEP] Waiting for answers to the unfilled fields before submitting")
+                            outcome['filled'] = list(filled_fields)
+                            outcome['unfilled_fields'] = unfilled_fields
+                            return f"⏸ {len(unfilled_fields)} fields need your input\n[LOGS]\n" + "\n".join(logs)
+                        additional_filled = []
+                        if unfilled_fields:
+                            logs.append("[STEP] Filling user-provided fields...")
+                            if user_field_values:
+                                additional_filled = self.fill_user_provided_fields(driver, user_field_values)
+                                logs.append(f"User-provided fields filled: {additional_filled}")
+                        logs.append("[STEP] Checking form validation...")
+                        validation_errors = self.check_form_validation(driver)
+                        logs.append(f"Validation errors: {validation_errors}")
+                        total_filled = filled_fields + additional_filled
+                        logs.append("[STEP] Submitting the form...")
+                        outcome['submit_attempted'] = True
+                        submit_result = self.enhanced_form_submission_v2(driver, logs, outcome)
+                        confirmed = "SUCCESS" in submit_result or "LIKELY" in submit_result
+                        if confirmed and outcome.get('submit_locator') and not user_field_values \
+                                and not any(f['required'] for f in unfilled_fields):
+                            # Every field the form can take, so candidates with other fields are served too
+                            fields = {
+                                field_name: control['locator']
+                                for field_name, control in default_matcher.match(snapshot, FIELD_SYNONYMS).items()
+                            }
+                            schema_cache.store(form_url, structure, fields, outcome['submit_locator'], submit_result)
+            logs.append(f"Submission result: {submit_result}")
+            outcome['filled'] = list(total_filled)
+            outcome['verdict'] = submit_result
+            result = f"📋 FORM PROCESSING COMPLETE!\n"
+            result += f"📊 Total fields filled: {len(total_filled)}\n"
+            result += f"🎯 Fields: {', '.join(total_filled)}\n"
+            result += f"\n{submit_result}\n"
+            result += "\n[LOGS]\n" + "\n".join(logs)
+            return result
         except Exception as e:
             logs.append(f"❌ Error: {str(e)}")
+            outcome['error'] = e
             return f"❌ Error: {str(e)}\n[LOGS]\n" + "\n".join(logs)
 
-    def fill_known_fields(self, driver, data):
+    def submit_over_http(self, form_url, data, logs, outcome):
+        """Submit a plain HTML form without a browser; returns (filled_fields, verdict),
+        or None if the page needs the browser (nothing has been submitted then)"""
+        try:
+            plan, reason = plan_http_submission(form_url, self.known_field_values(data))
+        except requests.RequestException as e:
+            plan, reason = None, str(e)
+        if plan is None:
+            logs.append(f"[STEP] HTTP fast path skipped ({reason}), using the browser...")
+            return None
+        logs.append(f"[STEP] Plain HTML form, submitting over HTTP to {plan.action}...")
+        try:
+            verdict = plan.submit()
+        except requests.RequestException:
+            # The request may have reached the server, so it must not be sent again from the browser
+            outcome['submit_attempted'] = True
+            raise
+        if verdict is None:
+            logs.append("[STEP] Form endpoint did not take the HTTP submission, using the browser...")
+            return None
+        outcome['submit_attempted'] = True
+        logs.append(f"Filled fields: {plan.filled_fields}")
+        return plan.filled_fields, verdict
+
+    def fill_known_fields(self, driver, data, snapshot=None):
         """Fill fields with known data from user input"""
         filled_fields = []
 
-        # Field mappings with multiple selectors for each field type
-        field_mappings = {
-            'name': [
-                "//input[@name='name' or @id='name']",
-                "//input[contains(@placeholder, 'Name')]",
-                "//input[contains(@name, 'first') or contains(@name, 'full')]",
-                "//input[@type='text'][1]"
-            ],
-            'email': [
-                "//input[@type='email']",
-                "//input[@name='email' or @id='email']",
-                "//input[contains(@placeholder, 'Email')]"
-            ],
-            'phone': [
-                "//input[@type='tel']",
-                "//input[@name='phone' or @id='phone' or @name='mobile']",
-                "//input[contains(@placeholder, 'Phone') or contains(@placeholder, 'Mobile')]"
-            ],
-            'skills': [
-                "//textarea[@name='skills' or @id='skills']",
-                "//input[@name='skills' or @id='skills']",
-                "//textarea[contains(@placeholder, 'Skills')]"
-            ],
-            'experience': [
-                "//textarea[@name='experience' or @id='experience']",
-                "//textarea[contains(@placeholder, 'Experience')]"
-            ],
-            'education': [
-                "//textarea[@name='education' or @id='education']",
-                "//input[@name='education' or @id='education']"
-            ],
-            'linkedin': [
-                "//input[@name='linkedin' or @id='linkedin']",
-                "//input[contains(@placeholder, 'LinkedIn')]"
-            ],
-            'github': [
-                "//input[@name='github' or @id='github']",
-                "//input[contains(@placeholder, 'GitHub')]"
-            ],
-            'address': [
-                "//textarea[@name='address' or @id='address']",
-                "//input[@name='address' or @id='address']"
-            ]
-        }
-
         print("\n📝 Filling known fields...")
-        for field_name, selectors in field_mappings.items():
+        if snapshot is None:
+            snapshot = take_form_snapshot(driver)
+        entries = self.plan_known_fields(snapshot, data)
+
+        # Fill every matched field in one round trip
+        report = batch_fill(driver, entries)
+        for entry in entries:
+            if self.apply_fill_result(driver, entry, report.get(entry['field'], {})):
+                filled_fields.append(entry['field'])
+                print(f"   ✅ {entry['field']}: {entry['value'][:50]}...")
+
+        return filled_fields
+
+    def known_field_values(self, data):
+        """Resume values worth filling, as strings"""
+        values = {}
+        for field_name in FIELD_SYNONYMS:
             field_value = data.get(field_name)
 
             if not field_value or field_value == "N/A":
@@ -468,29 +504,61 @@ class EnhancedWebFormFillerTool(BaseTool):
             if isinstance(field_value, list):
                 field_value = ', '.join(str(item) for item in field_value)
 
-            # Try each selector until one works
-            for selector in selectors:
-                try:
-                    element = WebDriverWait(driver, 3).until(
-                        EC.element_to_be_clickable((By.XPATH, selector))
-                    )
-                    
-                    if element.is_displayed() and element.is_enabled():
-                        # Scroll to element and wait
-                        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                        time.sleep(1)
-
-                        # Clear and fill with enhanced method
-                        self.safe_fill_field(driver, element, str(field_value))
-                        
-                        filled_fields.append(field_name)
-                        print(f"   ✅ {field_name}: {str(field_value)[:50]}...")
-                        break
-
-                except:
-                    continue
+            values[field_name] = str(field_value)
+        return values
 
-        return filled_fields
+    def plan_known_fields(self, snapshot, data):
+        """Match resume data onto the snapshot's controls; returns batch fill entries"""
+        values = self.known_field_values(data)
+        assignment = default_matcher.match(snapshot, values)
+        return [
+            {'field': field_name, 'selectors': [assignment[field_name]['locator']], 'value': value}
+            for field_name, value in values.items() if field_name in assignment
+        ]
+
+    def submit_from_schema(self, driver, data, schema):
+        """Fill and submit a form whose layout is cached.
+
+        Returns (filled_fields, verdict), or None if the cached layout no longer
+        fits the page and nothing has been submitted yet.
+        """
+        values = self.known_field_values(data)
+        entries = [
+            {'field': field_name, 'selectors': [locator], 'value': values[field_name]}
+            for field_name, locator in schema['fields'].items() if field_name in values
+        ]
+        report = batch_fill(driver, entries)
+        filled_fields = [entry['field'] for entry in entries
+                         if self.apply_fill_result(driver, entry, report.get(entry['field'], {}))]
+        if len(filled_fields) < len(entries):
+            return None
+        try:
+            element = driver.find_element(By.CSS_SELECTOR, schema['submit_locator'])
+        except NoSuchElementException:
+            return None
+        original_url = driver.current_url
+        memory = get_click_strategy_memory()
+        strategy = self.try_robust_click(driver, element, "cached submit element", memory.preferred(original_url))
+        if not strategy:
+            return None
+        self.wait_for_submit_effect(driver, original_url)
+        verdict = self.verify_submission_v2(driver, original_url)
+        if "SUCCESS" in verdict or "LIKELY" in verdict:
+            memory.remember(original_url, strategy)
+        return filled_fields, verdict
+
+    def apply_fill_result(self, driver, entry, result):
+        """Check a batch fill result, optionally retrying rejected fields keystroke by keystroke"""
+        status = result.get('status')
+        if status == 'rejected' and self.keystroke_fallback and isinstance(entry['value'], str):
+            element = locate_result(driver, result)
+            if element is not None:
+                scroll_into_view(driver, element)
+                if self.safe_fill_field(driver, element, entry['value']):
+                    status = 'filled'
+        if status == 'rejected':
+            print(f"   ⚠ {entry['field']}: value rejected by the page")
+        return status == 'filled'
 
     def safe_fill_field(self, driver, element, value):
         """Safely fill a field with multiple fallback methods"""
@@ -498,10 +566,9 @@ class EnhancedWebFormFillerTool(BaseTool):
             # Method 1: Clear and type normally
             element.clear()
             element.send_keys(value)
-            time.sleep(0.5)
             
             # Verify the value was set
-            if element.get_attribute('value') == value:
+            if wait_for_value_committed(driver, element, value):
                 return True
                 
         except:
@@ -512,8 +579,8 @@ class EnhancedWebFormFillerTool(BaseTool):
             driver.execute_script("arguments[0].value = arguments[1];", element, value)
             driver.execute_script("arguments[0].dispatchEvent(new Event('input', {bubbles: true}));", element)
             driver.execute_script("arguments[0].dispatchEvent(new Event('change', {bubbles: true}));", element)
-            time.sleep(0.5)
-            return True
+            if wait_for_value_committed(driver, element, value):
+                return True
             
         except:
             pass
@@ -524,205 +591,94 @@ class EnhancedWebFormFillerTool(BaseTool):
             element.clear()
             for char in value:
                 element.send_keys(char)
-                time.sleep(0.1)
-            return True
+            return wait_for_value_committed(driver, element, value)
             
         except:
             return False
 
-    def detect_all_unfilled_fields(self, driver):
+    def detect_all_unfilled_fields(self, driver, snapshot=None):
         """Detect all unfilled input fields on the page, including dropdowns and checkboxes"""
         unfilled_fields = []
 
-        input_selectors = [
-            "//input[@type='text']",
-            "//input[@type='email']",
-            "//input[@type='tel']",
-            "//input[@type='url']",
-            "//input[@type='number']",
-            "//input[not(@type)]",
-            "//textarea",
-            # Do not include select here, handle separately
-        ]
-
         print("\n🔍 Scanning for unfilled fields...")
 
-        for selector in input_selectors:
-            try:
-                elements = driver.find_elements(By.XPATH, selector)
-
-                for element in elements:
-                    if (element.is_displayed() and
-                        element.is_enabled() and
-                        not element.get_attribute('value') and
-                        element.get_attribute('type') != 'hidden'):
-
-                        field_info = {
-                            'element': element,
-                            'name': element.get_attribute('name') or element.get_attribute('id') or f"field_{len(unfilled_fields)+1}",
-                            'placeholder': element.get_attribute('placeholder') or "No placeholder",
-                            'type': element.get_attribute('type') or element.tag_name,
-                            'required': element.get_attribute('required') is not None,
-                            'label': self.get_field_label(driver, element)
-                        }
+        if snapshot is None:
+            snapshot = take_form_snapshot(driver)
 
-                        unfilled_fields.append(field_info)
-
-            except Exception as e:
+        for control in snapshot:
+            if not is_interactable(control):
                 continue
 
-        # Detect dropdowns (select)
-        select_elements = driver.find_elements(By.TAG_NAME, "select")
-        for element in select_elements:
-            if element.is_displayed() and element.is_enabled() and not element.get_attribute('value'):
-                options = [o.text for o in element.find_elements(By.TAG_NAME, "option") if o.text]
-                field_info = {
-                    'element': element,
-                    'name': element.get_attribute('name') or element.get_attribute('id') or f"select_{len(unfilled_fields)+1}",
-                    'type': 'select',
-                    'options': options,
-                    'label': self.get_field_label(driver, element),
-                    'placeholder': element.get_attribute('placeholder') or "No placeholder",
-                    'required': element.get_attribute('required') is not None,
-                }
-                unfilled_fields.append(field_info)
-
-        # Detect checkboxes
-        checkbox_elements = driver.find_elements(By.XPATH, "//input[@type='checkbox']")
-        for element in checkbox_elements:
-            if element.is_displayed() and element.is_enabled() and not element.is_selected():
-                field_info = {
-                    'element': element,
-                    'name': element.get_attribute('name') or element.get_attribute('id') or f"checkbox_{len(unfilled_fields)+1}",
-                    'type': 'checkbox',
-                    'label': self.get_field_label(driver, element),
-                    'placeholder': element.get_attribute('placeholder') or "No placeholder",
-                    'required': element.get_attribute('required') is not None,
-                }
-                unfilled_fields.append(field_info)
-
-        return unfilled_fields
-
-    def get_field_label(self, driver, element):
-        """Try to find the label for a field"""
-        try:
-            element_id = element.get_attribute('id')
-            if element_id:
-                label = driver.find_element(By.XPATH, f"//label[@for='{element_id}']")
-                if label.text.strip():
-                    return label.text.strip()
-
-            label = driver.execute_script("""
-                var element = arguments[0];
-                var prev = element.previousElementSibling;
-                while(prev) {
-                    if(prev.tagName.toLowerCase() === 'label') {
-                        return prev.textContent.trim();
-                    }
-                    prev = prev.previousElementSibling;
-                }
-                return '';
-            """, element)
+            if is_text_input(control):
+                if control['value'] or control['type'] == 'hidden':
+                    continue
+                field_type = control['type_attr'] or control['tag']
+                default_name = f"field_{len(unfilled_fields)+1}"
+            elif control['tag'] == 'select':
+                # Dropdowns
+                if control['value']:
+                    continue
+                field_type = 'select'
+                default_name = f"select_{len(unfilled_fields)+1}"
+            elif control['tag'] == 'input' and control['type'] == 'checkbox':
+                # Checkboxes
+                if control['checked']:
+                    continue
+                field_type = 'checkbox'
+                default_name = f"checkbox_{len(unfilled_fields)+1}"
+            else:
+                continue
 
-            if label:
-                return label
+            field_info = {
+                'locator': control['locator'],
+                'name': control['name'] or control['id'] or default_name,
+                'placeholder': control['placeholder'] or "No placeholder",
+                'type': field_type,
+                'required': control['required'],
+                'label': resolve_label(control)
+            }
+            if field_type == 'select':
+                field_info['options'] = [o['text'] for o in control['options'] if o['text']]
 
-        except:
-            pass
+            unfilled_fields.append(field_info)
 
-        return "No label found"
+        return unfilled_fields
 
     def fill_user_provided_fields(self, driver, user_data):
-        """Fill fields with user-provided data using robust selectors"""
+        """Fill fields with user-provided data, located through the form snapshot"""
         filled_fields = []
+        entries = []
+        names = {}
+        snapshot = take_form_snapshot(driver)
         for field_index, field_data in user_data.items():
             value = field_data['value']
             field_info = field_data['field_info']
             field_name = field_info.get('name', '')
             field_type = field_info.get('type', '')
-            label_text = field_info.get('label', '')
-            placeholder = field_info.get('placeholder', '')
-
-            selectors = [
-                f"//input[@name='{field_name}']",
-                f"//input[@id='{field_name}']",
-                f"//textarea[@name='{field_name}']",
-                f"//textarea[@id='{field_name}']",
-                f"//input[contains(@placeholder, '{placeholder}')]",
-                f"//textarea[contains(@placeholder, '{placeholder}')]",
-                f"//input[contains(@aria-label, '{label_text}')]",
-                f"//textarea[contains(@aria-label, '{label_text}')]",
-                f"//input[contains(@placeholder, '{label_text}')]",
-                f"//textarea[contains(@placeholder, '{label_text}')]",
-            ]
-            element = None
-            if field_type == 'select':
-                try:
-                    # Always re-find the element by name or id to avoid stale reference
-                    if field_name:
-                        try:
-                            element = driver.find_element(By.NAME, field_name)
-                        except:
-                            try:
-                                element = driver.find_element(By.ID, field_name)
-                            except:
-                                pass
-                    if element is None:
-                        # As a last resort, find the first visible select
-                        selects = driver.find_elements(By.TAG_NAME, "select")
-                        for sel in selects:
-                            if sel.is_displayed() and sel.is_enabled():
-                                element = sel
-                                break
-                    select = Select(element)
-                    select.select_by_visible_text(value)
-                    filled_fields.append(field_name)
-                    print(f"   ✅ {field_name}: {value}")
-                except Exception as e:
-                    print(f"   ❌ Failed to select {value} for {field_name}: {e}")
-            elif field_type == 'checkbox':
-                try:
-                    # Always re-find the element by name or id to avoid stale reference
-                    if field_name:
-                        try:
-                            element = driver.find_element(By.NAME, field_name)
-                        except:
-                            try:
-                                element = driver.find_element(By.ID, field_name)
-                            except:
-                                pass
-                    if element is None:
-                        # As a last resort, find the first visible checkbox
-                        checkboxes = driver.find_elements(By.XPATH, "//input[@type='checkbox']")
-                        for cb in checkboxes:
-                            if cb.is_displayed() and cb.is_enabled():
-                                element = cb
-                                break
-                    if value and not element.is_selected():
-                        element.click()
-                    elif not value and element.is_selected():
-                        element.click()
-                    filled_fields.append(field_name)
-                except Exception as e:
-                    print(f"   ❌ Failed to set checkbox {field_name}: {e}")
+
+            # Re-find the field in the current page by locator, then name/id, then label words
+            control = default_matcher.find_control(snapshot, field_info)
+            if control is None:
+                print(f"   ❌ Failed to fill {field_name}: element not found")
+                continue
+            selectors = [control['locator']]
+            if field_type not in ('select', 'checkbox'):
+                value = str(value)
+            key = str(field_index)
+            names[key] = field_name
+            entries.append({'field': key, 'selectors': selectors, 'value': value})
+
+        report = batch_fill(driver, entries)
+        for entry in entries:
+            field_name = names[entry['field']]
+            result = report.get(entry['field'], {})
+            if result.get('status') == 'not_found':
+                print(f"   ❌ Failed to fill {field_name}: element not found")
+            elif self.apply_fill_result(driver, entry, result):
+                filled_fields.append(field_name)
+                print(f"   ✅ {field_name}: {entry['value']}")
             else:
-                # Existing logic for text/textarea
-                for selector in selectors:
-                    try:
-                        element = driver.find_element(By.XPATH, selector)
-                        break
-                    except:
-                        continue
-                if element:
-                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                    time.sleep(1)
-                    if self.safe_fill_field(driver, element, value):
-                        filled_fields.append(field_name)
-                        print(f"   ✅ {field_name}: {value}")
-                    else:
-                        print(f"   ❌ Failed to fill {field_name}")
-                else:
-                    print(f"   ❌ Failed to fill {field_name}: element not found")
+                print(f"   ❌ Failed to fill {field_name}")
         return filled_fields
 
     def check_form_validation(self, driver):
@@ -747,12 +703,16 @@ class EnhancedWebFormFillerTool(BaseTool):
 
         return errors
 
-    def enhanced_form_submission_v2(self, driver, logs=None):
-        """Enhanced form submission with robust clicking mechanisms"""
+    def enhanced_form_submission_v2(self, driver, logs=None, outcome=None):
+        """Enhanced form submission with robust clicking mechanisms.
+
+        If `outcome` is a dict, the locator of the element that submitted the
+        form is stored in it under 'submit_locator'.
+        """
         print("\n🚀 Starting enhanced form submission v2...")
 
-        # Wait for any dynamic content to load
-        time.sleep(3)
+        # Wait for any dynamic content to settle
+        wait_for_dom_quiet(driver)
 
         # Store original URL for comparison
         original_url = driver.current_url
@@ -766,27 +726,39 @@ class EnhancedWebFormFillerTool(BaseTool):
 
         print(f"🔍 Found {len(submit_candidates)} potential submit elements")
 
-        # Try each candidate with multiple clicking strategies
+        # The strategy that last worked on this site is tried first
+        memory = get_click_strategy_memory()
+        preferred = memory.preferred(original_url)
+        if preferred:
+            print(f"🧠 {preferred} worked here before; trying it first")
+
+        # Try the best-ranked candidates with multiple clicking strategies
         for i, candidate in enumerate(submit_candidates[:5], 1):  # Try top 5 candidates
-            element = candidate['element']
             description = candidate['description']
             score = candidate['score']
 
             print(f"\n🎯 Attempt #{i}: {description} (score: {score})")
 
+            try:
+                element = locate(driver, candidate)
+            except NoSuchElementException:
+                print(f"   ❌ Element is no longer on the page")
+                continue
+
             # Try multiple clicking strategies for this element
-            success = self.try_robust_click(driver, element, description)
+            strategy = self.try_robust_click(driver, element, description, preferred)
 
-            if success:
-                # Wait and check if submission was successful
-                time.sleep(5)
+            if strategy:
+                # Race navigation against DOM changes instead of waiting out a fixed delay
+                self.wait_for_submit_effect(driver, original_url)
 
                 # Check for URL change or success indicators
                 verification_result = self.verify_submission_v2(driver, original_url)
 
-                if "SUCCESS" in verification_result:
-                    return verification_result
-                elif "LIKELY" in verification_result:
+                if "SUCCESS" in verification_result or "LIKELY" in verification_result:
+                    memory.remember(original_url, strategy)
+                    if outcome is not None:
+                        outcome['submit_locator'] = candidate['locator']
                     return verification_result
                 else:
                     print(f"   ⚠️ Click successful but no clear submission confirmation")
@@ -798,41 +770,41 @@ class EnhancedWebFormFillerTool(BaseTool):
         # If no clear success, try form.submit() as last resort
         return self.try_form_submit_fallback(driver, original_url)
 
-    def try_robust_click(self, driver, element, description):
-        """Try multiple clicking strategies on an element"""
-        click_strategies = [
+    def try_robust_click(self, driver, element, description, preferred=None):
+        """Try multiple clicking strategies on an element; returns the name of the one that clicked"""
+        click_strategies = order_strategies([
             ("Standard Click", self.standard_click),
             ("JavaScript Click", self.javascript_click),
             ("ActionChains Click", self.action_chains_click),
             ("Forced Click", self.forced_click),
             ("Enter Key", self.enter_key_submit)
-        ]
+        ], preferred)
 
         for strategy_name, strategy_func in click_strategies:
             try:
                 print(f"      🔄 Trying {strategy_name}...")
 
                 # Scroll element into view
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                time.sleep(1)
+                scroll_into_view(driver, element)
 
-                # Highlight element for debugging
-                original_style = element.get_attribute('style')
-                driver.execute_script("arguments[0].style.border='3px solid red'; arguments[0].style.backgroundColor='yellow';", element)
-                time.sleep(0.5)
+                original_style = None
+                if self.debug_highlight:
+                    original_style = element.get_attribute('style')
+                    driver.execute_script("arguments[0].style.border='3px solid red'; arguments[0].style.backgroundColor='yellow';", element)
 
-                # Try the click strategy
+                # Watch for the click's effects from just before it happens
+                arm_click_watch(driver)
                 success = strategy_func(driver, element)
 
-                # Restore original style
-                try:
-                    driver.execute_script(f"arguments[0].style='{original_style or ''}';", element)
-                except:
-                    pass
+                if self.debug_highlight:
+                    try:
+                        driver.execute_script("arguments[0].setAttribute('style', arguments[1]);", element, original_style or '')
+                    except:
+                        pass
 
                 if success:
                     print(f"      ✅ {strategy_name} succeeded")
-                    return True
+                    return strategy_name
                 else:
                     print(f"      ❌ {strategy_name} failed")
 
@@ -840,7 +812,17 @@ class EnhancedWebFormFillerTool(BaseTool):
                 print(f"      ❌ {strategy_name} exception: {e}")
                 continue
 
-        return False
+        return None
+
+    def wait_for_submit_effect(self, driver, original_url):
+        """Wait for the page to react to a click: navigation or DOM change, then settling"""
+        effect = wait_for_click_effect(driver)
+        if effect:
+            print(f"   ⚡ Page reacted to the click ({effect})")
+            wait_for_post_action(driver, original_url)
+        else:
+            print(f"   ⚠️ No navigation or DOM change after the click")
+        return effect
 
     def standard_click(self, driver, element):
         """Standard click method"""
@@ -907,8 +889,9 @@ class EnhancedWebFormFillerTool(BaseTool):
             for i, form in enumerate(forms, 1):
                 try:
                     print(f"   📋 Trying form #{i}")
+                    arm_click_watch(driver)
                     driver.execute_script("arguments[0].submit();", form)
-                    time.sleep(5)
+                    self.wait_for_submit_effect(driver, original_url)
 
                     # Check if submission worked
                     verification = self.verify_submission_v2(driver, original_url)
@@ -924,105 +907,52 @@ class EnhancedWebFormFillerTool(BaseTool):
         except Exception as e:
             return f"❌ Form submission fallback error: {e}"
 
-    def find_submit_candidates_v2(self, driver):
-        """Find potential submit elements on the page"""
-        submit_candidates = []
-
-        # Define potential submit elements
-        submit_selectors = [
-            "//button[@type='submit']",
-            "//input[@type='submit']",
-            "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'submit')]",
-            "//input[@type='button' and contains(translate(@value, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'submit')]"
+    def find_submit_candidates_v2(self, driver, snapshot=None):
+        """Find potential submit elements on the page, best-ranked first"""
+        if snapshot is None:
+            snapshot = take_form_snapshot(driver)
+
+        # Ranked from the snapshot alone: form membership, type, wording, position, visibility
+        return [
+            {
+                'locator': control['locator'],
+                'description': self.get_element_description(control),
+                'score': score
+            }
+            for score, control in rank_submit_candidates(snapshot)
         ]
 
-        for selector in submit_selectors:
-            try:
-                elements = driver.find_elements(By.XPATH, selector)
-                for element in elements:
-                    if element.is_displayed() and element.is_enabled():
-                        score = self.calculate_click_score(element)
-                        submit_candidates.append({
-                            'element': element,
-                            'description': self.get_element_description(element),
-                            'score': score
-                        })
-            except Exception as e:
-                continue
-
-        return submit_candidates
-
-    def calculate_click_score(self, element):
-        """Calculate a score for the clickability of an element"""
-        score = 0
-        if element.is_displayed() and element.is_enabled():
-            score += 1
-        if element.get_attribute('type') == 'submit':
-            score += 1
-        if element.get_attribute('type') == 'button':
-            score += 0.5
-        return score
-
-    def get_element_description(self, element):
+    def get_element_description(self, control):
         """Get a human-readable description of an element"""
-        tag_name = element.tag_name.upper()
-        id_attr = element.get_attribute('id')
-        name_attr = element.get_attribute('name')
-        type_attr = element.get_attribute('type')
-        text = element.text.strip()
-        return f"{tag_name} ({id_attr or name_attr or type_attr}) - {text}"
+        tag_name = control['tag'].upper()
+        text = control['text'] or (control['value'] if control['tag'] == 'input' else '')
+        return f"{tag_name} ({control['id'] or control['name'] or control['type']}) - {text}"
 
     def verify_submission_v2(self, driver, original_url):
         """Enhanced verification of form submission with custom success check for AIGuruKul."""
         try:
             current_url = driver.current_url
-            page_source = driver.page_source.lower()
-            page_title = driver.title.lower()
             print(f"🔍 Verifying submission...")
             print(f"   Original URL: {original_url}")
             print(f"   Current URL: {current_url}")
             print(f"   Page Title: {driver.title}")
-            # Check URL change
-            url_changed = current_url != original_url
-            # Success indicators
-            success_indicators = [
-                'thank you', 'success', 'submitted', 'received', 'confirmation',
-                'thank-you', 'application submitted', 'form submitted',
-                'congratulations', 'well done', 'complete', 'finished',
-                'application received', 'we\'ll be in touch', 'hear from us'
-            ]
-            # Check various success signals
-            url_success = any(indicator in current_url.lower() for indicator in 
-                            ['success', 'complete', 'thank', 'confirmation', 'submitted'])
-            content_success = any(indicator in page_source for indicator in success_indicators)
-            title_success = any(indicator in page_title for indicator in success_indicators)
+            # URL, page text and title signals are shared with the HTTP form path
+            reasons = text_success_reasons(current_url, driver.find_element(By.TAG_NAME, "body").text, driver.title)
             # Look for success elements
             success_elements = driver.find_elements(By.XPATH,
                 "//*[contains(@class, 'success') or contains(@class, 'confirmation') " +
                 "or contains(@class, 'thank') or contains(text(), 'Thank you') " +
                 "or contains(text(), 'Success') or contains(text(), 'submitted')]")
-            element_success = len(success_elements) > 0
+            if success_elements:
+                reasons.append("success elements")
             # --- Custom check for AIGuruKul: is the submit button still present? ---
             submit_buttons = driver.find_elements(By.XPATH, "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'submit application')]")
             submit_button_present = any(btn.is_displayed() for btn in submit_buttons)
             if not submit_button_present:
                 return "🎉 FORM SUBMISSION SUCCESS! Confirmed by: Submit button disappeared after click."
-            # Determine result
-            if url_success or content_success or title_success or element_success:
-                success_reasons = []
-                if url_success: success_reasons.append("URL indicators")
-                if content_success: success_reasons.append("success message")
-                if title_success: success_reasons.append("title change")
-                if element_success: success_reasons.append("success elements")
-                return f"🎉 FORM SUBMISSION SUCCESS! Confirmed by: {', '.join(success_reasons)}"
-            elif url_changed:
-                return f"✅ LIKELY SUCCESS - Page redirected from form (URL changed)"
-            else:
-                # Check for form disappearance (another success indicator)
-                forms = driver.find_elements(By.TAG_NAME, "form")
-                if len(forms) == 0:
-                    return f"✅ LIKELY SUCCESS - Form no longer present on page"
-                return f"⚠ Form action completed but no clear success indicators found. Manual verification recommended."
+            # Determine result (form disappearance is the last signal checked)
+            form_present = bool(driver.find_elements(By.TAG_NAME, "form"))
+            return page_verdict(original_url, current_url, reasons, form_present)
         except Exception as e:
             return f"⚠ Submission verification failed: {e}"
 
@@ -1054,51 +984,69 @@ def complete_form_interactively(form_url, data):
     return result
 
 
+# --- Background form jobs (run by job_runner, off the Streamlit script thread) ---
+def form_submission_report(filled_fields, submit_result):
+    result = f"📋 FORM PROCESSING COMPLETE!\n"
+    result += f"📊 Total fields filled: {len(filled_fields)}\n"
+    result += f"🎯 Fields: {', '.join(filled_fields)}\n"
+    result += f"\n{submit_result}"
+    return result
 
-# CELL 8: FIXED AI Response Parsing Function
-def parse_ai_response_safely(response_text):
-    """
-    Robustly extract and parse the first JSON object from the LLM response.
-    If parsing fails, show the error and the raw response.
-    """
-    cleaned_response = response_text.strip()
 
-    # Remove common markdown/code block markers
-    cleaned_response = re.sub(r"^```json|^```|```$", "", cleaned_response, flags=re.MULTILINE).strip()
+def fill_and_submit_job(job, form_url, data):
+    """Fill known fields; submit if nothing is left, else return the unfilled fields"""
+    job.set_progress(0.1, "Filling and submitting the form...")
+    outcome = {}
+    EnhancedWebFormFillerTool()._run(json.dumps(dict(data, form_url=form_url)), outcome=outcome, logs=job.logs,
+                                     ask_for_unfilled=True)
+    if outcome['error']:
+        raise outcome['error']
+    if outcome['unfilled_fields']:
+        return {'unfilled_fields': outcome['unfilled_fields']}
+    return {'report': form_submission_report(outcome['filled'], outcome['verdict'])}
 
-    # Try to parse the whole response as JSON
-    try:
-        return json.loads(cleaned_response)
-    except Exception:
-        pass
 
-    # Try to extract the first JSON object from the text
-    json_match = re.search(r'\\{[\\s\\S]*\\}', cleaned_response)
-    if json_match:
-        try:
-            return json.loads(json_match.group())
-        except Exception as e:
-            print(f"⚠ JSON extraction failed: {e}")
-            print(f"Raw response: {repr(cleaned_response[:200])}")
-
-    # Final fallback: show error and return the raw response for manual correction
-    print("⚠ Could not parse LLM response as JSON. Please check the raw response below.")
-    print(cleaned_response)
-    return {
-        "name": "N/A",
-        "email": "N/A",
-        "phone": "N/A",
-        "address": "N/A",
-        "skills": [],
-        "experience": [],
-        "education": [],
-        "linkedin": "N/A",
-        "github": "N/A",
-        "portfolio": "N/A",
-        "google_drive": "N/A",
-        "dropbox": "N/A",
-        "raw_response": cleaned_response  # Add this so you can see/copy the real output
-    }
+def fill_with_user_values_job(job, form_url, data, user_field_values):
+    """Reopen the form, fill known and user-provided fields, and submit"""
+    job.set_progress(0.1, "Filling your answers and submitting the form...")
+    outcome = {}
+    EnhancedWebFormFillerTool()._run(json.dumps(dict(data, form_url=form_url)), user_field_values,
+                                     outcome=outcome, logs=job.logs)
+    if outcome['error']:
+        raise outcome['error']
+    return {'report': form_submission_report(outcome['filled'], outcome['verdict'])}
+
+
+def submit_many_job(job, profile, form_urls):
+    """Submit one profile to every URL on the submission scheduler"""
+    done = []
+
+    def on_result(entry):
+        done.append(entry)
+        job.log(f"[{entry['status']}] {entry['url']} ({entry['attempts']} attempts, {entry['seconds']}s)")
+        job.set_progress(len(done) / len(form_urls), f"{len(done)}/{len(form_urls)} forms done")
+
+    job.set_progress(0.0, f"0/{len(form_urls)} forms done")
+    return SubmissionScheduler(EnhancedWebFormFillerTool).submit_all(profile, form_urls, on_result=on_result)
+
+
+def show_job(job_id):
+    """Render a background job's progress and log; returns its snapshot, or None if it is gone"""
+    job = get_job_runner().get(job_id) if job_id else None
+    if job is None:
+        return None
+    snapshot = job.snapshot()
+    if not job.finished:
+        st.progress(snapshot['progress'], text=snapshot['message'] or snapshot['status'].title())
+    # A finished job's log moves into the results shown below it
+    if snapshot['logs'] and snapshot['status'] != 'done':
+        with st.expander("Process Log", expanded=not job.finished):
+            st.code('\n'.join(snapshot['logs']))
+    return snapshot
+
+
+# CELL 8: FIXED AI Response Parsing Function
+# Response parsing (schema-constrained JSON) and the extraction prompt live in resume_extraction.py
 
 # CELL 9: Updated Main Processing Function
 
@@ -1146,63 +1094,58 @@ def main():
         extract_button = st.button("Extract Data from PDF")
         if extract_button and uploaded_file and form_url:
             with st.spinner("Extracting data from PDF..."):
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    temp_pdf_path = tmp_file.name
                 st.session_state.form_url = form_url
-                # Use existing PDFReaderTool
-                pdf_reader = PDFReaderTool()
-                pdf_text = pdf_reader._run(temp_pdf_path)
+                # Parse the upload in place, page by page; no temp file copy is written
+                try:
+                    document = ingest_pdf(uploaded_file)
+                except Exception as e:
+                    st.error(f"Error reading PDF: {str(e)}")
+                    st.stop()
+                pdf_text = document.text
                 st.session_state.pdf_text = pdf_text
                 # Enhanced link extraction
                 st.info("Extracting links from PDF...")
-                extracted_links = enhanced_extract_links_from_pdf(temp_pdf_path)
+                extracted_links = enhanced_extract_links_from_pdf(document)
                 st.session_state.extracted_links = extracted_links
                 # Use AI to extract structured data
-                try:
-                    # Always configure Gemini API with the latest key before model creation
-                    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-                    # Use the latest available model
-                    model = genai.GenerativeModel('models/gemini-1.5-pro-latest')
-                except:
-                    try:
-                        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-                        model = genai.GenerativeModel('models/gemini-1.5-flash-latest')
-                    except:
-                        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-                        model = genai.GenerativeModel('models/gemini-1.0-pro')
-                
-                prompt = f"""
-                Extract information from this resume and return ONLY valid JSON without any markdown formatting or extra text.
-                Resume Text:
-                {pdf_text[:3000]}
-                Extracted Links from PDF:
-                {json.dumps(extracted_links, indent=2)}
-                Return only this JSON structure with actual values:
-                {{
-                    "name": "Full Name",
-                    "email": "email address",
-                    "phone": "phone number",
-                    "address": "full address or location",
-                    "skills": ["skill1", "skill2"],
-                    "experience": ["job description"],
-                    "education": ["degree and institution"],
-                    "linkedin": "linkedin url from extracted links",
-                    "github": "github url from extracted links",
-                    "portfolio": "portfolio url from extracted links",
-                    "google_drive": "google drive url if found",
-                    "dropbox": "dropbox url if found"
-                }}
-                IMPORTANT:
-                - Return ONLY the JSON, no other text
-                - Use the extracted links provided above - they are actual clickable URLs
-                - Use "N/A" for missing info, empty arrays [] for missing lists
-                - Do not wrap in markdown code blocks
-                """
+                # Configured once per API key; fails over between models on quota/server/timeout errors
+                model = get_gemini_client(os.getenv("GOOGLE_API_KEY"))
+
                 st.info("Extracting data with AI...")
+                # Live preview of the review fields, filled in as each one arrives from the stream
+                st.subheader("📋 Extracted so far")
+                field_slots = {field: st.empty() for field in EXTRACTION_FIELDS}
+                for field, slot in field_slots.items():
+                    slot.caption(f"⏳ {field.replace('_', ' ').title()}")
+
+                def show_field(field, value):
+                    if field in field_slots:
+                        shown = ", ".join(value) if isinstance(value, list) else value
+                        field_slots[field].markdown(f"✅ **{field.replace('_', ' ').title()}:** {shown or 'N/A'}")
+
                 try:
-                    response = model.generate_content(prompt)
-                    data = parse_ai_response_safely(response.text)
+                    # A form filled before tells us which fields it takes; the rest need no AI call
+                    data, source = extract_resume_data(
+                        model, document.sha256, document.pages, extracted_links,
+                        bypass_cache=bypass_extraction_cache,
+                        required_fields=get_form_schema_cache().known_fields(form_url),
+                        on_field=show_field
+                    )
+                    if source == 'cache':
+                        st.info("⚡ Loaded structured data from the extraction cache")
+                    elif source == 'local':
+                        st.info("⚡ Every field this form needs was found in the PDF; Gemini was not called")
+                    elif source == 'local_fallback':
+                        st.warning("⚠ Gemini is unavailable; only the fields found directly in the PDF were filled")
+                    elif source == 'gemini':
+                        latency = get_extraction_latency_stats()
+                        if latency['first_field_p50'] is not None:
+                            st.caption(
+                                f"First AI field after p50 {latency['first_field_p50']:.1f}s, "
+                                f"complete after p50 {latency['total_p50']:.1f}s "
+                                f"(p95 {latency['first_field_p95']:.1f}s / {latency['total_p95']:.1f}s, "
+                                f"{latency['extractions']} extractions)"
+                            )
                 except Exception as e:
                     error_msg = str(e)
                     if "API_KEY_INVALID" in error_msg or "API key expired" in error_msg:
@@ -1216,7 +1159,8 @@ def main():
                     st.stop()
                 # Enhance with extracted links
                 for link_type, link_url in extracted_links.items():
-                    if link_type in data:
+                    # An uncategorized link is only a portfolio guess; the model's answer wins over it
+                    if link_type in data and (link_type != 'portfolio' or is_missing(data[link_type])):
                         data[link_type] = link_url
                 st.session_state.extracted_data = data
                 st.success("✅ Data extracted and saved! Proceed to the next tab.")
@@ -1262,8 +1206,25 @@ def main():
                 st.session_state['awaiting_unfilled_fields'] = False
             if 'logs' not in st.session_state:
                 st.session_state['logs'] = []
-            logs = st.session_state['logs']
-            if st.session_state['awaiting_unfilled_fields']:
+            runner = get_job_runner()
+            snapshot = show_job(st.session_state.submission_job_id)
+            if snapshot and snapshot['status'] == 'failed':
+                st.error(f"Form submission failed: {snapshot['error']}")
+                st.session_state.submission_job_id = None
+            elif snapshot and snapshot['status'] == 'done':
+                st.session_state['logs'] = snapshot['logs']
+                st.session_state.submission_job_id = None
+                if 'unfilled_fields' in snapshot['result']:
+                    st.session_state['unfilled_fields'] = snapshot['result']['unfilled_fields']
+                    st.session_state['awaiting_unfilled_fields'] = True
+                    st.rerun()
+                st.session_state.submission_result = snapshot['result']['report']
+                st.session_state['awaiting_unfilled_fields'] = False
+                st.success("Form submitted!")
+            job_running = snapshot is not None and snapshot['status'] in ('queued', 'running')
+            if job_running:
+                st.info("Filling and submitting the form in the background. You can keep using the app.")
+            elif st.session_state['awaiting_unfilled_fields']:
                 unfilled_fields = st.session_state.get('unfilled_fields', [])
                 with st.form("fill_unfilled_fields_form"):
                     for i, field in enumerate(unfilled_fields):
@@ -1280,112 +1241,68 @@ def main():
                             }
                     submit_unfilled = st.form_submit_button("Submit Unfilled Fields and Fill Form")
                     if submit_unfilled:
-                        with st.spinner("Filling and submitting the form..."):
-                            try:
-                                logs.append("📝 Filling user-provided data...")
-                                chrome_options = Options()
-                                chrome_options.add_argument("--headless=new")
-                                chrome_options.add_argument("--no-sandbox")
-                                chrome_options.add_argument("--disable-dev-shm-usage")
-                                chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-                                chrome_options.add_argument("--disable-web-security")
-                                chrome_options.add_argument("--allow-running-insecure-content")
-                                chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-                                chrome_options.add_experimental_option('useAutomationExtension', False)
-                                driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-                                driver.get(st.session_state.form_url)
-                                time.sleep(5)
-                                WebDriverWait(driver, 10).until(
-                                    lambda d: d.execute_script("return document.readyState") == "complete"
-                                )
-                                form_filler = EnhancedWebFormFillerTool()
-                                logs.append("📝 Filling known fields...")
-                                filled_fields = form_filler.fill_known_fields(driver, st.session_state.extracted_data)
-                                for f in filled_fields:
-                                    logs.append(f"   ✅ {f}: {st.session_state.extracted_data.get(f, '')}...")
-                                additional_filled = form_filler.fill_user_provided_fields(driver, user_field_values)
-                                for f in additional_filled:
-                                    logs.append(f"   ✅ {f}: {user_field_values[[k for k,v in user_field_values.items() if v['field_info']['name']==f][0]]['value']}")
-                                logs.append(f"✅ Filled {len(additional_filled)} additional fields")
-                                logs.append("\n🚀 Starting enhanced form submission v2...")
-                                submit_result = form_filler.enhanced_form_submission_v2(driver, logs)
-                                driver.quit()
-                                result = f"📋 FORM PROCESSING COMPLETE!\n"
-                                result += f"📊 Total fields filled: {len(filled_fields) + len(additional_filled)}\n"
-                                result += f"🎯 Fields: {', '.join(filled_fields + additional_filled)}\n"
-                                result += f"\n{submit_result}"
-                                st.session_state.submission_result = result
-                                st.session_state['awaiting_unfilled_fields'] = False
-                                st.success("Form submitted!")
-                                st.code(result)
-                                st.markdown("### Process Log")
-                                st.code('\n'.join(logs))
-                                st.download_button("Download Submission Report", data=result, file_name="submission_report.txt")
-                                if "success" in result.lower():
-                                    st.balloons()
-                            except Exception as e:
-                                st.error(f"Form submission failed: {e}")
-                                st.expander("Debug Info").write(str(e))
+                        st.session_state.submission_job_id = runner.submit(
+                            "fill_form", fill_with_user_values_job, st.session_state.form_url,
+                            dict(st.session_state.extracted_data), user_field_values,
+                            owner=st.session_state.session_id,
+                        )
+                        st.rerun()
             else:
                 if st.button("Fill and Submit Form"):
-                    with st.spinner("Filling and submitting the form..."):
-                        try:
-                            logs.clear()
-                            logs.append("📝 Filling known fields...")
-                            chrome_options = Options()
-                            chrome_options.add_argument("--headless=new")
-                            chrome_options.add_argument("--no-sandbox")
-                            chrome_options.add_argument("--disable-dev-shm-usage")
-                            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-                            chrome_options.add_argument("--disable-web-security")
-                            chrome_options.add_argument("--allow-running-insecure-content")
-                            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-                            chrome_options.add_experimental_option('useAutomationExtension', False)
-                            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-                            driver.get(st.session_state.form_url)
-                            time.sleep(5)
-                            WebDriverWait(driver, 10).until(
-                                lambda d: d.execute_script("return document.readyState") == "complete"
-                            )
-                            form_filler = EnhancedWebFormFillerTool()
-                            filled_fields = form_filler.fill_known_fields(driver, st.session_state.extracted_data)
-                            for f in filled_fields:
-                                logs.append(f"   ✅ {f}: {st.session_state.extracted_data.get(f, '')}...")
-                            logs.append("\n🔍 Scanning for unfilled fields...")
-                            unfilled_fields = form_filler.detect_all_unfilled_fields(driver)
-                            logs.append(f"🔍 Found {len(unfilled_fields)} unfilled fields")
-                            if unfilled_fields:
-                                driver.quit()
-                                st.session_state['unfilled_fields'] = unfilled_fields
-                                st.session_state['awaiting_unfilled_fields'] = True
-                                st.session_state['logs'] = logs
-                                st.rerun()
-                            else:
-                                logs.append("\n🚀 Starting enhanced form submission v2...")
-                                submit_result = form_filler.enhanced_form_submission_v2(driver, logs)
-                                driver.quit()
-                                result = f"📋 FORM PROCESSING COMPLETE!\n"
-                                result += f"📊 Total fields filled: {len(filled_fields)}\n"
-                                result += f"🎯 Fields: {', '.join(filled_fields)}\n"
-                                result += f"\n{submit_result}"
-                                st.session_state.submission_result = result
-                                st.success("Form submitted!")
-                                st.code(result)
-                                st.markdown("### Process Log")
-                                st.code('\n'.join(logs))
-                                st.download_button("Download Submission Report", data=result, file_name="submission_report.txt")
-                                if "success" in result.lower():
-                                    st.balloons()
-                        except Exception as e:
-                            st.error(f"Form submission failed: {e}")
-                            st.expander("Debug Info").write(str(e))
+                    st.session_state.submission_result = None
+                    st.session_state.submission_job_id = runner.submit(
+                        "fill_form", fill_and_submit_job, st.session_state.form_url,
+                        dict(st.session_state.extracted_data), owner=st.session_state.session_id,
+                    )
+                    st.rerun()
         else:
             st.info("Please extract and review data before filling the form.")
         if st.session_state.submission_result:
             st.subheader("📊 Submission Results")
             st.code(st.session_state.submission_result)
+            if st.session_state.get('logs'):
+                with st.expander("Process Log"):
+                    st.code('\n'.join(st.session_state['logs']))
+            st.download_button("Download Submission Report", data=st.session_state.submission_result, file_name="submission_report.txt")
             if "success" in st.session_state.submission_result.lower():
                 st.balloons()
+        if st.session_state.extracted_data:
+            with st.expander("🗂 Submit to multiple forms"):
+                urls_text = st.text_area("Form URLs (one per line):", key="multi_form_urls")
+                form_urls = list(dict.fromkeys(line.strip() for line in urls_text.splitlines() if line.strip()))
+                snapshot = show_job(st.session_state.multi_submission_job_id)
+                multi_running = snapshot is not None and snapshot['status'] in ('queued', 'running')
+                if st.button("Submit to All Forms", disabled=not form_urls or multi_running):
+                    st.session_state.multi_submission_job_id = get_job_runner().submit(
+                        "submit_many", submit_many_job, dict(st.session_state.extracted_data), form_urls,
+                        owner=st.session_state.session_id,
+                    )
+                    st.rerun()
+                if snapshot and snapshot['status'] == 'failed':
+                    st.error(f"Multi-form submission failed: {snapshot['error']}")
+                report = snapshot['result'] if snapshot and snapshot['status'] == 'done' else None
+                if report:
+                    st.write(", ".join(f"**{count}** {status}" for status, count in sorted(report['summary'].items())))
+                    st.table([
+                        {'URL': entry['url'], 'Status': entry['status'], 'Attempts': entry['attempts'],
+                         'Seconds': entry['seconds'], 'Detail': entry['error'] or entry['verdict'] or ""}
+                        for entry in report['results']
+                    ])
+                    st.download_button("Download Multi-Form Report", data=format_report(report),
+                                       file_name="multi_submission_report.txt")
+
+    # Poll this session's background jobs so their progress and logs stay current
+    if any(not job.finished for job in get_job_runner().jobs(owner=st.session_state.session_id)):
+        st.session_state.jobs_rendered_at = time.monotonic()
+        poll_jobs()
+
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def poll_jobs():
+    """Rerun the app every JOB_POLL_INTERVAL while jobs run, without holding the script thread in a sleep"""
+    # The fragment also runs inline with the script; only its timed reruns refresh the page
+    if time.monotonic() - st.session_state.get('jobs_rendered_at', 0) >= JOB_POLL_INTERVAL:
+        st.rerun()
 
 # --- LangGraph Agent Integration ---
 def run_langgraph_agent(pdf_path, form_url):
@@ -1394,11 +1311,6 @@ def run_langgraph_agent(pdf_path, form_url):
     Returns the final result string.
     """
     # 1. Define tools as LangChain Tool objects
-    pdf_reader_tool = Tool(
-        name="PDF Reader",
-        func=lambda path: PDFReaderTool()._run(path),
-        description="Reads PDF files"
-    )
     form_filler_tool = Tool(
         name="Form Filler",
         func=lambda data: EnhancedWebFormFillerTool()._run(json.dumps(data)),
@@ -1406,58 +1318,23 @@ def run_langgraph_agent(pdf_path, form_url):
     )
     # 2. Define LangGraph nodes
     def read_pdf_node(state):
-        pdf_text = pdf_reader_tool.run(state["pdf_path"])
-        return {**state, "pdf_text": pdf_text}
+        # One parse feeds every later node; nothing goes back to disk
+        document = ingest_pdf(state["pdf_path"])
+        return {**state, "document": document, "pdf_text": document.text}
     def extract_data_node(state):
         # Use the same AI extraction logic as in the Streamlit workflow
-        pdf_text = state["pdf_text"]
         form_url = state["form_url"]
-        extracted_links = enhanced_extract_links_from_pdf(state["pdf_path"])
-        try:
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-            model = genai.GenerativeModel('models/gemini-1.5-pro-latest')
-        except:
-            try:
-                genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-                model = genai.GenerativeModel('models/gemini-1.5-flash-latest')
-            except:
-                genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-                model = genai.GenerativeModel('models/gemini-1.0-pro')
-        prompt = f"""
-        Extract information from this resume and return ONLY valid JSON without any markdown formatting or extra text.
-        Resume Text:
-        {pdf_text[:3000]}
-        Extracted Links from PDF:
-        {json.dumps(extracted_links, indent=2)}
-        Return only this JSON structure with actual values:
-        {{
-            "name": "Full Name",
-            "email": "email address",
-            "phone": "phone number",
-            "address": "full address or location",
-            "skills": ["skill1", "skill2"],
-            "experience": ["job description"],
-            "education": ["degree and institution"],
-            "linkedin": "linkedin url from extracted links",
-            "github": "github url from extracted links",
-            "portfolio": "portfolio url from extracted links",
-            "google_drive": "google drive url if found",
-            "dropbox": "dropbox url if found"
-        }}
-        IMPORTANT:
-        - Return ONLY the JSON, no other text
-        - Use the extracted links provided above - they are actual clickable URLs
-        - Use "N/A" for missing info, empty arrays [] for missing lists
-        - Do not wrap in markdown code blocks
-        """
+        document = state["document"]
+        extracted_links = enhanced_extract_links_from_pdf(document)
+        model = get_gemini_client(os.getenv("GOOGLE_API_KEY"))
         try:
-            response = model.generate_content(prompt)
-            data = parse_ai_response_safely(response.text)
+            data, _ = extract_resume_data(model, document.sha256, document.pages, extracted_links)
         except Exception as e:
             data = {"error": str(e)}
         # Enhance with extracted links
         for link_type, link_url in extracted_links.items():
-            if link_type in data:
+            # An uncategorized link is only a portfolio guess; the model's answer wins over it
+            if link_type in data and (link_type != 'portfolio' or is_missing(data[link_type])):
                 data[link_type] = link_url
         return {**state, "extracted_data": data}
     def fill_form_node(state):
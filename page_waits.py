@@ -0,0 +1,250 @@
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from urllib.parse import urlparse
+import logging
+import json
+import time
+import os
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) for each kind of wait; quiet windows are in milliseconds
+DEFAULT_BUDGETS = {
+    'page_load': 15,
+    'settle': 5,
+    'dom_quiet_ms': 400,
+    'network_idle_ms': 500,
+    'value_commit': 2,
+    'post_action': 8,
+    'click_effect': 3,
+}
+
+# Per-site overrides, e.g. FORMPILOT_WAIT_BUDGETS='{"jobs.example.com": {"settle": 10}}'
+try:
+    SITE_BUDGETS = json.loads(os.getenv("FORMPILOT_WAIT_BUDGETS", "") or "{}")
+except ValueError:
+    logger.error("Ignoring malformed FORMPILOT_WAIT_BUDGETS")
+    SITE_BUDGETS = {}
+
+# Resolves once no DOM mutation has been observed for `quiet` ms
+DOM_QUIET_SCRIPT = """
+var quiet = arguments[0], timeout = arguments[1], done = arguments[arguments.length - 1];
+var finished = false, timer = null, hard = null, observer = null;
+function finish(ok) {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearTimeout(timer);
+    clearTimeout(hard);
+    done(ok);
+}
+observer = new MutationObserver(function() {
+    clearTimeout(timer);
+    timer = setTimeout(finish, quiet, true);
+});
+observer.observe(document.documentElement || document, {subtree: true, childList: true, attributes: true, characterData: true});
+timer = setTimeout(finish, quiet, true);
+hard = setTimeout(finish, timeout, false);
+"""
+
+# Resolves once no fetch/XHR is pending and no new resource entry has appeared for `idle` ms
+NETWORK_IDLE_SCRIPT = """
+var idle = arguments[0], timeout = arguments[1], done = arguments[arguments.length - 1];
+if (window.__formpilotPending === undefined) {
+    window.__formpilotPending = 0;
+    var track = function(promise) {
+        window.__formpilotPending++;
+        var settle = function() { window.__formpilotPending--; };
+        promise.then(settle, settle);
+        return promise;
+    };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function() { return track(originalFetch.apply(this, arguments)); };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        var xhr = this;
+        window.__formpilotPending++;
+        xhr.addEventListener('loadend', function() { window.__formpilotPending--; });
+        return originalSend.apply(xhr, arguments);
+    };
+}
+var start = Date.now(), lastCount = -1, lastChange = Date.now();
+(function poll() {
+    var count = performance.getEntriesByType('resource').length;
+    if (count !== lastCount || window.__formpilotPending > 0) {
+        lastCount = count;
+        lastChange = Date.now();
+    }
+    if (Date.now() - lastChange >= idle) return done(true);
+    if (Date.now() - start >= timeout) return done(false);
+    setTimeout(poll, 50);
+})();
+"""
+
+# Armed just before a click: counts nodes added or removed from then on
+CLICK_WATCH_SCRIPT = """
+if (window.__formpilotClick) window.__formpilotClick.observer.disconnect();
+var watch = {mutations: 0, url: location.href};
+watch.observer = new MutationObserver(function(records) {
+    for (var i = 0; i < records.length; i++) {
+        if (records[i].type === 'childList') watch.mutations++;
+    }
+});
+watch.observer.observe(document.documentElement || document, {subtree: true, childList: true});
+window.__formpilotClick = watch;
+"""
+
+# Races navigation against DOM changes since the watch was armed; a new document means navigation
+CLICK_EFFECT_SCRIPT = """
+var timeout = arguments[0], done = arguments[arguments.length - 1];
+var watch = window.__formpilotClick, start = Date.now();
+if (!watch) return done('navigated');
+(function poll() {
+    var effect = location.href !== watch.url ? 'navigated' : (watch.mutations > 0 ? 'dom' : null);
+    if (effect || Date.now() - start >= timeout) {
+        watch.observer.disconnect();
+        delete window.__formpilotClick;
+        return done(effect || false);
+    }
+    setTimeout(poll, 50);
+})();
+"""
+
+# Scrolls the element to the centre and resolves after the next painted frame
+SCROLL_SCRIPT = """
+var element = arguments[0], done = arguments[arguments.length - 1];
+element.scrollIntoView({block: 'center'});
+requestAnimationFrame(function() { requestAnimationFrame(function() { done(true); }); });
+"""
+
+
+def get_budgets(url=None):
+    """Wait budgets for a URL, with any per-site overrides applied"""
+    budgets = dict(DEFAULT_BUDGETS)
+    if url:
+        host = (urlparse(url).hostname or "").lower()
+        for domain, overrides in SITE_BUDGETS.items():
+            domain = domain.lower()
+            if host == domain or host.endswith("." + domain):
+                budgets.update(overrides)
+    return budgets
+
+
+def _budgets_for_driver(driver):
+    try:
+        return get_budgets(driver.current_url)
+    except WebDriverException:
+        return get_budgets()
+
+
+def _run_async(driver, script, *args, timeout):
+    """Run an async wait script, treating navigation mid-wait as completion"""
+    try:
+        driver.set_script_timeout(timeout + 2)
+        return driver.execute_async_script(script, *args)
+    except TimeoutException:
+        return False
+    except WebDriverException as e:
+        logger.debug(f"Async wait interrupted: {str(e)}")
+        return None
+
+
+def wait_for_document_ready(driver, timeout=None):
+    """Wait until document.readyState is complete"""
+    timeout = timeout if timeout is not None else _budgets_for_driver(driver)['page_load']
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_for_dom_quiet(driver, quiet_ms=None, timeout=None):
+    """Wait until the DOM stops mutating for quiet_ms"""
+    budgets = _budgets_for_driver(driver)
+    quiet_ms = quiet_ms if quiet_ms is not None else budgets['dom_quiet_ms']
+    timeout = timeout if timeout is not None else budgets['settle']
+    return _run_async(driver, DOM_QUIET_SCRIPT, quiet_ms, int(timeout * 1000), timeout=timeout)
+
+
+def wait_for_network_idle(driver, idle_ms=None, timeout=None):
+    """Wait until no requests are in flight for idle_ms"""
+    budgets = _budgets_for_driver(driver)
+    idle_ms = idle_ms if idle_ms is not None else budgets['network_idle_ms']
+    timeout = timeout if timeout is not None else budgets['settle']
+    return _run_async(driver, NETWORK_IDLE_SCRIPT, idle_ms, int(timeout * 1000), timeout=timeout)
+
+
+def wait_for_page_ready(driver, url=None, timeout=None):
+    """Wait for load, then for the network and the DOM to settle, in at most `timeout` seconds overall"""
+    budgets = get_budgets(url) if url else _budgets_for_driver(driver)
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    def capped(seconds):
+        return seconds if deadline is None else max(0.1, min(seconds, deadline - time.monotonic()))
+
+    ready = wait_for_document_ready(driver, capped(budgets['page_load']))
+    wait_for_network_idle(driver, budgets['network_idle_ms'], capped(budgets['settle']))
+    wait_for_dom_quiet(driver, budgets['dom_quiet_ms'], capped(budgets['settle']))
+    return ready
+
+
+def wait_for_post_action(driver, original_url=None):
+    """Wait for the effects of a click or submit: navigation, requests, then DOM changes"""
+    budgets = _budgets_for_driver(driver)
+    deadline = time.monotonic() + budgets['post_action']
+
+    def remaining():
+        return max(0.1, deadline - time.monotonic())
+
+    idle = wait_for_network_idle(driver, budgets['network_idle_ms'], remaining())
+    if idle is None or (original_url and driver.current_url != original_url):
+        # The page navigated away while we were watching it
+        wait_for_document_ready(driver, remaining())
+        wait_for_network_idle(driver, budgets['network_idle_ms'], remaining())
+    wait_for_dom_quiet(driver, budgets['dom_quiet_ms'], remaining())
+
+
+def arm_click_watch(driver):
+    """Start watching for the effects of the click that is about to happen"""
+    try:
+        driver.execute_script(CLICK_WATCH_SCRIPT)
+    except WebDriverException as e:
+        logger.debug(f"Could not arm click watch: {str(e)}")
+
+
+def wait_for_click_effect(driver, timeout=None):
+    """Race navigation against DOM changes since arm_click_watch.
+
+    Returns 'navigated', 'dom', or None if nothing happened within the
+    click_effect budget, so an ineffective click costs seconds, not the
+    whole post-action budget.
+    """
+    timeout = timeout if timeout is not None else _budgets_for_driver(driver)['click_effect']
+    effect = _run_async(driver, CLICK_EFFECT_SCRIPT, int(timeout * 1000), timeout=timeout)
+    if effect is None:
+        # The script was cut off by the page unloading
+        return 'navigated'
+    return effect or None
+
+
+def wait_for_value_committed(driver, element, value, timeout=None):
+    """Wait until the element reports the expected value"""
+    timeout = timeout if timeout is not None else _budgets_for_driver(driver)['value_commit']
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.05).until(
+            lambda d: element.get_attribute('value') == value
+        )
+        return True
+    except (TimeoutException, WebDriverException):
+        return False
+
+
+def scroll_into_view(driver, element):
+    """Scroll an element to the centre of the viewport and wait for the frame to paint"""
+    return _run_async(driver, SCROLL_SCRIPT, element, timeout=2)
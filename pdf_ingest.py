@@ -0,0 +1,163 @@
+import hashlib
+import logging
+import os
+import fitz  # PyMuPDF
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Characters of page text collected before later pages are scanned for links only
+PDF_MAX_CHARS = int(os.getenv("FORMPILOT_PDF_MAX_CHARS", "20000"))
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ParsedDocument:
+    """Everything later stages need from a PDF, read in one pass.
+
+    `pages` holds each page's text, `links` the http(s) URI annotations as
+    {'url', 'page'} dicts (page numbers are 1-based), `metadata` the
+    document info plus per-page sizes, and `sha256` the digest of the raw
+    bytes, usable as a content address. When the text budget was reached
+    `truncated` is True and `pages` only covers the pages read in full.
+    """
+
+    def __init__(self, pages, links, metadata, sha256, truncated=False):
+        self.pages = pages
+        self.links = links
+        self.metadata = metadata
+        self.sha256 = sha256
+        self.truncated = truncated
+        self._text = None
+
+    @property
+    def page_count(self):
+        return len(self.metadata.get('pages', self.pages))
+
+    @property
+    def text(self):
+        """Full text, one page per line block"""
+        if self._text is None:
+            self._text = "".join(page + "\n" for page in self.pages)
+        return self._text
+
+    @property
+    def urls(self):
+        """Unique link URLs in the order they appear"""
+        return list(dict.fromkeys(link['url'] for link in self.links))
+
+
+def _buffer(source):
+    """A zero-copy view of in-memory PDF data (bytes or a BytesIO-like upload)"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return memoryview(source)
+    if hasattr(source, 'getbuffer'):
+        return source.getbuffer()
+    return None
+
+
+def _open(source):
+    """Open a PDF without copying it: paths are read lazily by MuPDF, buffers are used in place"""
+    buffer = _buffer(source)
+    if buffer is not None:
+        return fitz.open(stream=buffer, filetype="pdf")
+    if hasattr(source, 'read'):
+        # Generic file objects have no buffer to share; this is the only copying path
+        return fitz.open(stream=source.read(), filetype="pdf")
+    return fitz.open(source)
+
+
+def _read_once(source):
+    """In-memory PDF data: buffers as they are, paths and file objects read a single time"""
+    if _buffer(source) is not None:
+        return source
+    if hasattr(source, 'read'):
+        return source.read()
+    with open(source, 'rb') as pdf_file:
+        return pdf_file.read()
+
+
+def pdf_digest(source):
+    """SHA-256 of the PDF bytes, hashed in chunks from the buffer or the file on disk"""
+    digest = hashlib.sha256()
+    buffer = _buffer(source)
+    if buffer is not None:
+        for start in range(0, len(buffer), HASH_CHUNK_SIZE):
+            digest.update(buffer[start:start + HASH_CHUNK_SIZE])
+    elif hasattr(source, 'read'):
+        source.seek(0)
+        for chunk in iter(lambda: source.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+        source.seek(0)
+    else:
+        with open(source, 'rb') as pdf_file:
+            for chunk in iter(lambda: pdf_file.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _page_records(pdf_document, max_chars):
+    collected = 0
+    for page_num, page in enumerate(pdf_document, 1):
+        page_text = None
+        if max_chars is None or collected < max_chars:
+            page_text = page.get_text()
+            collected += len(page_text)
+        links = [link['uri'] for link in page.get_links()
+                 if link.get('uri', '').startswith(('http://', 'https://'))]
+        yield {
+            'number': page_num,
+            'text': page_text,
+            'links': links,
+            'width': page.rect.width,
+            'height': page.rect.height,
+        }
+
+
+def read_text(source):
+    """Plain text of every page, for when a full ingest_pdf parse fails"""
+    with _open(source) as pdf_document:
+        return "".join(page.get_text() for page in pdf_document)
+
+
+def iter_pages(source, max_chars=None):
+    """Yield one record per page: {'number', 'text', 'links', 'width', 'height'}.
+
+    Pages are extracted one at a time and the document is closed when the
+    generator finishes or is closed. Once `max_chars` of text have been
+    yielded, later pages come back with text=None and only their links,
+    which are cheap to read.
+    """
+    with _open(source) as pdf_document:
+        yield from _page_records(pdf_document, max_chars)
+
+
+def ingest_pdf(source, max_chars=PDF_MAX_CHARS):
+    """Parse a PDF (path, bytes or uploaded file buffer) page by page into a ParsedDocument.
+
+    Text collection stops at `max_chars` characters (None reads everything);
+    links are still gathered from every page. The file is read from disk
+    once; the parse and the digest both use those bytes.
+    """
+    source = _read_once(source)
+    pages, links, page_info = [], [], []
+    truncated = False
+    with _open(source) as pdf_document:
+        metadata = dict(pdf_document.metadata or {})
+        for record in _page_records(pdf_document, max_chars):
+            if record['text'] is None:
+                truncated = True
+            else:
+                pages.append(record['text'])
+            links.extend({'url': url, 'page': record['number']} for url in record['links'])
+            page_info.append({
+                'number': record['number'],
+                'width': record['width'],
+                'height': record['height'],
+                'chars': len(record['text']) if record['text'] is not None else None,
+            })
+    if truncated:
+        logger.info(f"PDF text budget of {max_chars} characters reached after {len(pages)} pages")
+
+    metadata['pages'] = page_info
+    return ParsedDocument(pages, links, metadata, pdf_digest(source), truncated=truncated)
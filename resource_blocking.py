@@ -0,0 +1,176 @@
+from urllib.parse import urlparse
+import threading
+import logging
+import json
+import os
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+BLOCK_RESOURCES = os.getenv("FORMPILOT_BLOCK_RESOURCES", "1") != "0"
+
+# Network.setBlockedURLs matches URL patterns, not resource types, so types are blocked by extension
+BLOCKED_EXTENSIONS = {
+    'Image': ['png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'bmp', 'ico'],
+    'Font': ['woff', 'woff2', 'ttf', 'otf', 'eot'],
+    'Media': ['mp4', 'webm', 'ogg', 'mp3', 'wav', 'm4a', 'mov'],
+}
+
+# Analytics, ad and chat-widget hosts; none of them are needed to fill a form
+TRACKER_DOMAINS = [
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'facebook.net', 'connect.facebook.com', 'hotjar.com', 'clarity.ms', 'segment.io', 'segment.com',
+    'mixpanel.com', 'fullstory.com', 'amplitude.com', 'heap.io', 'newrelic.com', 'nr-data.net',
+    'intercom.io', 'intercomcdn.com', 'drift.com', 'driftt.com', 'crisp.chat', 'tawk.to',
+    'zdassets.com', 'zopim.com', 'livechatinc.com', 'snap.licdn.com', 'ads.linkedin.com',
+    'bat.bing.com', 'quantserve.com', 'optimizely.com',
+]
+
+# Extra patterns to block, comma-separated, e.g. FORMPILOT_BLOCK_EXTRA='*cdn.example.com/video/*'
+EXTRA_PATTERNS = [pattern.strip() for pattern in os.getenv("FORMPILOT_BLOCK_EXTRA", "").split(",") if pattern.strip()]
+
+# Per-site allowlists for pages that break without some resources:
+# FORMPILOT_BLOCK_ALLOW='{"jobs.example.com": ["*.woff2"], "apply.example.org": "*"}'
+# A list unblocks those patterns on the site; "*" turns blocking off there.
+try:
+    SITE_ALLOWLISTS = json.loads(os.getenv("FORMPILOT_BLOCK_ALLOW", "") or "{}")
+except ValueError:
+    logger.error("Ignoring malformed FORMPILOT_BLOCK_ALLOW")
+    SITE_ALLOWLISTS = {}
+
+# Typical transfer sizes used to estimate what a blocked request would have cost
+ESTIMATED_BYTES = {
+    'Image': 40_000,
+    'Font': 35_000,
+    'Media': 500_000,
+    'Script': 60_000,
+    'XHR': 5_000,
+    'Fetch': 5_000,
+    'Other': 10_000,
+}
+
+
+def default_patterns():
+    patterns = []
+    for extensions in BLOCKED_EXTENSIONS.values():
+        for extension in extensions:
+            patterns += [f"*.{extension}", f"*.{extension}?*"]
+    patterns += [f"*{domain}/*" for domain in TRACKER_DOMAINS]
+    return patterns + EXTRA_PATTERNS
+
+
+DEFAULT_PATTERNS = default_patterns()
+
+
+def blocked_patterns(url=None):
+    """URL patterns to block while `url` loads, with the site's allowlist applied"""
+    if not BLOCK_RESOURCES:
+        return []
+    patterns = list(DEFAULT_PATTERNS)
+    if url:
+        host = (urlparse(url).hostname or "").lower()
+        for domain, allowed in SITE_ALLOWLISTS.items():
+            domain = domain.lower()
+            if host == domain or host.endswith("." + domain):
+                if allowed == "*":
+                    return []
+                patterns = [pattern for pattern in patterns if pattern not in allowed]
+    return patterns
+
+
+def enable_performance_log(chrome_options):
+    """Record network events so each page load's savings can be measured"""
+    if BLOCK_RESOURCES:
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+
+def install(driver):
+    """Turn on network blocking with the default blocklist for a new session"""
+    if not BLOCK_RESOURCES:
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    _set_patterns(driver, DEFAULT_PATTERNS)
+
+
+def _set_patterns(driver, patterns):
+    if getattr(driver, '_formpilot_blocked', None) != patterns:
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        driver._formpilot_blocked = patterns
+
+
+def prepare_navigation(driver, url):
+    """Apply the site's blocklist and drop earlier network events before driver.get(url)"""
+    if not BLOCK_RESOURCES:
+        return
+    try:
+        _set_patterns(driver, blocked_patterns(url))
+        driver.get_log("performance")
+    except Exception as e:
+        logger.warning(f"Could not prepare resource blocking for {url}: {str(e)}")
+
+
+def measure_page_load(driver):
+    """Requests made and blocked, and bytes loaded and (estimated) saved since prepare_navigation"""
+    report = {'requests': 0, 'blocked': 0, 'bytes_loaded': 0, 'bytes_saved_estimate': 0}
+    if not BLOCK_RESOURCES:
+        return report
+    try:
+        entries = driver.get_log("performance")
+    except Exception as e:
+        logger.warning(f"Could not read the performance log: {str(e)}")
+        return report
+    types = {}
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError):
+            continue
+        method, params = message.get('method'), message.get('params', {})
+        if method == 'Network.requestWillBeSent':
+            report['requests'] += 1
+            types[params.get('requestId')] = params.get('type', 'Other')
+        elif method == 'Network.loadingFinished':
+            report['bytes_loaded'] += int(params.get('encodedDataLength') or 0)
+        elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+            report['blocked'] += 1
+            resource_type = params.get('type') or types.get(params.get('requestId'), 'Other')
+            report['bytes_saved_estimate'] += ESTIMATED_BYTES.get(resource_type, ESTIMATED_BYTES['Other'])
+    record_page_load(report)
+    return report
+
+
+def format_savings(report):
+    if not BLOCK_RESOURCES:
+        return "resource blocking off"
+    return (f"{report['requests']} requests, {report['blocked']} blocked, "
+            f"{report['bytes_loaded'] / 1024:.0f} KB loaded, ~{report['bytes_saved_estimate'] / 1024:.0f} KB saved")
+
+
+def load_page(driver, url, wait=None):
+    """Navigate with the site's blocklist, wait with `wait(driver, url)`, and report the savings"""
+    prepare_navigation(driver, url)
+    driver.get(url)
+    if wait is not None:
+        wait(driver, url)
+    report = measure_page_load(driver)
+    if report['requests']:
+        logger.info(f"Loaded {url}: {format_savings(report)}")
+    return report
+
+
+# Totals across every measured page load in this process
+_stats = {'page_loads': 0, 'requests': 0, 'blocked': 0, 'bytes_loaded': 0, 'bytes_saved_estimate': 0}
+_stats_lock = threading.Lock()
+
+
+def record_page_load(report):
+    with _stats_lock:
+        _stats['page_loads'] += 1
+        for key, value in report.items():
+            _stats[key] += value
+
+
+def get_blocking_stats():
+    with _stats_lock:
+        return dict(_stats)
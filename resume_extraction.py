@@ -0,0 +1,268 @@
+from local_extraction import (
+    EXTRACTION_FIELDS, LIST_FIELDS, LINK_FIELDS, extract_local_fields, local_fallbacks, merge_fields,
+)
+from json_stream import IncrementalObjectParser
+from resume_text import PROMPT_TOKEN_BUDGET, prepare_resume_text
+from sqlite_cache import SQLiteCache
+from collections import deque
+import threading
+import logging
+import json
+import time
+import os
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Bump whenever the prompt or the expected JSON changes, so stale cache entries stop matching
+EXTRACTION_PROMPT_VERSION = "4"
+
+EXTRACTION_CACHE_BYPASS = os.getenv("FORMPILOT_EXTRACTION_CACHE_BYPASS", "").lower() in ("1", "true", "yes")
+EXTRACTION_CACHE_MAX_AGE = float(os.getenv("FORMPILOT_EXTRACTION_CACHE_MAX_AGE", str(30 * 24 * 3600)))
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("FORMPILOT_EXTRACTION_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+# Example value for each field in the JSON structure the prompt asks for
+FIELD_EXAMPLES = {
+    "name": "Full Name",
+    "email": "email address",
+    "phone": "phone number",
+    "address": "full address or location",
+    "skills": ["skill1", "skill2"],
+    "experience": ["job description"],
+    "education": ["degree and institution"],
+    "linkedin": "linkedin url from extracted links",
+    "github": "github url from extracted links",
+    "portfolio": "portfolio url from extracted links",
+    "google_drive": "google drive url if found",
+    "dropbox": "dropbox url if found",
+}
+
+
+def build_extraction_prompt(pdf_text, extracted_links, token_budget=PROMPT_TOKEN_BUDGET, fields=EXTRACTION_FIELDS):
+    """Prompt asking Gemini for the structured resume JSON, limited to `fields`.
+
+    `pdf_text` is the list of page texts (or the whole text); it is windowed
+    into `token_budget` tokens by resume_text.prepare_resume_text.
+    """
+    structure = json.dumps({field: FIELD_EXAMPLES[field] for field in fields}, indent=4)
+    links_block = ""
+    if any(field in LINK_FIELDS for field in fields):
+        links_block = f"""
+    Extracted Links from PDF:
+    {json.dumps(extracted_links, indent=2)}"""
+    return f"""
+    Extract information from this resume and return ONLY valid JSON without any markdown formatting or extra text.
+    Resume Text:
+    {prepare_resume_text(pdf_text, token_budget)}{links_block}
+    Return only this JSON structure with actual values:
+    {structure}
+    IMPORTANT:
+    - Return ONLY the JSON, no other text
+    - Use the extracted links provided above - they are actual clickable URLs
+    - Use "N/A" for missing info, empty arrays [] for missing lists
+    - Do not wrap in markdown code blocks
+    """
+
+
+def response_schema(fields):
+    """Typed schema for the requested fields, for Gemini's schema-constrained JSON mode"""
+    return {
+        "type": "object",
+        "properties": {
+            field: {"type": "array", "items": {"type": "string"}} if field in LIST_FIELDS else {"type": "string"}
+            for field in fields
+        },
+        "required": list(fields),
+    }
+
+
+def generation_config(fields):
+    return {"response_mime_type": "application/json", "response_schema": response_schema(fields)}
+
+
+def is_valid_value(field, value):
+    if field in LIST_FIELDS:
+        return isinstance(value, list) and all(isinstance(item, str) for item in value)
+    return isinstance(value, str)
+
+
+def parse_extraction_response(response_text, fields):
+    """Parse and validate a JSON extraction response.
+
+    Returns (valid, invalid): the requested fields whose values match the
+    schema, and the names of the fields that are missing or malformed. A
+    truncated response still yields the members that arrived complete.
+    """
+    parser = IncrementalObjectParser()
+    try:
+        parser.feed(response_text)
+        data = parser.close()
+    except json.JSONDecodeError as e:
+        logger.warning(f"Extraction response is not complete JSON: {str(e)}")
+        data = parser.result
+    valid = {field: data[field] for field in fields if field in data and is_valid_value(field, data[field])}
+    return valid, [field for field in fields if field not in valid]
+
+
+# Seconds to the first model field and to the complete result, per Gemini extraction
+_extraction_timings = deque(maxlen=100)
+_extraction_timings_lock = threading.Lock()
+
+
+def record_extraction_timing(first_field, total):
+    with _extraction_timings_lock:
+        _extraction_timings.append((first_field, total))
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def get_extraction_latency_stats():
+    """p50/p95 time-to-first-field and total time of recent Gemini extractions, in seconds"""
+    with _extraction_timings_lock:
+        timings = list(_extraction_timings)
+    first_fields = [first for first, _ in timings if first is not None]
+    totals = [total for _, total in timings]
+    return {
+        'extractions': len(timings),
+        'first_field_p50': _percentile(first_fields, 0.5),
+        'first_field_p95': _percentile(first_fields, 0.95),
+        'total_p50': _percentile(totals, 0.5),
+        'total_p95': _percentile(totals, 0.95),
+    }
+
+
+def extraction_cache_key(pdf_digest, model_name, fields=EXTRACTION_FIELDS):
+    """Content address of an extraction: PDF bytes digest, prompt version, text budget, model and fields"""
+    return f"{pdf_digest}:{EXTRACTION_PROMPT_VERSION}:{PROMPT_TOKEN_BUDGET}:{model_name}:{','.join(fields)}"
+
+
+_extraction_cache = None
+_extraction_cache_lock = threading.Lock()
+
+
+def get_extraction_cache():
+    """Process-wide extraction cache"""
+    global _extraction_cache
+    with _extraction_cache_lock:
+        if _extraction_cache is None:
+            _extraction_cache = SQLiteCache("extractions.sqlite3", max_entries=None,
+                                            max_age=EXTRACTION_CACHE_MAX_AGE,
+                                            max_bytes=EXTRACTION_CACHE_MAX_BYTES)
+        return _extraction_cache
+
+
+def request_fields(model, pdf_text, extracted_links, fields, on_field, stream=False):
+    """Ask Gemini for `fields`; returns (valid, invalid) and reports each valid field to on_field.
+
+    With stream=True the response is parsed as chunks arrive, so fields are
+    reported as soon as each one is complete. A stream that breaks off keeps
+    the fields that already arrived.
+    """
+    prompt = build_extraction_prompt(pdf_text, extracted_links, fields=fields)
+    if not stream:
+        response = model.generate_content(prompt, generation_config=generation_config(fields))
+        valid, invalid = parse_extraction_response(response.text, fields)
+        for field, value in valid.items():
+            on_field(field, value)
+        return valid, invalid
+
+    valid = {}
+    parser = IncrementalObjectParser()
+    response = model.generate_content(prompt, generation_config=generation_config(fields), stream=True)
+    try:
+        for chunk in response:
+            for field, value in parser.feed(chunk.text):
+                if field in fields and is_valid_value(field, value):
+                    valid[field] = value
+                    on_field(field, value)
+        parser.close()
+    except json.JSONDecodeError as e:
+        logger.warning(f"Streamed extraction response is not complete JSON: {str(e)}")
+    except Exception as e:
+        if not valid:
+            raise
+        logger.warning(f"Extraction stream broke off after {len(valid)} fields: {str(e)}")
+    return valid, [field for field in fields if field not in valid]
+
+
+def extract_resume_data(model, pdf_digest, pdf_text, extracted_links, bypass_cache=False, required_fields=None,
+                        on_field=None):
+    """Structured resume data, asking Gemini only for what local extraction could not find.
+
+    Email, phone and categorized links are read locally and trusted; the
+    name, address, portfolio and the rest always come from Gemini, with the
+    first uncategorized link standing in for a portfolio it does not give.
+
+    `pdf_digest` is the SHA-256 of the PDF bytes (ParsedDocument.sha256) and
+    `pdf_text` the page texts (ParsedDocument.pages). `required_fields`
+    limits the result to the fields a form needs (default: all of them).
+    When `on_field(field, value)` is given, the Gemini response is streamed
+    and every field is reported as soon as it is known.
+
+    Returns (data, source) where source is 'local' (Gemini not needed),
+    'cache', 'gemini', or 'local_fallback' when Gemini failed and only the
+    locally found fields are available. API errors propagate when nothing
+    was found locally.
+    """
+    started = time.monotonic()
+    stream = on_field is not None
+    on_field = on_field or (lambda field, value: None)
+    bypass_cache = bypass_cache or EXTRACTION_CACHE_BYPASS
+    local_fields = extract_local_fields(pdf_text, extracted_links)
+    fallbacks = local_fallbacks(pdf_text, extracted_links)
+    for field, value in local_fields.items():
+        on_field(field, value)
+    needed = [field for field in EXTRACTION_FIELDS
+              if field not in local_fields and (required_fields is None or field in required_fields)]
+    if not needed:
+        return merge_fields(fallbacks, local_fields), 'local'
+
+    key = extraction_cache_key(pdf_digest, model.model_name, needed)
+    cache = get_extraction_cache()
+    if not bypass_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            for field, value in cached.items():
+                on_field(field, value)
+            return merge_fields(fallbacks, cached, local_fields), 'cache'
+    first_field = []
+
+    def model_field(field, value):
+        if not first_field:
+            first_field.append(time.monotonic() - started)
+        on_field(field, value)
+
+    try:
+        data, invalid = request_fields(model, pdf_text, extracted_links, needed, model_field, stream=stream)
+    except Exception as e:
+        if not local_fields:
+            raise
+        logger.warning(f"Gemini extraction failed, using locally extracted fields only: {str(e)}")
+        return merge_fields(fallbacks, local_fields), 'local_fallback'
+    if invalid:
+        data.update(reask_fields(model, pdf_text, extracted_links, invalid, model_field, stream=stream))
+        invalid = [field for field in invalid if field not in data]
+    record_extraction_timing(first_field[0] if first_field else None, time.monotonic() - started)
+    # Incomplete results are not worth remembering
+    if invalid:
+        logger.warning(f"Extraction left invalid fields: {', '.join(invalid)}")
+    else:
+        cache.set(key, data)
+    return merge_fields(fallbacks, data, local_fields), 'gemini'
+
+
+def reask_fields(model, pdf_text, extracted_links, fields, on_field, stream=False):
+    """One follow-up request for just the fields that came back missing or malformed"""
+    logger.info(f"Re-asking Gemini for invalid fields: {', '.join(fields)}")
+    try:
+        valid, _ = request_fields(model, pdf_text, extracted_links, fields, on_field, stream=stream)
+    except Exception as e:
+        logger.warning(f"Re-ask failed: {str(e)}")
+        return {}
+    return valid
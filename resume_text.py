@@ -0,0 +1,169 @@
+import logging
+import re
+import os
+from collections import Counter
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Prompt budget for the resume text, in estimated tokens (~4 characters each)
+PROMPT_TOKEN_BUDGET = int(os.getenv("FORMPILOT_PROMPT_TOKEN_BUDGET", "600"))
+CHARS_PER_TOKEN = 4
+
+# Lines within this distance of a page edge are header/footer candidates
+EDGE_LINES = 3
+
+SECTION_HEADINGS = {
+    'summary': ('summary', 'profile', 'professional summary', 'about me', 'objective', 'career objective'),
+    'experience': ('experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'internships', 'internship'),
+    'education': ('education', 'academic background', 'academics', 'qualifications',
+                  'academic qualifications', 'education and training'),
+    'skills': ('skills', 'technical skills', 'key skills', 'core competencies', 'technologies',
+               'tools', 'skills and tools', 'tech stack'),
+    'projects': ('projects', 'personal projects', 'selected projects', 'academic projects'),
+    'certifications': ('certifications', 'certificates', 'licenses', 'courses', 'training'),
+    'other': ('awards', 'achievements', 'honors', 'publications', 'languages', 'interests',
+              'hobbies', 'volunteering', 'activities', 'references'),
+}
+
+# Share of the budget a section is entitled to; unused share flows to the others
+SECTION_WEIGHTS = {
+    'contact': 3,
+    'skills': 3,
+    'education': 3,
+    'experience': 4,
+    'summary': 1,
+    'projects': 1,
+    'certifications': 1,
+    'other': 0.5,
+}
+
+_HEADING_LOOKUP = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+_HEADING_PATTERN = re.compile(r"^[\W_]*([A-Za-z][A-Za-z &/]{1,40}?)[\s:\-–|]*$")
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def normalize_lines(text):
+    """Collapse runs of spaces, strip lines and drop empty ones and bare page numbers"""
+    lines = []
+    for line in text.splitlines():
+        line = _SPACES.sub(" ", line).strip()
+        if line and not _PAGE_NUMBER.match(line):
+            lines.append(line)
+    return lines
+
+
+def strip_repeated_edges(pages):
+    """Drop header/footer lines that repeat at the top or bottom of most pages"""
+    if len(pages) < 2:
+        return pages
+    edge_counts = Counter()
+    for lines in pages:
+        edge_counts.update({line.lower() for line in lines[:EDGE_LINES] + lines[-EDGE_LINES:]})
+    threshold = max(2, (len(pages) + 1) // 2)
+    repeated = {line for line, count in edge_counts.items() if count >= threshold}
+    if not repeated:
+        return pages
+    cleaned = []
+    for number, lines in enumerate(pages):
+        edges = set(range(min(EDGE_LINES, len(lines)))) | set(range(max(0, len(lines) - EDGE_LINES), len(lines)))
+        if number == 0:
+            # The first page keeps its header: it is usually the contact block
+            edges -= set(range(EDGE_LINES))
+        cleaned.append([line for i, line in enumerate(lines) if i not in edges or line.lower() not in repeated])
+    return cleaned
+
+
+def heading_section(line):
+    """Section name if the line is a section heading, else None"""
+    if len(line) > 45:
+        return None
+    match = _HEADING_PATTERN.match(line)
+    if not match:
+        return None
+    return _HEADING_LOOKUP.get(" ".join(match.group(1).lower().split()))
+
+
+def split_sections(lines):
+    """[(section, lines)] in document order; text before the first heading is 'contact'"""
+    sections = [('contact', [])]
+    for line in lines:
+        section = heading_section(line)
+        if section:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, body) for name, body in sections if body]
+
+
+def allocate_budget(sizes, weights, budget):
+    """Split a token budget by weight, handing what small sections don't use to the rest"""
+    allocation = {index: 0 for index in sizes}
+    open_sections = {index for index, size in sizes.items() if size > 0}
+    remaining = budget
+    while open_sections and remaining > 0:
+        total_weight = sum(weights[index] for index in open_sections)
+        satisfied = set()
+        spent = 0
+        for index in open_sections:
+            share = remaining * weights[index] / total_weight
+            need = sizes[index] - allocation[index]
+            if need <= share:
+                allocation[index] += need
+                spent += need
+                satisfied.add(index)
+        if not satisfied:
+            for index in open_sections:
+                allocation[index] += int(remaining * weights[index] / total_weight)
+            break
+        open_sections -= satisfied
+        remaining -= spent
+    return allocation
+
+
+def truncate_lines(lines, token_budget):
+    """Whole lines up to the budget, then as much of the next line as still fits"""
+    kept, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > token_budget:
+            room = (token_budget - used - 1) * CHARS_PER_TOKEN
+            if room > 20:
+                kept.append(line[:room].rsplit(" ", 1)[0])
+            break
+        kept.append(line)
+        used += cost
+    return kept
+
+
+def prepare_resume_text(pages, token_budget=PROMPT_TOKEN_BUDGET):
+    """Resume text for the extraction prompt, packed into `token_budget` estimated tokens.
+
+    `pages` is a list of page texts (or one string). Whitespace is normalized,
+    headers/footers repeated across pages are removed, and each detected
+    section gets a weighted share of the budget so long experience sections
+    cannot crowd out skills and education. Sections keep their document order.
+    """
+    if isinstance(pages, str):
+        pages = [pages]
+    lines = [line for page in strip_repeated_edges([normalize_lines(page) for page in pages]) for line in page]
+    sections = split_sections(lines)
+
+    sizes = {index: sum(estimate_tokens(line) + 1 for line in body) for index, (_, body) in enumerate(sections)}
+    if sum(sizes.values()) <= token_budget:
+        return "\n".join(lines)
+
+    weights = {index: SECTION_WEIGHTS.get(name, 1) for index, (name, _) in enumerate(sections)}
+    allocation = allocate_budget(sizes, weights, token_budget)
+    packed = []
+    for index, (name, body) in enumerate(sections):
+        packed.extend(truncate_lines(body, allocation[index]))
+    logger.info(f"Packed resume text from {sum(sizes.values())} to ~{token_budget} tokens "
+                f"across {len(sections)} sections")
+    return "\n".join(packed)
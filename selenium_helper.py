@@ -1,8 +1,7 @@
 import streamlit as st
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from driver_resolver import chrome_service
 import os
 import logging
 
@@ -25,7 +24,7 @@ def setup_driver():
             chrome_options.binary_location = chrome_bin
 
         logger.info("Setting up ChromeDriver...")
-        service = Service(ChromeDriverManager().install())
+        service = chrome_service()
         driver = webdriver.Chrome(service=service, options=chrome_options)
         driver.implicitly_wait(10)
         driver.set_page_load_timeout(30)
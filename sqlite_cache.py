@@ -0,0 +1,123 @@
+from contextlib import contextmanager
+import threading
+import sqlite3
+import logging
+import json
+import time
+import os
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("FORMPILOT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "formpilot"))
+
+
+class SQLiteCache:
+    """A small JSON key/value store on SQLite with age, LRU and size eviction.
+
+    The database file can be shared by several processes; SQLite handles the
+    locking. `max_age` is in seconds, `max_bytes` bounds the stored JSON size.
+    """
+
+    def __init__(self, filename, max_entries=1000, max_age=None, max_bytes=None):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        self.path = filename if os.path.isabs(filename) else os.path.join(CACHE_DIR, filename)
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL, expires_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+
+    @contextmanager
+    def _connect(self):
+        """A connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        """Return the cached value, or None when missing or expired"""
+        now = time.time()
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute("SELECT value, created_at, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+                expired = row and ((row[2] is not None and row[2] < now) or
+                                   (self.max_age is not None and row[1] + self.max_age < now))
+                if expired:
+                    conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                if not row or expired:
+                    self.misses += 1
+                    return None
+                conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return json.loads(row[0])
+        except sqlite3.Error as e:
+            logger.error(f"Cache read failed ({self.path}): {str(e)}")
+            self.misses += 1
+            return None
+
+    def set(self, key, value, ttl=None):
+        """Store a JSON-serialisable value, optionally expiring after ttl seconds"""
+        payload = json.dumps(value)
+        now = time.time()
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, size, created_at, accessed_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, payload, len(payload), now, now, now + ttl if ttl is not None else None)
+                )
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.error(f"Cache write failed ({self.path}): {str(e)}")
+
+    def delete(self, key):
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.error(f"Cache delete failed ({self.path}): {str(e)}")
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM cache")
+
+    def _evict(self, conn, now):
+        """Drop expired rows, then least recently used rows beyond the bounds"""
+        conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+        if self.max_age is not None:
+            conn.execute("DELETE FROM cache WHERE created_at < ?", (now - self.max_age,))
+        if self.max_entries is not None:
+            conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+        if self.max_bytes is not None:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+            if total > self.max_bytes:
+                for key, size in conn.execute("SELECT key, size FROM cache ORDER BY accessed_at").fetchall():
+                    conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+
+    def stats(self):
+        """Hit/miss counters for this process plus the current entry count"""
+        try:
+            with self._lock, self._connect() as conn:
+                entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        except sqlite3.Error:
+            entries, size = 0, 0
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': size}
@@ -0,0 +1,146 @@
+from selenium.common.exceptions import TimeoutException
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+from collections import defaultdict
+from driver_pool import POOL_SIZE
+from submission_signals import classify_verdict
+import threading
+import requests
+import logging
+import random
+import json
+import time
+import os
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+SUBMIT_PER_DOMAIN = int(os.getenv("FORMPILOT_SUBMIT_PER_DOMAIN", "1"))
+# Minimum seconds between starting two submissions on the same domain
+SUBMIT_DOMAIN_INTERVAL = float(os.getenv("FORMPILOT_SUBMIT_DOMAIN_INTERVAL", "5"))
+SUBMIT_RETRIES = int(os.getenv("FORMPILOT_SUBMIT_RETRIES", "2"))
+SUBMIT_BACKOFF = float(os.getenv("FORMPILOT_SUBMIT_BACKOFF", "3"))
+
+# Errors that say nothing about the form itself; worth another attempt
+# (requests' exceptions derive from IOError, not the builtin ConnectionError/TimeoutError)
+TRANSIENT_ERRORS = (TimeoutError, TimeoutException, ConnectionError,
+                    requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+TRANSIENT_MESSAGES = ('err_connection', 'err_name_not_resolved', 'err_timed_out', 'timed out',
+                      'timeout', 'disconnected', 'session deleted', 'chrome not reachable')
+
+
+def is_transient(error):
+    if error is None:
+        return False
+    message = str(error).lower()
+    return isinstance(error, TRANSIENT_ERRORS) or any(text in message for text in TRANSIENT_MESSAGES)
+
+
+def interleave_by_domain(urls):
+    """Round-robin the URLs over their domains so workers are not all queued on one site"""
+    by_domain = defaultdict(list)
+    for url in dict.fromkeys(urls):
+        by_domain[urlparse(url).netloc.lower()].append(url)
+    queues = list(by_domain.values())
+    ordered = []
+    while queues:
+        ordered.extend(queue.pop(0) for queue in queues)
+        queues = [queue for queue in queues if queue]
+    return ordered
+
+
+class SubmissionScheduler:
+    """Submits one profile to many forms on a pool of browser workers.
+
+    `filler_factory` builds a form filler (EnhancedWebFormFillerTool in the
+    app) whose _run(form_data, outcome=...) fills, submits and verifies one
+    form. At most `per_domain` submissions run against a domain at once, and
+    starts on the same domain are spaced by `domain_interval` seconds.
+    Transient failures are retried with exponential backoff, but never once
+    a submit click may have happened, so a form is not submitted twice.
+    """
+
+    def __init__(self, filler_factory, workers=POOL_SIZE, per_domain=SUBMIT_PER_DOMAIN,
+                 domain_interval=SUBMIT_DOMAIN_INTERVAL, retries=SUBMIT_RETRIES, backoff=SUBMIT_BACKOFF):
+        self.filler_factory = filler_factory
+        self.workers = max(1, workers)
+        self.domain_interval = domain_interval
+        self.retries = retries
+        self.backoff = backoff
+        self._domain_slots = defaultdict(lambda: threading.Semaphore(per_domain))
+        self._domain_started = {}
+        self._lock = threading.Lock()
+
+    def _wait_for_domain(self, domain):
+        """Politeness delay: space out starts on one domain"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                ready_at = self._domain_started.get(domain, 0.0) + self.domain_interval
+                if now >= ready_at:
+                    self._domain_started[domain] = now
+                    return
+            time.sleep(ready_at - now)
+
+    def submit_one(self, profile, form_url):
+        """Fill and submit one form, retrying transient failures; returns its report entry"""
+        domain = urlparse(form_url).netloc.lower()
+        with self._lock:
+            slot = self._domain_slots[domain]
+        started = time.monotonic()
+        entry = {'url': form_url, 'domain': domain, 'attempts': 0}
+        for attempt in range(self.retries + 1):
+            outcome = {}
+            with slot:
+                self._wait_for_domain(domain)
+                entry['attempts'] += 1
+                try:
+                    self.filler_factory()._run(json.dumps(dict(profile, form_url=form_url)), outcome=outcome)
+                except Exception as e:
+                    outcome['error'] = e
+            error = outcome.get('error')
+            retry = is_transient(error) and not outcome.get('submit_attempted') and attempt < self.retries
+            if not retry:
+                break
+            delay = self.backoff * (2 ** attempt) * random.uniform(0.8, 1.2)
+            logger.warning(f"Transient failure on {form_url} ({error}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+        entry.update({
+            'status': 'error' if error is not None else classify_verdict(outcome.get('verdict')),
+            'verdict': outcome.get('verdict'),
+            'filled': outcome.get('filled', []),
+            'error': str(error) if error is not None else None,
+            'seconds': round(time.monotonic() - started, 2),
+        })
+        return entry
+
+    def submit_all(self, profile, form_urls, on_result=None):
+        """Submit `profile` to every URL; returns the consolidated report.
+
+        `on_result(entry)` is called as each URL finishes. The report has
+        one entry per URL in input order plus a count per status.
+        """
+        urls = list(dict.fromkeys(form_urls))
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(urls) or 1),
+                                thread_name_prefix="form-submit") as executor:
+            futures = {executor.submit(self.submit_one, profile, url): url for url in interleave_by_domain(urls)}
+            for future in as_completed(futures):
+                entry = future.result()
+                results[entry['url']] = entry
+                if on_result:
+                    on_result(entry)
+        entries = [results[url] for url in urls]
+        summary = defaultdict(int)
+        for entry in entries:
+            summary[entry['status']] += 1
+        return {'results': entries, 'summary': dict(summary)}
+
+
+def format_report(report):
+    """Plain-text summary of a submit_all report"""
+    lines = ["Submissions: " + ", ".join(f"{count} {status}" for status, count in sorted(report['summary'].items()))]
+    for entry in report['results']:
+        detail = entry['error'] or entry['verdict'] or ""
+        lines.append(f"[{entry['status']}] {entry['url']} ({entry['attempts']} attempts, {entry['seconds']}s) {detail}")
+    return "\n".join(lines)
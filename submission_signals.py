@@ -0,0 +1,63 @@
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Page text that says a submission went through; shared by the browser and HTTP paths
+SUCCESS_INDICATORS = [
+    'thank you', 'success', 'submitted', 'received', 'confirmation',
+    'thank-you', 'application submitted', 'form submitted',
+    'congratulations', 'well done', 'complete', 'finished',
+    'application received', 'we\'ll be in touch', 'hear from us'
+]
+URL_SUCCESS_INDICATORS = ['success', 'complete', 'thank', 'confirmation', 'submitted']
+
+LIKELY_REDIRECTED = "✅ LIKELY SUCCESS - Page redirected from form (URL changed)"
+LIKELY_FORM_GONE = "✅ LIKELY SUCCESS - Form no longer present on page"
+UNVERIFIED = "⚠ Form action completed but no clear success indicators found. Manual verification recommended."
+
+
+def success_verdict(reasons):
+    return f"🎉 FORM SUBMISSION SUCCESS! Confirmed by: {', '.join(reasons)}"
+
+
+def text_success_reasons(current_url, page_text, page_title):
+    """Success signals visible in the URL, page text and title after a submission.
+
+    `page_text` is the text a reader sees, with markup stripped; raw HTML
+    would match attributes such as autocomplete="off".
+    """
+    page_text = page_text.lower()
+    page_title = page_title.lower()
+    reasons = []
+    if any(indicator in current_url.lower() for indicator in URL_SUCCESS_INDICATORS):
+        reasons.append("URL indicators")
+    if any(indicator in page_text for indicator in SUCCESS_INDICATORS):
+        reasons.append("success message")
+    if any(indicator in page_title for indicator in SUCCESS_INDICATORS):
+        reasons.append("title change")
+    return reasons
+
+
+def page_verdict(original_url, current_url, reasons, form_present):
+    """Verdict string from the signals, in the order verify_submission_v2 weighs them"""
+    if reasons:
+        return success_verdict(reasons)
+    if current_url != original_url:
+        return LIKELY_REDIRECTED
+    if not form_present:
+        return LIKELY_FORM_GONE
+    return UNVERIFIED
+
+
+def classify_verdict(verdict):
+    """Map a verdict string onto success / likely / unverified / failed"""
+    if not verdict:
+        return 'failed'
+    if "SUCCESS" in verdict and "LIKELY" not in verdict:
+        return 'success'
+    if "LIKELY" in verdict:
+        return 'likely'
+    if verdict.startswith("⚠"):
+        return 'unverified'
+    return 'failed'
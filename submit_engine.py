@@ -0,0 +1,132 @@
+from form_snapshot import is_interactable
+from field_matcher import tokenize
+from sqlite_cache import SQLiteCache
+from urllib.parse import urlparse
+from collections import defaultdict
+import threading
+import logging
+import os
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+CLICK_MEMORY_TTL = float(os.getenv("FORMPILOT_CLICK_MEMORY_TTL", str(30 * 24 * 3600)))
+CLICK_MEMORY_MAX_ENTRIES = int(os.getenv("FORMPILOT_CLICK_MEMORY_MAX_ENTRIES", "2000"))
+DEBUG_HIGHLIGHT = os.getenv("FORMPILOT_DEBUG_HIGHLIGHT", "0") == "1"
+
+# Button wording that submits a form, and how strongly
+SUBMIT_WORDS = {'submit': 3.0, 'apply': 3.0, 'applynow': 3.0, 'send': 2.0, 'finish': 2.0,
+                'complete': 1.5, 'register': 1.5, 'done': 1.0, 'continue': 1.0, 'save': 1.0, 'next': 0.5}
+# Wording that rules a button out however submit-like it looks
+AVOID_WORDS = {'cancel', 'reset', 'clear', 'back', 'previous', 'prev', 'search', 'login', 'signin',
+               'subscribe', 'newsletter', 'close', 'delete', 'remove'}
+
+TYPE_SCORES = {'submit': 2.0, 'image': 1.5, 'button': 0.5}
+_FIELD_TAGS = ('input', 'textarea', 'select')
+_NON_FIELD_TYPES = {'submit', 'button', 'image', 'reset', 'hidden', 'file'}
+
+
+def candidate_tokens(control):
+    return set(tokenize(" ".join(filter(None, (
+        control.get('text'), control.get('value') if control['tag'] == 'input' else '',
+        control.get('aria_label'), control.get('id'), control.get('name'),
+    )))))
+
+
+def wording_score(tokens):
+    """Best submit-word weight, or None if the wording rules the control out"""
+    if tokens & AVOID_WORDS:
+        return None
+    return max((SUBMIT_WORDS[token] for token in tokens if token in SUBMIT_WORDS), default=0.0)
+
+
+def fields_by_form(snapshot):
+    """Visible fillable controls grouped by the index of their form (-1 for none)"""
+    groups = defaultdict(list)
+    for control in snapshot:
+        if control['tag'] in _FIELD_TAGS and control['type'] not in _NON_FIELD_TYPES and is_interactable(control):
+            groups[control['form']].append(control)
+    return groups
+
+
+def score_submit_candidate(control, groups, main_form):
+    """Score a control as the form's submit button; None if it is not a candidate.
+
+    Weighs its type, its wording, whether it belongs to the form holding
+    most of the fields, and whether it sits below that form's fields.
+    """
+    if not is_interactable(control) or control['tag'] not in ('button', 'input'):
+        return None
+    control_type = control['type']
+    if control_type not in TYPE_SCORES:
+        return None
+    words = wording_score(candidate_tokens(control))
+    if words is None or (control_type == 'button' and not words):
+        return None
+    score = TYPE_SCORES[control_type] + words
+    if control['form'] >= 0:
+        score += 1.0
+        if control['form'] == main_form:
+            score += 2.0
+    fields = groups.get(control['form'])
+    if fields and control['rect']['y'] >= max(field['rect']['y'] for field in fields):
+        score += 1.0
+    return score
+
+
+def rank_submit_candidates(snapshot):
+    """Submit candidates of a form snapshot as (score, control), best first"""
+    groups = fields_by_form(snapshot)
+    in_forms = {form: fields for form, fields in groups.items() if form >= 0}
+    main_form = max(in_forms, key=lambda form: len(in_forms[form])) if in_forms else None
+    ranked = []
+    for position, control in enumerate(snapshot):
+        score = score_submit_candidate(control, groups, main_form)
+        if score is not None:
+            ranked.append((score, position, control))
+    # Earlier controls win ties
+    ranked.sort(key=lambda item: (-item[0], item[1]))
+    return [(score, control) for score, _, control in ranked]
+
+
+def order_strategies(strategies, preferred):
+    """(name, func) pairs with the preferred strategy moved to the front"""
+    return sorted(strategies, key=lambda strategy: strategy[0] != preferred)
+
+
+class ClickStrategyMemory:
+    """Remembers, per domain, which click strategy last led to a confirmed submission"""
+
+    def __init__(self, cache=None):
+        self.cache = cache or SQLiteCache("click_strategies.sqlite3", max_entries=CLICK_MEMORY_MAX_ENTRIES,
+                                          max_age=CLICK_MEMORY_TTL)
+
+    @staticmethod
+    def domain(url):
+        return (urlparse(url).hostname or "").lower()
+
+    def preferred(self, url):
+        entry = self.cache.get(self.domain(url))
+        return entry['strategy'] if entry else None
+
+    def remember(self, url, strategy):
+        domain = self.domain(url)
+        entry = self.cache.get(domain)
+        successes = entry['successes'] + 1 if entry and entry['strategy'] == strategy else 1
+        self.cache.set(domain, {'strategy': strategy, 'successes': successes})
+
+    def stats(self):
+        return self.cache.stats()
+
+
+_click_memory = None
+_click_memory_lock = threading.Lock()
+
+
+def get_click_strategy_memory():
+    """Process-wide click strategy memory"""
+    global _click_memory
+    with _click_memory_lock:
+        if _click_memory is None:
+            _click_memory = ClickStrategyMemory()
+        return _click_memory
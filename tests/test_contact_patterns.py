@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+
+from contact_patterns import categorize_link, extract_links_from_text, is_phone_number, scan
+
+# The real-world resume link formats benchmarks/bench_contact_scan.py also checks
+with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "benchmarks", "fixtures", "resume_links.json"), encoding="utf-8") as corpus_file:
+    CORPUS = json.load(corpus_file)
+
+
+def kinds(text):
+    return [(match.kind, match.value) for match in scan(text)]
+
+
+def test_scan_finds_emails_links_and_phones_in_order():
+    assert kinds("jane@x.io · github.com/jane · +44 20 7946 0958") == [
+        ('email', "jane@x.io"), ('url', "https://github.com/jane"), ('phone', "+44 20 7946 0958"),
+    ]
+
+
+def test_email_wins_over_link_at_the_same_position():
+    assert kinds("me@github.com") == [('email', "me@github.com")]
+
+
+def test_linkedin_handle_becomes_a_profile_url():
+    [match] = scan("LinkedIn: jane-doe")
+    assert (match.value, match.category) == ("https://www.linkedin.com/in/jane-doe", 'linkedin')
+
+
+@pytest.mark.parametrize("text", ["Phone: 9876543210", "+919876543210", "+91 9876543210", "Tel 5551234567",
+                                  "(555) 123-4567", "+1 555 010 0199"])
+def test_phone_numbers(text):
+    assert [kind for kind, _ in kinds(text)] == ['phone']
+
+
+@pytest.mark.parametrize("text", ["2016 2018 2020", "GPA 3.9", "ZIP 560001", "ID 1234567", "555-0100"])
+def test_not_phone_numbers(text):
+    assert kinds(text) == []
+
+
+def test_is_phone_number():
+    assert is_phone_number("+49 30 1234")
+    assert not is_phone_number("2019 2020 2021")
+    assert is_phone_number("(201) 920 2021")
+
+
+def test_extract_links_keeps_the_first_of_each_category():
+    text = "https://github.com/first a@b.io https://github.com/second c@d.io linkedin.com/in/x"
+    assert extract_links_from_text(text) == {
+        'github': "https://github.com/first", 'email': "a@b.io", 'linkedin': "https://linkedin.com/in/x",
+    }
+
+
+def test_categorize_link():
+    assert categorize_link("https://www.linkedin.com/in/jane") == 'linkedin'
+    assert categorize_link("https://www.linkedin.com/company/acme") is None
+    assert categorize_link("https://drive.google.com/file/d/1") == 'google_drive'
+    assert categorize_link("https://example.com") is None
+
+
+@pytest.mark.parametrize("text", [
+    "a@b.io linkedin.com/in/x github.com/y https://drive.google.com/file/d/1 dropbox.com/s/z",
+    "https://drive.google.com/file/d/1 dropbox.com/s/z a@b.io linkedin.com/in/x github.com/y",
+])
+def test_extract_links_does_not_depend_on_position(text):
+    assert extract_links_from_text(text) == {
+        'email': "a@b.io", 'linkedin': "https://linkedin.com/in/x", 'github': "https://github.com/y",
+        'google_drive': "https://drive.google.com/file/d/1", 'dropbox': "https://dropbox.com/s/z",
+    }
+
+
+@pytest.mark.parametrize("case", CORPUS["links"], ids=lambda case: case["text"][:40])
+def test_link_corpus(case):
+    assert extract_links_from_text(case["text"]) == case["expected"]
+
+
+@pytest.mark.parametrize("case", CORPUS["scan"], ids=lambda case: case["text"][:40])
+def test_scan_corpus(case):
+    assert [[match.kind, match.value] for match in scan(case["text"])] == case["expected"]
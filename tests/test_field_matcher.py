@@ -0,0 +1,82 @@
+from field_matcher import FieldMatcher, default_matcher, tokenize
+
+
+def control(**attributes):
+    """A text input as form_snapshot reports it, with the given attributes"""
+    return dict({'tag': 'input', 'type': 'text', 'visible': True, 'enabled': True}, **attributes)
+
+
+def matched_field(snapshot, fields):
+    return {field: snapshot.index(found) for field, found in default_matcher.match(snapshot, fields).items()}
+
+
+def test_tokenize_splits_case_and_joins_pairs():
+    assert tokenize("fullName") == ['full', 'name', 'fullname']
+    assert tokenize("e-mail_address") == ['e', 'mail', 'address', 'email', 'mailaddress']
+    assert tokenize("") == []
+
+
+def test_label_beats_placeholder():
+    snapshot = [control(placeholder="Email"), control(label="Email")]
+    assert matched_field(snapshot, ['email']) == {'email': 1}
+
+
+def test_name_beats_label():
+    snapshot = [control(label="Email"), control(name="email")]
+    assert matched_field(snapshot, ['email']) == {'email': 1}
+
+
+def test_labels_fall_back_from_for_to_previous_to_wrapping():
+    scores = default_matcher.score_control(control(labels={'for': "", 'previous': "Phone", 'wrapping': "Skills"}))
+    assert set(scores) == {'phone'}
+
+
+def test_synonyms_map_to_fields():
+    snapshot = [
+        control(name="mobile"),
+        control(label="Full Name"),
+        control(id="linked_in_url"),
+        control(placeholder="Tech stack"),
+    ]
+    assert matched_field(snapshot, ['phone', 'name', 'linkedin', 'skills']) == {
+        'phone': 0, 'name': 1, 'linkedin': 2, 'skills': 3,
+    }
+
+
+def test_input_type_pins_the_field():
+    assert matched_field([control(type='email', name="contact")], ['email']) == {'email': 0}
+
+
+def test_exclusions_rule_out_a_synonym():
+    assert matched_field([control(label="Company Name"), control(label="Last name")], ['name']) == {}
+
+
+def test_min_score_is_the_ambiguity_threshold():
+    # A placeholder "mail" scores 2.0 * 0.8; a label "city" scores exactly 2.5 * 0.8
+    assert matched_field([control(placeholder="mail")], ['email']) == {}
+    assert matched_field([control(label="city")], ['address']) == {'address': 0}
+    assert FieldMatcher(min_score=1.0).match([control(placeholder="mail")], ['email'])
+
+
+def test_each_control_takes_one_field_and_ties_go_to_the_earlier_control():
+    snapshot = [control(name="email"), control(name="email")]
+    assert matched_field(snapshot, ['email']) == {'email': 0}
+
+
+def test_no_match():
+    snapshot = [
+        control(label="Favourite colour"),
+        control(type='hidden', name="email"),
+        control(type='submit', name="email"),
+        control(name="email", visible=False),
+        dict(control(name="email"), tag='select'),
+    ]
+    assert default_matcher.match(snapshot, ['email', 'name']) == {}
+
+
+def test_find_control_by_locator_then_name_then_wording():
+    snapshot = [control(name="a", locator="#a"), control(id="b", label="Cover letter"), control(name="c")]
+    assert default_matcher.find_control(snapshot, {'locator': "#a"}) is snapshot[0]
+    assert default_matcher.find_control(snapshot, {'name': "b"}) is snapshot[1]
+    assert default_matcher.find_control(snapshot, {'label': "Your cover letter"}) is snapshot[1]
+    assert default_matcher.find_control(snapshot, {'label': "Salary"}) is None
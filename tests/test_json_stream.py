@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from json_stream import IncrementalObjectParser, parse_object
+
+
+def test_members_are_reported_as_they_complete():
+    parser = IncrementalObjectParser()
+    assert parser.feed('Here you go: {"name": "Jane", "ski') == [('name', "Jane")]
+    assert parser.feed('lls": ["Python", "SQL"], ') == [('skills', ["Python", "SQL"])]
+    assert parser.feed('"nested": {"a": 1}}') == [('nested', {'a': 1})]
+    assert parser.close() == {'name': "Jane", 'skills': ["Python", "SQL"], 'nested': {'a': 1}}
+
+
+def test_numbers_wait_for_their_delimiter():
+    parser = IncrementalObjectParser()
+    assert parser.feed('{"years": 1') == []
+    assert parser.feed('2') == []
+    assert parser.feed('}') == [('years', 12)]
+
+
+def test_one_character_at_a_time():
+    text = json.dumps({'a': "x,}y", 'b': [1, {'c': None}], 'd': True})
+    parser = IncrementalObjectParser()
+    members = [member for character in text for member in parser.feed(character)]
+    assert members == [('a', "x,}y"), ('b', [1, {'c': None}]), ('d', True)]
+
+
+def test_unterminated_object_raises_on_close():
+    parser = IncrementalObjectParser()
+    parser.feed('{"a": 1, ')
+    with pytest.raises(json.JSONDecodeError):
+        parser.close()
+
+
+def test_malformed_member_raises():
+    with pytest.raises(json.JSONDecodeError):
+        IncrementalObjectParser().feed('{"a": 1 "b": 2}')
+
+
+def test_parse_object_matches_json_loads():
+    text = '{"email": "a@b.io", "experience": ["one", "two"], "score": 3.5, "empty": {}}'
+    assert parse_object(text) == json.loads(text)
@@ -0,0 +1,44 @@
+from resume_text import (
+    estimate_tokens, heading_section, normalize_lines, prepare_resume_text, split_sections, strip_repeated_edges,
+    truncate_lines,
+)
+
+
+def test_normalize_lines_collapses_spaces_and_drops_page_numbers():
+    assert normalize_lines("  Jane  Doe \n\n Page 2 of 3\n7\nPython,  SQL") == ["Jane Doe", "Python, SQL"]
+
+
+def test_repeated_headers_and_footers_are_stripped_after_the_first_page():
+    first = ["Summary", "Backend engineer", "Seven years"]
+    second = ["Experience", "Acme Corp", "Globex"]
+    pages = [["Jane Doe"] + first + ["Page footer"], ["Jane Doe"] + second + ["Page footer"]]
+    assert strip_repeated_edges(pages) == [["Jane Doe"] + first, second]
+
+
+def test_headings_and_sections():
+    assert heading_section("WORK EXPERIENCE:") == 'experience'
+    assert heading_section("Experience with large systems and teams") is None
+    lines = ["Jane Doe", "jane@x.io", "Skills", "Python", "Education", "BSc"]
+    assert split_sections(lines) == [
+        ('contact', ["Jane Doe", "jane@x.io"]), ('skills', ["Skills", "Python"]), ('education', ["Education", "BSc"]),
+    ]
+
+
+def test_truncate_lines_cuts_the_last_line_at_a_word():
+    lines = ["a" * 40, "word " * 40]
+    kept = truncate_lines(lines, 30)
+    assert kept[0] == lines[0]
+    assert kept[1].startswith("word") and len(kept[1]) < len(lines[1])
+
+
+def test_short_resumes_are_returned_whole():
+    assert prepare_resume_text(["Jane Doe\nSkills\nPython"], token_budget=100) == "Jane Doe\nSkills\nPython"
+
+
+def test_long_experience_cannot_crowd_out_skills_and_education():
+    pages = ["Jane Doe\njane@x.io\nExperience\n" + "\n".join(f"Built system number {i} at Acme" for i in range(300))
+             + "\nSkills\nPython, SQL\nEducation\nBSc Computer Science"]
+    text = prepare_resume_text(pages, token_budget=200)
+    assert estimate_tokens(text) <= 200 + 10
+    for line in ("jane@x.io", "Python, SQL", "BSc Computer Science"):
+        assert line in text